@@ -0,0 +1,229 @@
+"""
+------------------------------------------------------------------------------
+    @file       bench_assembler.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Hack assembly compiler benchmarks.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+
+    Usage:
+        python -m benchmarks.bench_assembler                    Run and compare with baseline
+        python -m benchmarks.bench_assembler --save-baseline    Run and store results as new baseline
+        python -m benchmarks.bench_assembler --sizes 10000 --generators label_heavy
+
+    Throughput is compared relative to speed of short calibration loop measured on same host
+    when baseline was saved and when benchmark runs, so baseline saved on other host can be used.
+    Calibration runs before every benchmark and best speed is kept, same as best time of every phase.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from benchmarks.generators         import GENERATORS, generate
+from src.hack_compiler             import HackAssemblyCompiler
+from src.hack_incremental_compiler import IncrementalHackAssemblyCompiler
+from src.hack_rom                  import write_rom
+
+BASELINE_FILE     = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES     = [10000, 100000, 1000000]
+DEFAULT_TOLERANCE = 0.3
+DEFAULT_REPEAT    = 3
+
+# Throughput of phases faster than this is too noisy to be compared with baseline.
+MIN_COMPARED_SECONDS = 0.005
+
+# Key of host calibration in baseline file.
+CALIBRATION_KEY = "calibration"
+
+# Lines parsed by calibration loop, it does not use compiler so compiler changes do not change host speed.
+CALIBRATION_LINES  = ["@{0}".format(value) if value % 3 == 0 else "D=D+M;JGT" if value % 3 == 1 else "(LOOP{0})".format(value)
+                      for value in range(1000)]
+CALIBRATION_ROUNDS = 100
+CALIBRATION_REPEAT = 5
+
+def calibrate(repeat=CALIBRATION_REPEAT):
+    """
+    Returns speed of host in calibration lines per second, best of repeated runs of short parsing loop.
+    """
+    table = { "D+M": 0b1000010, "JGT": 0b001, "D": 0b010 }
+    best  = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(CALIBRATION_ROUNDS):
+            for line in CALIBRATION_LINES:
+                line = line.strip()
+                if line.startswith("@"):
+                    int(line[1:])
+                elif line.startswith("("):
+                    line[1:-1]
+                else:
+                    destination, rest = line.split("=")
+                    comparison, jump  = rest.split(";")
+                    table[destination] | table[comparison] | table[jump]
+        seconds = time.perf_counter() - start
+        best    = seconds if best is None else min(best, seconds)
+    return CALIBRATION_ROUNDS * len(CALIBRATION_LINES) / best
+
+class AssemblerBenchmark(object):
+
+    def __init__(self, generator, lines, directory):
+        """
+        Constructs benchmark of all compiler phases for one generated program.
+        """
+        self.generator   = generator
+        self.lines       = lines
+        self.source_file = os.path.join(directory, "{0}_{1}.asm".format(generator, lines))
+        self.out_file    = os.path.join(directory, "{0}_{1}.hack".format(generator, lines))
+
+        self.text = generate(generator, lines)
+        with open(self.source_file, "w") as file:
+            file.write(self.text)
+
+        self.compiler    = None
+        self.incremental = None
+        self.edited_text = None
+
+    def phases(self):
+        """
+        Returns list of (phase name, preparation, function) in order they have to run,
+        preparation is not measured.
+        """
+        return [
+            ("load",        None,                     self.load),
+            ("assemble",    None,                     self.assemble),
+            ("write",       None,                     self.write),
+            ("stream",      None,                     self.stream),
+            ("incremental", self.prepare_incremental, self.incremental_edit),
+        ]
+
+    def load(self):
+        self.compiler = HackAssemblyCompiler(self.source_file, None)
+
+    def assemble(self):
+        self.compiler.compile()
+
+    def write(self):
+        write_rom(self.compiler.words, self.out_file)
+
+    def stream(self):
+        HackAssemblyCompiler(self.source_file, self.out_file, streaming=True).compile()
+
+    def prepare_incremental(self):
+        self.incremental = IncrementalHackAssemblyCompiler()
+        self.incremental.update(self.text)
+
+        lines = self.text.split("\n")
+        lines[len(lines) // 2] = "D=D+1"
+        self.edited_text = "\n".join(lines)
+
+    def incremental_edit(self):
+        self.incremental.update(self.edited_text)
+
+    def run(self, repeat=DEFAULT_REPEAT):
+        """
+        Returns results of every phase as {phase: {seconds, lines_per_second, peak_bytes}}.
+        Time is best of repeated runs without tracing, peak memory is measured in separate run with tracemalloc.
+        """
+        results = {}
+        for _ in range(repeat):
+            for name, preparation, function in self.phases():
+                if preparation:
+                    preparation()
+                start   = time.perf_counter()
+                function()
+                seconds = time.perf_counter() - start
+                if name not in results or seconds < results[name]["seconds"]:
+                    results[name] = { "seconds": seconds, "lines_per_second": self.lines / seconds if seconds else 0.0 }
+                    if name == "assemble":
+                        # Time of compiler phases as measured by compiler itself
+                        results[name]["compiler_phases"] = dict(self.compiler.statistics.phases)
+
+        for name, preparation, function in self.phases():
+            if preparation:
+                preparation()
+            tracemalloc.start()
+            function()
+            results[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return results
+
+def compare_with_baseline(results, baseline, tolerance, host_speed):
+    """
+    Returns list of regressions, throughput may not drop and peak memory may not grow by more than tolerance.
+    Baseline throughput is scaled by ratio of host speed and speed of host that saved baseline.
+    """
+    regressions = []
+    scale       = host_speed / baseline[CALIBRATION_KEY]["lines_per_second"]
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected   = baseline[key]
+        throughput = expected["lines_per_second"] * scale
+        if max(result["seconds"], expected["seconds"] * scale) >= MIN_COMPARED_SECONDS and \
+           result["lines_per_second"] < throughput * (1.0 - tolerance):
+            regressions.append("{0}: throughput {1:.0f} lines/s, baseline {2:.0f} lines/s on this host".format(
+                key, result["lines_per_second"], throughput))
+        if result["peak_bytes"] > expected["peak_bytes"] * (1.0 + tolerance):
+            regressions.append("{0}: peak memory {1:.1f} MB, baseline {2:.1f} MB".format(
+                key, result["peak_bytes"] / 2**20, expected["peak_bytes"] / 2**20))
+    return regressions
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark hack assembly compiler on generated programs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Program sizes in lines")
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline results file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Number of timed runs of every phase")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as new baseline")
+    arguments = parser.parse_args()
+
+    results    = {}
+    host_speed = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        for generator in arguments.generators:
+            for lines in arguments.sizes:
+                host_speed = max(host_speed, calibrate())
+                benchmark = AssemblerBenchmark(generator, lines, directory)
+                for phase, result in benchmark.run(arguments.repeat).items():
+                    key = "{0}/{1}/{2}".format(generator, lines, phase)
+                    results[key] = result
+                    print("{0:<42} {1:>9.3f}s {2:>12.0f} lines/s {3:>9.1f} MB".format(
+                        key, result["seconds"], result["lines_per_second"], result["peak_bytes"] / 2**20))
+                    for compiler_phase, seconds in result.get("compiler_phases", {}).items():
+                        print("    {0:<38} {1:>9.3f}s".format(compiler_phase, seconds))
+
+    print("{0:<42} {1:>22.0f} lines/s".format(CALIBRATION_KEY, host_speed))
+
+    if arguments.save_baseline:
+        with open(arguments.baseline, "w") as file:
+            json.dump(dict(results, **{ CALIBRATION_KEY: { "lines_per_second": host_speed } }), file, indent=4, sort_keys=True)
+        print("Baseline saved to: {0}".format(arguments.baseline))
+        sys.exit(0)
+
+    if not os.path.exists(arguments.baseline):
+        print("No baseline found, run with --save-baseline first")
+        sys.exit(0)
+
+    with open(arguments.baseline, "r") as file:
+        baseline = json.load(file)
+
+    if CALIBRATION_KEY not in baseline:
+        print("Baseline has no host calibration, run with --save-baseline to store new baseline")
+        sys.exit(0)
+
+    regressions = compare_with_baseline(results, baseline, arguments.tolerance, host_speed)
+
+    for regression in regressions:
+        print("[-] Regression " + regression)
+    sys.exit(1 if regressions else 0)
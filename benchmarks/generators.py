@@ -0,0 +1,126 @@
+"""
+------------------------------------------------------------------------------
+    @file       generators.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Synthetic hack assembly program generators for benchmarks.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import random
+
+# Labels can only be referenced while their address fits in A instruction.
+MAX_LABEL_ADDRESS = 0x7FFF
+
+COMPARISONS  = ["0", "1", "-1", "D", "A", "!D", "!A", "-D", "-A", "D+1", "A+1", "D-1", "A-1", "D+A", "D-A", "A-D",
+                "D&A", "D|A", "M", "!M", "-M", "M+1", "M-1", "D+M", "D-M", "M-D", "D&M", "D|M"]
+DESTINATIONS = ["M", "D", "MD", "A", "AM", "AD", "AMD"]
+JUMPS        = ["JGT", "JEQ", "JGE", "JLT", "JNE", "JLE", "JMP"]
+
+class ProgramGenerator(object):
+
+    def __init__(self, seed=0):
+        """
+        Constructs generator with its own random state so generated programs are reproducible.
+        """
+        self.random          = random.Random(seed)
+        self.program_counter = 0
+        self.labels          = []
+
+    def instruction(self, line):
+        self.program_counter += 1
+        return line
+
+    def label(self, name):
+        if self.program_counter <= MAX_LABEL_ADDRESS:
+            self.labels.append(name)
+        return "({0})".format(name)
+
+    def jump_target(self):
+        return self.random.choice(self.labels) if self.labels else "0"
+
+    def c_instruction(self):
+        destination = self.random.choice(DESTINATIONS)
+        comparison  = self.random.choice(COMPARISONS)
+        if self.random.random() < 0.2:
+            return self.instruction("{0}={1};{2}".format(destination, comparison, self.random.choice(JUMPS)))
+        return self.instruction("{0}={1}".format(destination, comparison))
+
+def label_heavy(lines, seed=0):
+    """
+    Program with label every few lines and many jumps between them.
+    """
+    generator = ProgramGenerator(seed)
+    count     = 0
+    while count < lines:
+        yield generator.label("LOOP_{0}".format(count))
+        yield generator.instruction("    @" + generator.jump_target())
+        yield generator.instruction("    D;JNE")
+        yield generator.c_instruction()
+        count += 4
+
+def variable_heavy(lines, seed=0, variables=4096):
+    """
+    Program that mostly loads and stores thousands of distinct variables.
+    """
+    generator = ProgramGenerator(seed)
+    for _ in range(0, lines, 4):
+        yield generator.instruction("@var_{0}".format(generator.random.randrange(variables)))
+        yield generator.instruction("D=M")
+        yield generator.instruction("@var_{0} // store".format(generator.random.randrange(variables)))
+        yield generator.instruction("M=D+M")
+
+def c_instruction_runs(lines, seed=0):
+    """
+    Program made of long runs of C instructions with occasional address loads.
+    """
+    generator = ProgramGenerator(seed)
+    for count in range(lines):
+        if count % 64 == 0:
+            yield generator.instruction("@{0}".format(generator.random.randrange(MAX_LABEL_ADDRESS)))
+        else:
+            yield "  " + generator.c_instruction()
+
+def vm_translated(lines, seed=0):
+    """
+    Program that looks like VM translator output: stack operations, comments and return labels.
+    """
+    generator = ProgramGenerator(seed)
+    count     = 0
+    while count < lines:
+        segment = generator.random.choice(["LCL", "ARG", "THIS", "THAT"])
+        index   = generator.random.randrange(8)
+        block   = [
+            "// push {0} {1}".format(segment.lower(), index),
+            generator.instruction("@{0}".format(index)),
+            generator.instruction("D=A"),
+            generator.instruction("@" + segment),
+            generator.instruction("A=D+M"),
+            generator.instruction("D=M"),
+            generator.instruction("@SP"),
+            generator.instruction("A=M"),
+            generator.instruction("M=D"),
+            generator.instruction("@SP"),
+            generator.instruction("M=M+1"),
+            generator.label("RETURN_{0}".format(count)),
+            "",
+        ]
+        count += len(block)
+        yield from block
+
+GENERATORS = {
+    "label_heavy":        label_heavy,
+    "variable_heavy":     variable_heavy,
+    "c_instruction_runs": c_instruction_runs,
+    "vm_translated":      vm_translated,
+}
+
+def generate(name, lines, seed=0):
+    """
+    Returns text of generated program with about given number of lines.
+    """
+    return "\n".join(GENERATORS[name](lines, seed)) + "\n"
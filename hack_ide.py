@@ -16,6 +16,8 @@ import sys, time
 from PyQt5                        import QtWidgets, QtGui, QtCore, uic
 from src.utils.log_system         import LogSystem
 from src.utils.action_system      import ActionSystem
+from src.utils.emulator_system    import EmulatorSystem
+from src.utils.compile_system     import CompileSystem
 from src.utils.asset_system       import AssetSystem
 from src.widgets.menu_bar         import MenuBarWidget
 from src.widgets.directory_view   import DirectoryViewWidget
@@ -26,6 +28,8 @@ from src.widgets.tool_bar         import ToolBarWidget
 from src.widgets.destination_dock import DestinationDockWidget
 from src.widgets.comparison_dock  import ComparisonDockWidget
 from src.widgets.compilation_dock import CompilationDockWidget
+from src.widgets.screen_dock      import ScreenDockWidget
+from src.widgets.profile_dock     import ProfileDockWidget
 from src.widgets.about_window     import AboutDialog
 
 class HackIDE(QtWidgets.QMainWindow):
@@ -51,6 +55,8 @@ class HackIDE(QtWidgets.QMainWindow):
 
         ActionSystem.initialize(self)           # Initialize actions for our main window.
         AssetSystem.initialize()                # Initialize assets.
+        EmulatorSystem.initialize(self)         # Start emulator worker thread.
+        CompileSystem.initialize(self)          # Create compilation thread pool.
 
         self.central_widget   = self.findChild(QtWidgets.QWidget, "centralwidget")
         self.about_dialog     = AboutDialog(self)
@@ -63,6 +69,8 @@ class HackIDE(QtWidgets.QMainWindow):
         self.destination_dock = DestinationDockWidget(self)  # Initialize destination dock custom widget.
         self.comparison_dock  = ComparisonDockWidget(self)   # Initialize comparison dock custom widget.
         self.compilation_dock = CompilationDockWidget(self)  # Initialize compilation docck custom widget.
+        self.screen_dock      = ScreenDockWidget(self)       # Initialize screen dock custom widget.
+        self.profile_dock     = ProfileDockWidget(self)      # Initialize profile dock custom widget.
 
     def keyPressEvent(self, event):
         """
@@ -0,0 +1,140 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_batch_compiler.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Batch hack assembly compiler.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from src.hack_compiler  import HackAssemblyCompiler
+from src.hack_cache     import HackAssemblyCache, DEFAULT_CACHE_DIRECTORY
+
+# Cache used by each worker process, keyed by cache directory.
+worker_caches = {}
+
+class BatchCompilationResult(object):
+
+    def __init__(self, hack_assembly_file, out_file):
+        """
+        Constructs result of compiling one file in batch.
+        """
+        self.file         = hack_assembly_file
+        self.out_file     = out_file
+        self.success      = False
+        self.error        = None
+        self.instructions = 0
+        self.saved        = 0
+        self.seconds      = 0.0
+
+def compile_file(hack_assembly_file, streaming=False, cache_directory=None, optimize=False):
+    """
+    Compile one hack assembly file to .hack file next to it, runs in worker process.
+    """
+    out_file = os.path.splitext(hack_assembly_file)[0] + ".hack"
+    result   = BatchCompilationResult(hack_assembly_file, out_file)
+    start    = time.perf_counter()
+    try:
+        cache = None
+        if cache_directory is not None:
+            if cache_directory not in worker_caches:
+                worker_caches[cache_directory] = HackAssemblyCache(cache_directory)
+            cache = worker_caches[cache_directory]
+        hack_assembly_compiler = HackAssemblyCompiler(hack_assembly_file, out_file, streaming, cache, optimize=optimize)
+        hack_assembly_compiler.compile()
+        result.instructions = hack_assembly_compiler.statistics.instructions
+        result.saved        = hack_assembly_compiler.statistics.saved
+        result.success      = True
+    except Exception as e:
+        result.error = "{0}: {1}".format(type(e).__name__, e)
+    result.seconds = time.perf_counter() - start
+    return result
+
+class HackBatchCompiler(object):
+
+    def __init__(self, root_directory, jobs=None, streaming=False, cache_directory=DEFAULT_CACHE_DIRECTORY, optimize=False):
+        """
+        Constructs batch compiler for all .asm files in directory tree, files are compiled in
+        process pool with jobs workers (all cores by default). Cache is not used when cache directory is None.
+        """
+        self.root_directory  = root_directory
+        self.jobs            = jobs or os.cpu_count() or 1
+        self.streaming       = streaming
+        self.cache_directory = cache_directory
+        self.optimize        = optimize
+        self.results         = []
+        self.seconds         = 0.0
+
+    def find_files(self):
+        """
+        Returns sorted list of all hack assembly files in directory tree.
+        """
+        files = []
+        for directory, _, file_names in os.walk(self.root_directory):
+            for file_name in file_names:
+                if file_name.endswith(".asm"):
+                    files.append(os.path.join(directory, file_name))
+        return sorted(files)
+
+    def compile(self):
+        """
+        Compile all files and return list of results in same order as files.
+        """
+        start = time.perf_counter()
+        files = self.find_files()
+
+        if self.jobs == 1 or len(files) < 2:
+            self.results = [compile_file(file, self.streaming, self.cache_directory, self.optimize) for file in files]
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                chunk_size   = max(1, len(files) // (self.jobs * 4))
+                self.results = list(executor.map(compile_file, files, [self.streaming] * len(files), [self.cache_directory] * len(files),
+                                                 [self.optimize] * len(files), chunksize=chunk_size))
+
+        self.seconds = time.perf_counter() - start
+        return self.results
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.success]
+
+    def summary(self):
+        """
+        Returns text summary with timing and error for every file.
+        """
+        lines = []
+        for result in self.results:
+            if result.success:
+                saved = " ({0} saved)".format(result.saved) if result.saved else ""
+                lines.append("[+] {0} - {1} instructions{2} in {3:.3f}s".format(result.file, result.instructions, saved, result.seconds))
+            else:
+                lines.append("[-] {0} - {1} in {2:.3f}s".format(result.file, result.error, result.seconds))
+        lines.append("Compiled {0} files, {1} failed, {2:.3f}s total with {3} workers".format(
+            len(self.results), len(self.failed), self.seconds, self.jobs))
+        return "\n".join(lines)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compile all hack assembly files in directory tree.")
+    parser.add_argument("directory", help="Root directory with .asm files")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("-s", "--streaming", action="store_true", help="Use streaming compiler for large files")
+    parser.add_argument("-c", "--cache", default=DEFAULT_CACHE_DIRECTORY, help="Cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use cache")
+    parser.add_argument("-O", "--optimize", action="store_true", help="Run peephole optimizer")
+    arguments = parser.parse_args()
+
+    batch_compiler = HackBatchCompiler(arguments.directory, arguments.jobs, arguments.streaming,
+                                       None if arguments.no_cache else arguments.cache, arguments.optimize)
+    batch_compiler.compile()
+    print(batch_compiler.summary())
+    sys.exit(1 if batch_compiler.failed else 0)
@@ -0,0 +1,150 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_cache.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Cache of hack assembly compilation results.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import os
+import struct
+import hashlib
+import tempfile
+from array             import array
+from src.hack_compiler import ASSEMBLER_VERSION
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "hack-ide")
+DEFAULT_CACHE_SIZE      = 256 * 1024 * 1024
+
+# Cache entry header: magic, number of words and number of program counter lines.
+# Words (16 bit) and source line of every word (32 bit) follow header in native byte order.
+CACHE_MAGIC  = b"HACKCCH\0"
+CACHE_HEADER = struct.Struct("=8sII")
+
+class HackAssemblyCache(object):
+
+    def __init__(self, directory=DEFAULT_CACHE_DIRECTORY, max_size=DEFAULT_CACHE_SIZE):
+        """
+        Constructs cache of compilation results keyed by hash of source and assembler version.
+        When cache grows over max_size bytes least recently used entries are removed.
+        """
+        self.directory = directory
+        self.max_size  = max_size
+        self.__size    = None   # Estimated size of cache, computed on first store
+
+    def key(self, source, variant=""):
+        """
+        Returns cache key for source text, variant separates results of same source compiled with different options.
+        """
+        digest = hashlib.sha256((ASSEMBLER_VERSION + variant + "\0").encode())
+        digest.update(source.encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+    def __path(self, key, extension):
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    def read(self, key, extension=".bin"):
+        """
+        Returns raw data of entry with given key or None if it is not in cache.
+        """
+        path = self.__path(key, extension)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            # Mark entry as recently used
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def write(self, key, data, extension=".bin"):
+        """
+        Store raw data as entry with given key, entry is replaced atomically.
+        """
+        path = self.__path(key, extension)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to temporary file first so other processes never read partial entry
+            descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary_path, path)
+        except OSError:
+            return
+
+        if self.__size is None:
+            self.evict()
+        else:
+            self.__size += len(data)
+            if self.__size > self.max_size:
+                self.evict()
+
+    def load(self, source, variant=""):
+        """
+        Returns tuple (words, program counter and lines) for source or None if it is not in cache.
+        """
+        data = self.read(self.key(source, variant))
+        if data is None:
+            return None
+
+        try:
+            magic, words_count, lines_count = CACHE_HEADER.unpack_from(data)
+            if magic != CACHE_MAGIC or len(data) != CACHE_HEADER.size + words_count * 2 + lines_count * 4:
+                return None
+            words = array("H")
+            words.frombytes(data[CACHE_HEADER.size:CACHE_HEADER.size + words_count * 2])
+            lines = array("I")
+            lines.frombytes(data[CACHE_HEADER.size + words_count * 2:])
+        except (struct.error, ValueError):
+            return None
+
+        return words, dict(enumerate(lines))
+
+    def store(self, source, words, program_counter_and_lines, variant=""):
+        """
+        Store compilation result for source, program counter and lines must map every address of words.
+        """
+        lines = array("I", [program_counter_and_lines[pc] for pc in range(len(program_counter_and_lines))])
+        data  = CACHE_HEADER.pack(CACHE_MAGIC, len(words), len(lines)) + array("H", words).tobytes() + lines.tobytes()
+        self.write(self.key(source, variant), data)
+
+    def evict(self):
+        """
+        Remove least recently used entries until cache fits in max size.
+        """
+        entries    = []
+        total_size = 0
+        for directory, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                try:
+                    status = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, path))
+                total_size += status.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+
+        self.__size = total_size
+
+    def clear(self):
+        """
+        Remove all entries from cache.
+        """
+        max_size, self.max_size = self.max_size, -1
+        self.evict()
+        self.max_size = max_size
@@ -0,0 +1,64 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_comparison.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Comparison of compiled words with expected words.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import numpy as np
+
+class HackComparison(object):
+
+    def __init__(self, destination, comparison):
+        """
+        Compare compiled (destination) words with expected (comparison) words in one operation.
+        Addresses present in only one of them are mismatches too.
+        """
+        destination = np.asarray(destination, dtype=np.uint16)
+        comparison  = np.asarray(comparison, dtype=np.uint16)
+        common      = min(len(destination), len(comparison))
+
+        self.destination_size = len(destination)
+        self.comparison_size  = len(comparison)
+        self.mismatches       = np.concatenate([np.flatnonzero(destination[:common] != comparison[:common]),
+                                                np.arange(common, max(len(destination), len(comparison)))])
+
+    @property
+    def success(self):
+        return not self.mismatches.size
+
+    def destination_rows(self):
+        """ Returns mismatching addresses that exist in destination. """
+        return self.mismatches[self.mismatches < self.destination_size]
+
+    def comparison_rows(self):
+        """ Returns mismatching addresses that exist in comparison. """
+        return self.mismatches[self.mismatches < self.comparison_size]
+
+    def lines(self, program_counter_and_lines):
+        """
+        Returns sorted source lines of mismatching destination addresses.
+        """
+        return sorted({ program_counter_and_lines[address] for address in self.destination_rows().tolist()
+                        if address in program_counter_and_lines })
+
+    def summary(self, program_counter_and_lines, count):
+        """
+        Returns text about mismatches with at most count source lines.
+        """
+        if self.success:
+            return "Comparison: Success... ✔️"
+        lines = self.lines(program_counter_and_lines)
+        shown = ", ".join(str(line) for line in lines[:count]) + (", ..." if len(lines) > count else "")
+        text  = "Comparison: Failed - {0} of {1} words differ".format(self.mismatches.size, max(self.destination_size, self.comparison_size))
+        if self.destination_size != self.comparison_size:
+            text += " (destination has {0} words, comparison file {1})".format(self.destination_size, self.comparison_size)
+        if lines:
+            text += " on lines {0}".format(shown)
+        return text + " ❌"
@@ -11,21 +11,256 @@
     file COPYING or http://www.opensource.org/licenses/mit-license.php.
 ------------------------------------------------------------------------------
 """
+import os
 import re
 import sys
+import time
+from array      import array
+from itertools  import permutations
+from contextlib import contextmanager
+
+# Version of generated code, must change whenever encoding changes so cached results are not reused.
+ASSEMBLER_VERSION = "0.2"
+
+# Token kinds recorded by the tokenizer.
+LABEL         = 0
+A_ADDRESS     = 1
+A_SYMBOL      = 2
+C_INSTRUCTION = 3
+
+SYMBOL_PATTERN = r"[a-zA-Z.:$_][a-zA-Z0-9.:$_]*"
+
+# Labels and A instructions are recognized with one precompiled expression.
+LINE_REGEX = re.compile(r"\((" + SYMBOL_PATTERN + r")\)$|@(?:([0-9]+)|(" + SYMBOL_PATTERN + r"))$")
+
+# Instruction encoding.
+MAX_A_VALUE          = 0x7FFF
+C_INSTRUCTION_PREFIX = 0b111 << 13
+
+DESTINATIONS = { "NULL": 0b000, "M" : 0b001, "D" : 0b010, "MD" : 0b011,
+                 "A"   : 0b100, "AM": 0b101, "AD": 0b110, "AMD": 0b111 }
+
+JUMPS = { "NULL": 0b000, "JGT": 0b001, "JEQ": 0b010, "JGE": 0b011, "JLT": 0b100,
+          "JNE" : 0b101, "JLE": 0b110, "JMP": 0b111 }
+
+COMPARISONS = { "0"  : 0b0101010, "1"  : 0b0111111, "-1" : 0b0111010, "D"  : 0b0001100,
+                "A"  : 0b0110000, "!D" : 0b0001101, "!A" : 0b0110001, "-D" : 0b0001111,
+                "-A" : 0b0110011, "D+1": 0b0011111, "A+1": 0b0110111, "D-1": 0b0001110,
+                "A-1": 0b0110010, "D+A": 0b0000010, "D-A": 0b0010011, "A-D": 0b0000111,
+                "D&A": 0b0000000, "D|A": 0b0010101, "M"  : 0b1110000, "!M" : 0b1110001,
+                "-M" : 0b1110011, "M+1": 0b1110111, "M-1": 0b1110010, "D+M": 0b1000010,
+                "D-M": 0b1010011, "M-D": 0b1000111, "D&M": 0b1000000, "D|M": 0b1010101,
+                "M+D": 0b1000010 }
+
+def build_c_instruction_table():
+    """
+    Returns table of every valid C instruction text (without whitespace) and its 16 bit word.
+    Destination registers can be written in any order and commutative comparisons with operands swapped.
+    """
+    destinations = { "": DESTINATIONS["NULL"] }
+    for name, bits in DESTINATIONS.items():
+        if name != "NULL":
+            for order in permutations(name):
+                destinations["".join(order) + "="] = bits
+
+    comparisons = dict(COMPARISONS)
+    for name, bits in COMPARISONS.items():
+        if len(name) == 3 and name[1] in "+&|":
+            comparisons.setdefault(name[2] + name[1] + name[0], bits)
+
+    jumps = { ";" + name: bits for name, bits in JUMPS.items() if name != "NULL" }
+    jumps[""] = JUMPS["NULL"]
+
+    table = {}
+    for destination, destination_bits in destinations.items():
+        for comparison, comparison_bits in comparisons.items():
+            for jump, jump_bits in jumps.items():
+                # Comparison without destination and jump is not valid instruction
+                if destination or jump:
+                    table[destination + comparison + jump] = C_INSTRUCTION_PREFIX | comparison_bits << 6 | destination_bits << 3 | jump_bits
+    return table
+
+C_INSTRUCTIONS = build_c_instruction_table()
+
+# Diagnostic kinds.
+SYNTAX_ERROR = "syntax"
+RANGE_ERROR  = "range"
+
+# Number of words rendered and written to output at once.
+STREAM_CHUNK_SIZE = 8192
+
+def tokenize_line(full_line):
+    """
+    Classify one line of hack assembly, returns None for empty and comment lines or tuple (kind, value).
+    For valid C instruction value is its encoded word, otherwise it is tuple (destination, comparison, jump)
+    where missing parts are None, which is only used for error reporting.
+    """
+    line = "".join(full_line.split("//", 1)[0].split())
+
+    if not line:
+        return None
+
+    word = C_INSTRUCTIONS.get(line)
+    if word is not None:
+        return (C_INSTRUCTION, word)
+
+    if line[0] == "(" or line[0] == "@":
+        match = LINE_REGEX.match(line)
+        if match:
+            label, address, symbol = match.groups()
+            if label is not None:
+                return (LABEL, label)
+            if address is not None:
+                return (A_ADDRESS, int(address))
+            return (A_SYMBOL, symbol)
+
+    destination, separator, rest = line.partition("=")
+    if not separator:
+        destination, rest = None, line
+
+    comparison, separator, jump = rest.partition(";")
+    if not separator:
+        jump = None
+
+    return (C_INSTRUCTION, (destination, comparison, jump))
+
+def tokenize(lines):
+    """
+    Tokenize lines of hack assembly into compact table of (kind, line number, value) entries.
+    Empty and comment lines are not stored in table.
+    """
+    table = []
+    for line_number, line in enumerate(lines, 1):
+        token = tokenize_line(line)
+        if token is not None:
+            table.append((token[0], line_number, token[1]))
+    return table
+
+# Binary digits of every hex digit, used to render words without formatting them one by one.
+HEX_TO_BINARY_TABLE = str.maketrans({ digit: format(int(digit, 16), "04b") for digit in "0123456789abcdef" })
+
+def words_to_text(words):
+    """
+    Render 16 bit words as text of hack binary file, one instruction per line.
+    """
+    if not len(words):
+        return ""
+    packed = array("H", words)
+    if sys.byteorder == "little":
+        packed.byteswap()
+    return packed.tobytes().hex("\n", 2).translate(HEX_TO_BINARY_TABLE) + "\n"
+
+class CompilationStatistics(object):
+
+    def __init__(self):
+        """
+        Constructs statistics of one compilation, wall time of every phase in order phases ran and counters.
+        """
+        self.phases        = {}
+        self.instructions  = 0
+        self.labels        = 0
+        self.variables     = 0
+        self.bytes_written = 0
+        self.saved         = 0
+        self.cache_hit     = False
+
+    @contextmanager
+    def phase(self, name):
+        """ Measure wall time of block as phase, time of repeated phase is added up. """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def seconds(self):
+        return sum(self.phases.values())
+
+    def summary(self):
+        """
+        Returns text summary with counters and time of every phase.
+        """
+        # Nothing is written when program is compiled in memory (IDE, incremental compiler)
+        written = ", {0} bytes written".format(self.bytes_written) if self.bytes_written else ""
+        if self.cache_hit:
+            # Labels, variables and optimizer savings are not known when result is taken from cache
+            lines = ["Statistics: {0} instructions{1} (cached)".format(self.instructions, written)]
+        else:
+            lines = ["Statistics: {0} instructions, {1} labels, {2} variables{3}{4}".format(
+                self.instructions, self.labels, self.variables, written,
+                ", {0} instructions saved by optimizer".format(self.saved) if self.saved else "")]
+        for name, seconds in self.phases.items():
+            lines.append("    {0:<10} {1:>10.3f} ms".format(name, seconds * 1000))
+        lines.append("    {0:<10} {1:>10.3f} ms".format("total", self.seconds * 1000))
+        return "\n".join(lines)
+
+def source_column(full_line, position):
+    """
+    Returns column (starting from 1) in source line of character on given position in line without whitespace.
+    """
+    count = 0
+    for column, character in enumerate(full_line, 1):
+        if not character.isspace():
+            if count == position:
+                return column
+            count += 1
+    return 1
 
 class InternalException(Exception):
     pass
 
 class InvalidSyntaxException(Exception):
-    pass
 
-class HackAssemblyCompiler(object):
+    def __init__(self, message, line=None, position=0, kind=SYNTAX_ERROR):
+        """
+        Constructs syntax error, message is prefixed with line number when it is known.
+        Position is index of invalid part in instruction without whitespace.
+        """
+        super().__init__(message if line is None else "{0}:{1}".format(line, message))
+        self.message  = message
+        self.line     = line
+        self.position = position
+        self.kind     = kind
+
+class Diagnostic(object):
+    """
+    Error found in one source line.
+    """
+    __slots__ = ("line", "column", "kind", "message")
+
+    def __init__(self, line, column, kind, message):
+        self.line    = line
+        self.column  = column
+        self.kind    = kind
+        self.message = message
+
+    @classmethod
+    def from_exception(cls, exception, full_line):
+        return cls(exception.line, source_column(full_line, exception.position), exception.kind, exception.message)
+
+    def __str__(self):
+        return "{0}:{1}: {2} error: {3}".format(self.line, self.column, self.kind, self.message)
 
-    def __init__(self, hack_assembly_file, out_file):
+class HackAssemblyCompiler(object):
 
+    def __init__(self, hack_assembly_file, out_file, streaming=False, cache=None, collect_diagnostics=False, optimize=False):
+        """
+        Constructs hack assembly compiler. In streaming mode source file is never loaded whole and
+        only symbols are kept in memory, so binary data and program counter lines stay empty.
+        Without source file compiler is only used as instruction encoder and without output file
+        nothing is written. Results are reused from cache (HackAssemblyCache) when it is provided.
+        When collecting diagnostics compilation does not stop on first error, all errors are kept
+        in diagnostics and output file is not written if there are any. Optimization (peephole optimizer)
+        is not used in streaming mode.
+        """
         self.__hack_assembly_file      = hack_assembly_file
         self.__hack_assembly_out_file  = out_file
+        self.__streaming               = streaming
+        self.__cache                   = cache
+        self.__collect_diagnostics     = collect_diagnostics
+        self.__optimize                = optimize and not streaming
+        self.__cache_variant           = "optimized" if self.__optimize else ""
 
         self.rewind()
 
@@ -36,34 +271,27 @@ class HackAssemblyCompiler(object):
 
         self.NEXT_SYMBOL_VALUE = 16
 
-        self.DESTINATIONS = { "NULL": "000", "M" : "001", "D" : "010", "MD" : "011", 
-                              "A"   : "100", "AM": "101", "AD": "110", "AMD": "111" }
-
-        self.JUMPS = { "NULL": "000", "JGT": "001", "JEQ": "010", "JGE": "011", "JLT": "100", 
-                       "JNE" : "101", "JLE": "110", "JMP": "111" }
-
-        self.COMPARISONS = { "0"  : "0101010", "1"  : "0111111", "-1" : "0111010", "D"  : "0001100",
-                             "A"  : "0110000", "!D" : "0001101", "!A" : "0110001", "-D" : "0001111",
-                             "-A" : "0110011", "D+1": "0011111", "A+1": "0110111", "D-1": "0001110",
-                             "A-1": "0110010", "D+A": "0000010", "D-A": "0010011", "A-D": "0000111",
-                             "D&A": "0000000", "D|A": "0010101", "M"  : "1110000", "!M" : "1110001",
-                             "-M" : "1110011", "M+1": "1110111", "M-1": "1110010", "D+M": "1000010",
-                             "D-M": "1010011", "M-D": "1000111", "D&M": "1000000", "D|M": "1010101",
-                             "M+D": "1000010" }
+        self.DESTINATIONS = DESTINATIONS
+        self.JUMPS        = JUMPS
+        self.COMPARISONS  = COMPARISONS
 
-        self.__hack_assembly_file_content           = []
-        self.__hack_assembly_compiled_code          = []
+        self.__hack_assembly_source                 = ""
+        self.__hack_assembly_tokens                 = []
+        self.__hack_assembly_compiled_code          = array("H")
         self.__hack_assembly_program_counter_buffer = {}
         self.__hack_assembly_program_counter        = 0
         self.__hack_assembly_current_line           = 1
+        self.__hack_assembly_source_lines           = None
+        self.statistics                             = CompilationStatistics()
+        self.diagnostics                            = []
         self.__load_hack_assembly_file_content()
 
     def add_new_symbol(self, symbol_name, value=None):
 
-        if symbol_name in self.SYMBOLS.keys():
+        if symbol_name in self.SYMBOLS:
             return
 
-        if value:
+        if value is not None:
             self.SYMBOLS[symbol_name] = value
         else:
             self.SYMBOLS[symbol_name] = self.NEXT_SYMBOL_VALUE
@@ -74,136 +302,272 @@ class HackAssemblyCompiler(object):
         try:
             return self.SYMBOLS[symbol_name]
         except Exception as e:
-            raise V3_Internal_Exception("Cannot locate symbol: {0}".format(e))
-            # print("Cannot find symbol [{0}] in symbols!".format(e))
+            raise InternalException("Cannot locate symbol: {0}".format(e))
 
     def __load_hack_assembly_file_content(self):
 
+        # In streaming mode file is read line by line in every pass.
+        if self.__streaming or self.__hack_assembly_file is None:
+            return
+
         try:
-            with open(self.__hack_assembly_file, "r") as hack_assembly_file:
-                self.__hack_assembly_file_content = hack_assembly_file.read().split("\n")
+            with self.statistics.phase("load"), open(self.__hack_assembly_file, "r") as hack_assembly_file:
+                self.__hack_assembly_source = hack_assembly_file.read()
         except Exception as exception:
             raise Exception(exception)
 
     def compile(self):
-        self.__process_labels()
-        self.__process_code()
-        self.__write_to_file_output()
-
-    def __write_to_file_output(self):
-        with open(self.__hack_assembly_out_file, "w") as file:
-            for l in self.__hack_assembly_compiled_code:
-                file.write(l+"\n")
+        statistics = self.statistics
+
+        if self.__streaming:
+            with statistics.phase("labels"):
+                self.__process_labels_stream()
+            # Code is encoded while it is written so both are measured as one phase
+            with statistics.phase("stream"):
+                self.__write_to_file_output(self.stream_words())
+            statistics.variables = self.NEXT_SYMBOL_VALUE - 16
+            return
 
-    def __process_code(self):
+        cached = None
+        if self.__cache is not None:
+            with statistics.phase("cache"):
+                cached = self.__cache.load(self.__hack_assembly_source, self.__cache_variant)
 
-        for full_line in self.__hack_assembly_file_content:
+        if cached is not None:
+            self.__hack_assembly_compiled_code, self.__hack_assembly_program_counter_buffer = cached
+            statistics.cache_hit = True
+        else:
+            with statistics.phase("tokenize"):
+                self.__hack_assembly_tokens = tokenize(self.__hack_assembly_source.split("\n"))
+            if self.__optimize:
+                with statistics.phase("optimize"):
+                    variables = self.__optimize_tokens()
+            with statistics.phase("labels"):
+                self.__process_labels()
+                if self.__optimize:
+                    # Variables keep addresses they have in program that is not optimized
+                    for name in variables:
+                        self.add_new_symbol(name)
+            with statistics.phase("code"):
+                self.__process_code()
+            statistics.variables = self.NEXT_SYMBOL_VALUE - 16
+            if self.__cache is not None and not self.diagnostics:
+                with statistics.phase("cache"):
+                    self.__cache.store(self.__hack_assembly_source, self.__hack_assembly_compiled_code,
+                                       self.__hack_assembly_program_counter_buffer, self.__cache_variant)
+
+        statistics.instructions = len(self.__hack_assembly_compiled_code)
+        if self.diagnostics:
+            return
 
-            line = full_line.replace(" ", "").split("//")[0]
-            # Check if it is comment or white space or label
-            if not line or re.match(r"(\([a-zA-Z.:$_]+\)$|\([a-zA-Z.:$_][a-zA-Z0-9.:$_]+\)$)", line):
-                # print(full_line + "\t Line: ", self.__hack_assembly_current_line)
+        with statistics.phase("write"):
+            self.__write_to_file_output(self.__hack_assembly_compiled_code)
+
+    def __optimize_tokens(self):
+        """
+        Run peephole optimizer on tokens, returns symbols in order of first use in source that is not optimized.
+        """
+        # Optimizer is built on tokenizer and encoding tables of this module
+        from src.hack_optimizer import PeepholeOptimizer
+
+        symbols   = dict.fromkeys([value for kind, _, value in self.__hack_assembly_tokens if kind == A_SYMBOL])
+        optimizer = PeepholeOptimizer(self.SYMBOLS)
+        self.__hack_assembly_tokens = optimizer.optimize(self.__hack_assembly_tokens)
+        self.statistics.saved = optimizer.saved
+        return list(symbols)
+
+    def __write_to_file_output(self, words):
+        """
+        Write words to output file in chunks of STREAM_CHUNK_SIZE instructions. Words are written to
+        temporary file next to output file, which replaces output file only when all words are encoded
+        without errors, so invalid program never leaves empty or truncated output file.
+        """
+        if self.__hack_assembly_out_file is None:
+            # Words are still encoded so errors are reported
+            for _ in words:
                 pass
-            # Check if it is A instruction
-            elif re.match(r"(@[a-zA-Z.:$_]+$|@[a-zA-Z.:$_][a-zA-Z0-9.:$_]+$|@[0-9]+$)", line):
-
-                symbol_name = line[1:]
-
-                if symbol_name.isdigit():
-                    number = int(symbol_name)
-                else:
-                    self.add_new_symbol(symbol_name)
-                    number = self.get_symbol_value(symbol_name)
+            return
 
+        temporary_file = self.__hack_assembly_out_file + ".tmp"
+        try:
+            with open(temporary_file, "w") as file:
+                chunk = array("H")
+                for word in words:
+                    chunk.append(word)
+                    if len(chunk) == STREAM_CHUNK_SIZE:
+                        self.statistics.bytes_written += file.write(words_to_text(chunk))
+                        chunk = array("H")
+                self.statistics.bytes_written += file.write(words_to_text(chunk))
+        except BaseException:
+            os.remove(temporary_file)
+            raise
+
+        # Diagnostics are collected while code is encoded in streaming mode
+        if self.diagnostics:
+            os.remove(temporary_file)
+            self.statistics.bytes_written = 0
+            return
+        os.replace(temporary_file, self.__hack_assembly_out_file)
+
+    def stream_words(self):
+        """
+        Read hack assembly file line by line and yield encoded words, labels must be already processed.
+        """
+        with open(self.__hack_assembly_file, "r") as hack_assembly_file:
+            for line_number, line in enumerate(hack_assembly_file, 1):
+                token = tokenize_line(line)
+                if token is None or token[0] == LABEL:
+                    continue
+                self.__hack_assembly_current_line = line_number
+                self.statistics.instructions += 1
                 try:
-                    binary_value = "0" + self.get_15_bit_binary_value_for_number(number)
-                except Exception as e:
-                    raise V3_Invalid_Syntax_Exception("{0}:{1}".format(self.__hack_assembly_current_line, str(e)))
-                self.__hack_assembly_compiled_code.append(binary_value)
-                # print(line +"\t Line: ", self.__hack_assembly_current_line, "\t" + binary_value)
+                    word = self.encode(token[0], line_number, token[1])
+                except InvalidSyntaxException as e:
+                    if not self.__collect_diagnostics:
+                        raise
+                    self.diagnostics.append(Diagnostic.from_exception(e, line))
+                    word = 0
+                yield word
 
-            # Here should go C instructions
-            else:
+        self.__hack_assembly_current_line = 1
 
-                destination = None; comparison = None; jump = None
+    def __process_code(self):
 
-                if re.match(r".+=.+;.+", line):
+        for kind, line_number, value in self.__hack_assembly_tokens:
 
-                    destination_end = re.search("=", line).start()
-                    destination = line[:destination_end]
+            self.__hack_assembly_current_line = line_number
 
-                    comparison_end  = re.search(";", line).start()
-                    comparison  = line[destination_end + 1 : comparison_end]
+            if kind == LABEL:
+                continue
 
-                    jump = line[comparison_end + 1 : ]
+            try:
+                word = self.encode(kind, line_number, value)
+            except InvalidSyntaxException as e:
+                if not self.__collect_diagnostics:
+                    raise
+                self.diagnostics.append(Diagnostic.from_exception(e, self.__source_line(line_number)))
+                word = 0
 
-                elif re.match(r".+=.+", line):
+            self.__hack_assembly_compiled_code.append(word)
 
-                    destination_end = re.search("=", line).start()
-                    destination = line[:destination_end]
+        self.__hack_assembly_current_line = 1
 
-                    comparison  = line[destination_end + 1 : ]
+    def __source_line(self, line_number):
+        if self.__hack_assembly_source_lines is None:
+            self.__hack_assembly_source_lines = self.__hack_assembly_source.split("\n")
+        return self.__hack_assembly_source_lines[line_number - 1]
 
-                elif re.match(r".+;.+", line):
+    def encode(self, kind, line_number, value):
+        """
+        Encode one tokenized instruction into 16 bit word, line number is only used for error reporting.
+        """
 
-                    comparison_end  = re.search(";", line).start()
-                    comparison  = line[ : comparison_end]
+        if kind == A_ADDRESS or kind == A_SYMBOL:
 
-                    jump = line[comparison_end + 1 : ]
+            if kind == A_ADDRESS:
+                number = value
+            else:
+                self.add_new_symbol(value)
+                number = self.get_symbol_value(value)
 
-                else:
-                    raise V3_Invalid_Syntax_Exception("{0}:{1}".format(self.__hack_assembly_current_line, line))
+            if number > MAX_A_VALUE:
+                raise InvalidSyntaxException("You can only use 15bit numbers!", line_number, 1, RANGE_ERROR)
+            return number
 
-                try:
-                    destination_binary = self.DESTINATIONS[destination] if destination is not None else self.DESTINATIONS["NULL"]
-                    comparison_binary = self.COMPARISONS[comparison] if comparison is not None else self.COMPARISONS["NULL"]
-                    jump_binary = self.JUMPS[jump] if jump is not None else self.JUMPS["NULL"]
-                except:
-                    raise V3_Invalid_Syntax_Exception("{0}:{1}".format(self.__hack_assembly_current_line, line))
+        # C instructions, valid ones are already encoded by tokenizer
+        if not isinstance(value, tuple):
+            return value
 
-                binary_value = "111" + comparison_binary + destination_binary + jump_binary
-                self.__hack_assembly_compiled_code.append(binary_value)
+        destination, comparison, jump = value
 
-            self.__hack_assembly_current_line += 1
+        if destination is None and jump is None:
+            raise InvalidSyntaxException(comparison, line_number)
 
+        try:
+            destination_binary = self.DESTINATIONS[destination] if destination is not None else self.DESTINATIONS["NULL"]
+            comparison_binary = self.COMPARISONS[comparison]
+            jump_binary = self.JUMPS[jump] if jump is not None else self.JUMPS["NULL"]
+        except:
+            raise InvalidSyntaxException(self.__format_c_instruction(value), line_number, self.__invalid_part_position(value))
+
+        return C_INSTRUCTION_PREFIX | comparison_binary << 6 | destination_binary << 3 | jump_binary
+
+    def __invalid_part_position(self, value):
+        """
+        Returns position of first invalid part of C instruction in line without whitespace.
+        """
+        destination, comparison, jump = value
+        if destination is not None:
+            if destination not in self.DESTINATIONS:
+                return 0
+            position = len(destination) + 1
+        else:
+            position = 0
+        if comparison not in self.COMPARISONS:
+            return position
+        return position + len(comparison) + 1
+
+    def __format_c_instruction(self, value):
+        destination, comparison, jump = value
+        line = comparison
+        if destination is not None:
+            line = destination + "=" + line
+        if jump is not None:
+            line = line + ";" + jump
+        return line
 
     def get_15_bit_binary_value_for_number(self, number):
 
-        number = "{0:b}".format(number)
-
-        if len(number) > 15:
+        if number > MAX_A_VALUE:
             raise Exception("You can only use 15bit numbers!")
 
-        while len(number) < 15:
-            number = "0" + number
-
-        return number
-
-    def __process_labels(self):        
+        return format(number, "015b")
 
-        for line in self.__hack_assembly_file_content:
+    def __process_labels(self):
 
-            line = line.replace(" ", "")
+        symbols_count = len(self.SYMBOLS)
 
-            if re.match(r"\/\/.+$", line) or not line:
-                self.__hack_assembly_current_line += 1
-                continue
+        for kind, line_number, value in self.__hack_assembly_tokens:
 
-            if re.match(r"(\([a-zA-Z.:$_]+\)$|\([a-zA-Z.:$_][a-zA-Z0-9.:$_]+\)$)", line):
-                self.add_new_symbol(line[1:-1], self.__hack_assembly_program_counter)
-                self.__hack_assembly_current_line += 1
+            if kind == LABEL:
+                self.add_new_symbol(value, self.__hack_assembly_program_counter)
                 continue
 
-            self.__hack_assembly_program_counter_buffer[self.__hack_assembly_program_counter] = self.__hack_assembly_current_line
+            self.__hack_assembly_program_counter_buffer[self.__hack_assembly_program_counter] = line_number
             self.__hack_assembly_program_counter += 1
-            self.__hack_assembly_current_line += 1
+
+        self.statistics.labels = len(self.SYMBOLS) - symbols_count
+
+        # Reset program counter
+        self.__hack_assembly_program_counter = 0
+
+    def __process_labels_stream(self):
+        """
+        Label pass for streaming mode, only label symbols are kept in memory.
+        """
+        symbols_count = len(self.SYMBOLS)
+
+        with open(self.__hack_assembly_file, "r") as hack_assembly_file:
+            for line in hack_assembly_file:
+                token = tokenize_line(line)
+                if token is None:
+                    continue
+                if token[0] == LABEL:
+                    self.add_new_symbol(token[1], self.__hack_assembly_program_counter)
+                    continue
+                self.__hack_assembly_program_counter += 1
+
+        self.statistics.labels = len(self.SYMBOLS) - symbols_count
 
         # Reset program counter
         self.__hack_assembly_program_counter = 0
-        self.__hack_assembly_current_line    = 1
 
     @property
     def binary_data(self):
+        return [format(word, "016b") for word in self.__hack_assembly_compiled_code]
+
+    @property
+    def words(self):
         return self.__hack_assembly_compiled_code
     
     @property
@@ -0,0 +1,111 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_disassembler.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Vectorized hack file decoder and disassembler.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import sys
+import time
+import argparse
+import numpy as np
+from src.hack_compiler import DESTINATIONS, JUMPS, COMPARISONS
+from src.hack_rom      import InvalidRomException
+
+WORD_BITS = 16
+NEWLINE   = ord("\n")
+ZERO      = ord("0")
+
+# Separator between binary word and its mnemonic in listing.
+LISTING_SEPARATOR = "    "
+
+def field_names():
+    """
+    Returns tuple of arrays (destinations, comparisons, jumps) with text of every value of C instruction field.
+    Comparisons assembler does not know are shown as their bits.
+    """
+    destinations = np.array(["" if name == "NULL" else name + "=" for name, _ in sorted(DESTINATIONS.items(), key=lambda item: item[1])])
+    jumps        = np.array(["" if name == "NULL" else ";" + name for name, _ in sorted(JUMPS.items(), key=lambda item: item[1])])
+    comparisons  = ["?{0:07b}".format(bits) for bits in range(128)]
+    for name, bits in reversed(list(COMPARISONS.items())):
+        # First name of comparison wins (D+M, not M+D)
+        comparisons[bits] = name
+    return destinations, np.array(comparisons), jumps
+
+def build_mnemonic_table():
+    """
+    Returns array with mnemonic of every 16 bit word, built over A value and C instruction fields at once.
+    Bits 13 and 14 are ignored by CPU, so C instructions without them have same mnemonic.
+    """
+    destinations, comparisons, jumps = field_names()
+    codes   = np.arange(0x8000)
+    a_table = np.char.add("@", codes.astype(str))
+    c_table = np.char.add(np.char.add(destinations[(codes >> 3) & 0b111], comparisons[(codes >> 6) & 0b1111111]), jumps[codes & 0b111])
+    return np.concatenate([a_table, c_table])
+
+MNEMONICS = build_mnemonic_table()
+
+def decode_hack(data):
+    """
+    Returns uint16 array of words in .hack file content (bytes). Regular files with one word on every
+    line are decoded without splitting lines, other whitespace (CRLF, empty lines) takes slower path.
+    """
+    raw  = np.frombuffer(data, dtype=np.uint8)
+    size = WORD_BITS + 1
+    if raw.size and raw[-1] != NEWLINE:
+        raw = np.append(raw, np.uint8(NEWLINE))
+
+    if raw.size % size == 0 and (raw[WORD_BITS::size] == NEWLINE).all():
+        digits = raw.reshape(-1, size)[:, :WORD_BITS]
+    else:
+        tokens = data.split()
+        for index, token in enumerate(tokens):
+            if len(token) != WORD_BITS:
+                raise InvalidRomException("Word {0} is not {1} binary digits: {2}".format(index + 1, WORD_BITS, token.decode(errors="replace")))
+        digits = np.frombuffer(b"".join(tokens), dtype=np.uint8).reshape(-1, WORD_BITS)
+
+    bits    = digits - np.uint8(ZERO)
+    invalid = np.flatnonzero((bits > 1).any(axis=1))
+    if invalid.size:
+        raise InvalidRomException("Word {0} is not binary number".format(invalid[0] + 1))
+    return np.packbits(bits, axis=1).view(">u2").ravel().astype(np.uint16)
+
+def read_hack(file_path):
+    """ Returns uint16 array of words in .hack file. """
+    with open(file_path, "rb") as file:
+        return decode_hack(file.read())
+
+def disassemble(words):
+    """ Returns array with mnemonic of every word. """
+    return MNEMONICS[np.asarray(words, dtype=np.uint16)]
+
+def words_to_binary(words):
+    """ Returns array with every word as 16 binary digits. """
+    words = np.asarray(words, dtype=">u2")
+    bits  = np.unpackbits(words.view(np.uint8)) + np.uint8(ZERO)
+    return bits.view("S16").astype(str)
+
+def listing(words):
+    """
+    Returns list of lines with binary word and its mnemonic, same text as rows of destination and comparison docks.
+    """
+    return np.char.add(np.char.add(words_to_binary(words), LISTING_SEPARATOR), disassemble(words)).tolist()
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Disassemble hack file.")
+    parser.add_argument("file", help="Hack file")
+    parser.add_argument("-b", "--binary", action="store_true", help="Show binary words next to mnemonics")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    words = read_hack(arguments.file)
+    lines = listing(words) if arguments.binary else disassemble(words).tolist()
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stderr.write("Disassembled {0} words in {1:.3f}s\n".format(len(words), time.perf_counter() - start))
@@ -0,0 +1,235 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_emulator.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Hack CPU emulator.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import sys
+import time
+import argparse
+from array import array
+
+# Memory map.
+RAM_SIZE = 32768
+ROM_SIZE = 32768
+SCREEN   = 16384
+KEYBOARD = 24576
+
+WORD_MASK = 0xFFFF
+SIGN_BIT  = 0x8000
+
+# Destination and jump bits of C instruction.
+DESTINATION_A = 0b100
+DESTINATION_D = 0b010
+DESTINATION_M = 0b001
+JUMP_LESS     = 0b100
+JUMP_EQUAL    = 0b010
+JUMP_GREATER  = 0b001
+JUMP_ALWAYS   = 0b111
+
+# Computation of every ALU control code used by assembler, y is A or M.
+COMPUTATIONS = {
+    0b101010: lambda d, y: 0,
+    0b111111: lambda d, y: 1,
+    0b111010: lambda d, y: WORD_MASK,
+    0b001100: lambda d, y: d,
+    0b110000: lambda d, y: y,
+    0b001101: lambda d, y: d ^ WORD_MASK,
+    0b110001: lambda d, y: y ^ WORD_MASK,
+    0b001111: lambda d, y: -d & WORD_MASK,
+    0b110011: lambda d, y: -y & WORD_MASK,
+    0b011111: lambda d, y: (d + 1) & WORD_MASK,
+    0b110111: lambda d, y: (y + 1) & WORD_MASK,
+    0b001110: lambda d, y: (d - 1) & WORD_MASK,
+    0b110010: lambda d, y: (y - 1) & WORD_MASK,
+    0b000010: lambda d, y: (d + y) & WORD_MASK,
+    0b010011: lambda d, y: (d - y) & WORD_MASK,
+    0b000111: lambda d, y: (y - d) & WORD_MASK,
+    0b000000: lambda d, y: d & y,
+    0b010101: lambda d, y: d | y,
+}
+
+def alu_computation(control):
+    """
+    Returns computation for any 6 bit ALU control code, codes assembler never emits are computed like hardware does.
+    """
+    computation = COMPUTATIONS.get(control)
+    if computation is not None:
+        return computation
+
+    zx, nx, zy, ny, f, no = [(control >> shift) & 1 for shift in range(5, -1, -1)]
+
+    def compute(d, y):
+        x = 0 if zx else d
+        x = x ^ WORD_MASK if nx else x
+        y = 0 if zy else y
+        y = y ^ WORD_MASK if ny else y
+        out = (x + y) & WORD_MASK if f else x & y
+        return out ^ WORD_MASK if no else out
+    return compute
+
+def jump_taken(jump, value):
+    """ Returns True if jump condition holds for 16 bit ALU output. """
+    if value == 0:
+        return jump & JUMP_EQUAL != 0
+    if value & SIGN_BIT:
+        return jump & JUMP_LESS != 0
+    return jump & JUMP_GREATER != 0
+
+def decode(word):
+    """
+    Decode one instruction, A instruction is decoded as its value and C instruction as tuple
+    (computation, reads memory, writes A, writes D, writes memory, jump).
+    """
+    if not word & SIGN_BIT:
+        return word
+    return (alu_computation((word >> 6) & 0b111111), (word >> 12) & 1,
+            (word >> 3) & DESTINATION_A, (word >> 3) & DESTINATION_D, (word >> 3) & DESTINATION_M, word & JUMP_ALWAYS)
+
+def find_halt_addresses(words):
+    """
+    Returns addresses of halt idiom (END) @END 0;JMP, infinite loop on single address.
+    """
+    halts = set()
+    for address in range(len(words) - 1):
+        word, following = words[address], words[address + 1]
+        if word == address and following & SIGN_BIT and following & JUMP_ALWAYS == JUMP_ALWAYS and not (following >> 3) & 0b111:
+            halts.add(address)
+    return halts
+
+class HackEmulator(object):
+
+    def __init__(self, words=None):
+        """
+        Constructs Hack CPU emulator, program words are decoded once when they are loaded.
+        """
+        self.ram          = array("H", bytes(RAM_SIZE * 2))
+        self.rom          = array("H")
+        self.operations   = []
+        self.halts        = set()
+        self.instructions = 0       # Instructions executed since reset
+        self.seconds      = 0.0     # Time spent in run since reset
+        self.reset()
+        if words is not None:
+            self.load(words)
+
+    def load(self, words):
+        """
+        Load program into ROM and decode it, CPU is reset.
+        """
+        if len(words) > ROM_SIZE:
+            raise ValueError("Program does not fit in ROM: {0} words".format(len(words)))
+        self.rom = array("H", words)
+        self.decode_rom()
+        self.reset()
+
+    def decode_rom(self):
+        """
+        Decode whole ROM, halt addresses are decoded as None so execution stops when it reaches them.
+        """
+        self.operations = [decode(word) for word in self.rom]
+        self.halts      = find_halt_addresses(self.rom)
+        for address in self.halts:
+            self.operations[address] = None
+
+    def write_rom(self, address, word):
+        """
+        Change one instruction in ROM.
+        """
+        self.rom[address] = word
+        self.decode_rom()
+
+    def reset(self):
+        """
+        Reset registers and clear memory.
+        """
+        self.a            = 0
+        self.d            = 0
+        self.pc           = 0
+        self.ram[:]       = array("H", bytes(RAM_SIZE * 2))
+        self.instructions = 0
+        self.seconds      = 0.0
+
+    @property
+    def halted(self):
+        """ True when program reached halt idiom or ran past end of ROM. """
+        return self.pc in self.halts or self.pc >= len(self.operations)
+
+    @property
+    def instructions_per_second(self):
+        return self.instructions / self.seconds if self.seconds else 0.0
+
+    def step(self):
+        """ Execute one instruction. """
+        return self.run(1)
+
+    def run(self, max_instructions=None):
+        """
+        Execute until program halts or max instructions are executed, returns number of executed instructions.
+        """
+        operations = self.operations
+        ram        = self.ram
+        size       = len(operations)
+        a, d, pc   = self.a, self.d, self.pc
+        limit      = max_instructions if max_instructions is not None else -1
+        executed   = 0
+        start      = time.perf_counter()
+
+        while executed != limit and pc < size:
+            operation = operations[pc]
+
+            if operation.__class__ is int:
+                a         = operation
+                pc       += 1
+                executed += 1
+                continue
+
+            if operation is None:
+                break
+
+            executed += 1
+            computation, reads_memory, writes_a, writes_d, writes_memory, jump = operation
+            value = computation(d, ram[a & 0x7FFF] if reads_memory else a)
+
+            if writes_memory:
+                ram[a & 0x7FFF] = value
+            if writes_d:
+                d = value
+
+            if jump and (jump == JUMP_ALWAYS or jump_taken(jump, value)):
+                pc = a
+            else:
+                pc += 1
+
+            if writes_a:
+                a = value
+
+        self.seconds      += time.perf_counter() - start
+        self.instructions += executed
+        self.a, self.d, self.pc = a, d, pc
+        return executed
+
+if __name__ == "__main__":
+
+    from src.hack_rom import read_words
+
+    parser = argparse.ArgumentParser(description="Run hack program and report emulator speed.")
+    parser.add_argument("program", help="Program ROM file (.hack, .bin, .hex, .img, .mem)")
+    parser.add_argument("-n", "--instructions", type=int, default=None, help="Maximum number of instructions")
+    parser.add_argument("-r", "--ram", type=int, default=16, help="Number of RAM words to print")
+    arguments = parser.parse_args()
+
+    emulator = HackEmulator(read_words(arguments.program))
+    emulator.run(arguments.instructions)
+
+    print("[{0}] {1} instructions in {2:.3f}s, {3:.0f} instructions per second".format(
+        "+" if emulator.halted else "-", emulator.instructions, emulator.seconds, emulator.instructions_per_second))
+    print(" ".join("RAM[{0}]={1}".format(address, emulator.ram[address]) for address in range(arguments.ram)))
+    sys.exit(0 if emulator.halted else 1)
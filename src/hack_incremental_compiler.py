@@ -0,0 +1,348 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_incremental_compiler.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Incremental hack assembly compiler.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+from array     import array
+from itertools import compress
+from operator  import attrgetter
+from src.hack_compiler import HackAssemblyCompiler, CompilationStatistics, InvalidSyntaxException, Diagnostic, \
+                              tokenize_line, LABEL, A_SYMBOL, MAX_A_VALUE, RANGE_ERROR
+
+# Number of lines compared at once while looking for changed region.
+DIFF_CHUNK_SIZE = 1024
+
+# Number of lines tokenized or encoded between two progress reports.
+PROGRESS_CHUNK_SIZE = 16384
+
+class CompilationCancelledException(Exception):
+    pass
+
+class SourceLine(object):
+    """
+    Tokenized source line with its encoded word.
+    """
+    __slots__ = ("kind", "value", "word")
+
+    def __init__(self, kind, value):
+        self.kind  = kind
+        self.value = value
+        self.word  = None
+
+class IncrementalHackAssemblyCompiler(object):
+
+    def __init__(self, cache=None, collect_diagnostics=False):
+        """
+        Constructs incremental compiler, it keeps encoded lines and symbol table between updates
+        and only encodes changed lines and instructions that reference moved symbols.
+        First compilation result is taken from cache (HackAssemblyCache) when it is provided.
+        When collecting diagnostics update does not raise, all errors are returned by diagnostics.
+        """
+        self.__cache               = cache
+        self.__collect_diagnostics = collect_diagnostics
+        self.__encoder             = HackAssemblyCompiler(None, None)
+        self.__predefined          = dict(self.__encoder.SYMBOLS)
+        self.rewind()
+
+    def rewind(self):
+        """
+        Forget all state, next update will compile whole source.
+        """
+        self.__lines          = []
+        self.__cells          = []
+        self.__is_instruction = bytearray()
+        self.__is_label       = bytearray()
+        self.__is_symbol      = bytearray()
+        self.__labels         = {}
+        self.__variables      = {}
+        self.__references     = {}
+        self.__errors         = set()
+        self.__words          = None
+        self.__program_counter_buffer = None
+        self.__cached_text    = None
+        self.statistics       = CompilationStatistics()
+
+    def update(self, text, progress=None):
+        """
+        Compile new version of source text, raises InvalidSyntaxException for first invalid line
+        unless diagnostics are collected. Statistics of last update are kept in statistics.
+        Progress is called with phase name, done and total lines, it can stop update by raising
+        CompilationCancelledException. State is kept when update stops before it starts changing,
+        otherwise next update compiles whole source again.
+        """
+        self.__changing = False
+        try:
+            self.__update(text, progress or (lambda phase, done, total: None))
+        except CompilationCancelledException:
+            if self.__changing:
+                self.rewind()
+            raise
+
+    def __update(self, text, progress):
+        statistics = self.statistics = CompilationStatistics()
+
+        # Without previous state result can be taken from cache, lines are tokenized on first change
+        if not self.__lines and self.__cache is not None:
+            if text == self.__cached_text:
+                statistics.cache_hit    = True
+                statistics.instructions = len(self.__words)
+                return
+            with statistics.phase("cache"):
+                cached = self.__cache.load(text)
+            if cached is not None:
+                self.__words, self.__program_counter_buffer = cached
+                self.__cached_text      = text
+                statistics.cache_hit    = True
+                statistics.instructions = len(self.__words)
+                return
+
+        cold = not self.__lines
+        self.__cached_text = None
+
+        progress("diff", 0, 1)
+        with statistics.phase("diff"):
+            lines = text.split("\n")
+            first, old_end, new_end = self.__find_changed_region(lines)
+
+        with statistics.phase("tokenize"):
+            old_cells = self.__cells[first:old_end]
+            new_cells = []
+            for start in range(first, new_end, PROGRESS_CHUNK_SIZE):
+                progress("tokenize", start - first, new_end - first)
+                new_cells.extend([self.__tokenize(line) for line in lines[start:min(start + PROGRESS_CHUNK_SIZE, new_end)]])
+
+            self.__changing = True
+
+            for cell in old_cells:
+                if cell is not None:
+                    self.__errors.discard(cell)
+                    if cell.kind == A_SYMBOL:
+                        references = self.__references[cell.value]
+                        references.discard(cell)
+                        if not references:
+                            del self.__references[cell.value]
+
+            for cell in new_cells:
+                if cell is not None and cell.kind == A_SYMBOL:
+                    self.__references.setdefault(cell.value, set()).add(cell)
+
+            old_instructions = self.__is_instruction.count(1, first, old_end)
+
+            self.__lines = lines
+            self.__cells[first:old_end] = new_cells
+            self.__is_instruction[first:old_end] = bytes([cell is not None and cell.kind != LABEL for cell in new_cells])
+            self.__is_label[first:old_end]       = bytes([cell is not None and cell.kind == LABEL for cell in new_cells])
+            self.__is_symbol[first:old_end]      = bytes([cell is not None and cell.kind == A_SYMBOL for cell in new_cells])
+
+        moved = set()
+
+        old_labels = self.__label_offsets(old_cells)
+        new_labels = self.__label_offsets(new_cells)
+
+        # Labels only move when instruction count or labels and their offsets in changed region are different
+        labels_changed = [name for name, _ in old_labels] != [name for name, _ in new_labels]
+        if old_labels != new_labels or old_instructions != self.__is_instruction.count(1, first, new_end):
+            progress("labels", 0, 1)
+            with statistics.phase("labels"):
+                moved.update(self.__process_labels())
+
+        # Variables only move when order of first use of symbols in changed region is different
+        if labels_changed or self.__variables_in_order(old_cells) != self.__variables_in_order(new_cells):
+            progress("variables", 0, 1)
+            with statistics.phase("variables"):
+                moved.update(self.__process_variables())
+
+        with statistics.phase("code"):
+            for start in range(0, len(new_cells), PROGRESS_CHUNK_SIZE):
+                progress("code", start, len(new_cells))
+                for cell in new_cells[start:start + PROGRESS_CHUNK_SIZE]:
+                    if cell is not None and cell.kind != LABEL:
+                        self.__encode(cell)
+
+            for symbol_name in moved:
+                for cell in self.__references.get(symbol_name, ()):
+                    self.__encode(cell)
+
+        self.__words = None
+        self.__program_counter_buffer = None
+
+        statistics.instructions = self.__is_instruction.count(1)
+        statistics.labels       = len(self.__labels)
+        statistics.variables    = len(self.__variables)
+
+        if self.__errors:
+            if not self.__collect_diagnostics:
+                raise self.__error(self.__error_indices()[0])
+            return
+
+        if cold and self.__cache is not None:
+            with statistics.phase("cache"):
+                self.__cache.store(text, self.words, self.program_counter_and_lines)
+
+    def __find_changed_region(self, lines):
+        """
+        Returns first changed line and end of changed region in old and new lines.
+        """
+        old   = self.__lines
+        limit = min(len(old), len(lines))
+
+        first = 0
+        while first + DIFF_CHUNK_SIZE <= limit and old[first:first + DIFF_CHUNK_SIZE] == lines[first:first + DIFF_CHUNK_SIZE]:
+            first += DIFF_CHUNK_SIZE
+        while first < limit and old[first] == lines[first]:
+            first += 1
+
+        old_end = len(old)
+        new_end = len(lines)
+        while min(old_end, new_end) - DIFF_CHUNK_SIZE >= first and \
+              old[old_end - DIFF_CHUNK_SIZE:old_end] == lines[new_end - DIFF_CHUNK_SIZE:new_end]:
+            old_end -= DIFF_CHUNK_SIZE
+            new_end -= DIFF_CHUNK_SIZE
+        while old_end > first and new_end > first and old[old_end - 1] == lines[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+
+        return first, old_end, new_end
+
+    def __tokenize(self, line):
+        token = tokenize_line(line)
+        if token is None:
+            return None
+        return SourceLine(token[0], token[1])
+
+    def __label_offsets(self, cells):
+        """
+        Returns labels in cells as (name, number of instructions in cells before label).
+        """
+        labels       = []
+        instructions = 0
+        for cell in cells:
+            if cell is None:
+                continue
+            if cell.kind == LABEL:
+                labels.append((cell.value, instructions))
+            else:
+                instructions += 1
+        return labels
+
+    def __variables_in_order(self, cells):
+        """
+        Returns symbols used in cells that are not labels or predefined, in order of first use.
+        """
+        symbols = dict.fromkeys([cell.value for cell in cells if cell is not None and cell.kind == A_SYMBOL])
+        return [name for name in symbols if name not in self.__predefined and name not in self.__labels]
+
+    def __process_labels(self):
+        """
+        Recompute label addresses, returns names of labels that moved, appeared or disappeared.
+        """
+        labels          = {}
+        program_counter = 0
+        start           = 0
+        index           = self.__is_label.find(1)
+
+        while index != -1:
+            program_counter += self.__is_instruction.count(1, start, index)
+            name = self.__cells[index].value
+            if name not in labels and name not in self.__predefined:
+                labels[name] = program_counter
+            start = index
+            index = self.__is_label.find(1, index + 1)
+
+        moved = self.__changed_symbols(self.__labels, labels)
+        self.__labels = labels
+        return moved
+
+    def __process_variables(self):
+        """
+        Reallocate variables in order of first use, returns names of variables that moved.
+        """
+        variables = {}
+        next_symbol_value = self.__encoder.NEXT_SYMBOL_VALUE
+
+        for name in dict.fromkeys(map(attrgetter("value"), compress(self.__cells, self.__is_symbol))):
+            if name in self.__predefined or name in self.__labels:
+                continue
+            variables[name] = next_symbol_value
+            next_symbol_value += 1
+
+        moved = self.__changed_symbols(self.__variables, variables)
+        self.__variables = variables
+        return moved
+
+    def __changed_symbols(self, old, new):
+        changed = set(old.keys() ^ new.keys())
+        for name, value in new.items():
+            if name in old and old[name] != value:
+                changed.add(name)
+        return changed
+
+    def __resolve(self, symbol_name):
+        if symbol_name in self.__predefined:
+            return self.__predefined[symbol_name]
+        if symbol_name in self.__labels:
+            return self.__labels[symbol_name]
+        return self.__variables[symbol_name]
+
+    def __encode(self, cell):
+        try:
+            if cell.kind == A_SYMBOL:
+                cell.word = self.__resolve(cell.value)
+                if cell.word > MAX_A_VALUE:
+                    raise InvalidSyntaxException("You can only use 15bit numbers!", None, 1, RANGE_ERROR)
+            else:
+                cell.word = self.__encoder.encode(cell.kind, 0, cell.value)
+            self.__errors.discard(cell)
+        except InvalidSyntaxException:
+            cell.word = 0
+            self.__errors.add(cell)
+
+    def __error_indices(self):
+        """
+        Returns sorted indices of lines with errors.
+        """
+        errors = self.__errors
+        return [index for index, cell in enumerate(self.__cells) if cell in errors]
+
+    def __error(self, index):
+        """
+        Returns exception for invalid line on given index.
+        """
+        cell = self.__cells[index]
+        if cell.kind == A_SYMBOL:
+            return InvalidSyntaxException("You can only use 15bit numbers!", index + 1, 1, RANGE_ERROR)
+        try:
+            self.__encoder.encode(cell.kind, index + 1, cell.value)
+        except InvalidSyntaxException as e:
+            return e
+
+    @property
+    def diagnostics(self):
+        """ All errors of last update ordered by line. """
+        if not self.__errors:
+            return []
+        return [Diagnostic.from_exception(self.__error(index), self.__lines[index]) for index in self.__error_indices()]
+
+    @property
+    def binary_data(self):
+        return [format(word, "016b") for word in self.words]
+
+    @property
+    def words(self):
+        if self.__words is None:
+            self.__words = array("H", [cell.word for cell in compress(self.__cells, self.__is_instruction)])
+        return self.__words
+
+    @property
+    def program_counter_and_lines(self):
+        if self.__program_counter_buffer is None:
+            self.__program_counter_buffer = dict(enumerate(compress(range(1, len(self.__cells) + 1), self.__is_instruction)))
+        return self.__program_counter_buffer
@@ -0,0 +1,288 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_linker.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Hack assembly module assembler and linker.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+
+    Linked program is same as program compiled from concatenated modules: labels are
+    global and first definition wins, variables are allocated from 16 in order of first
+    use over all modules in link order.
+"""
+import os
+import sys
+import struct
+import argparse
+from array             import array
+from src.hack_compiler import HackAssemblyCompiler, CompilationStatistics, InvalidSyntaxException, \
+                              tokenize, LABEL, A_SYMBOL, MAX_A_VALUE
+from src.hack_cache    import HackAssemblyCache, DEFAULT_CACHE_DIRECTORY
+from src.hack_rom      import write_rom
+
+# Object file header: magic, number of words, exported labels, used symbols and relocations.
+# Words (16 bit), source lines of words, label addresses, relocation offsets and symbol indices
+# (32 bit) follow header in native byte order, then label and symbol names separated by new lines.
+OBJECT_MAGIC  = b"HACKOBJ\0"
+OBJECT_HEADER = struct.Struct("=8sIIII")
+OBJECT_EXTENSION = ".obj"
+
+class LinkException(Exception):
+    pass
+
+class InvalidObjectException(Exception):
+    pass
+
+class HackObject(object):
+
+    def __init__(self):
+        """
+        Constructs empty object of one assembled module. Instructions that use labels or variables
+        are left as 0 and listed in relocations, they are resolved when modules are linked.
+        """
+        self.words              = array("H")
+        self.lines              = array("I")
+        self.labels             = {}            # Exported label name -> address in module
+        self.symbols            = []            # Non predefined symbols in order of first use
+        self.relocation_offsets = array("I")    # Address of instruction in module
+        self.relocation_symbols = array("I")    # Index of symbol used by instruction
+
+    @property
+    def imports(self):
+        """ Symbols that must be defined by other modules or allocated as variables. """
+        return [name for name in self.symbols if name not in self.labels]
+
+    def to_bytes(self):
+        names = "\n".join(list(self.labels) + self.symbols).encode("utf-8")
+        return OBJECT_HEADER.pack(OBJECT_MAGIC, len(self.words), len(self.labels), len(self.symbols), len(self.relocation_offsets)) + \
+               self.words.tobytes() + self.lines.tobytes() + array("I", self.labels.values()).tobytes() + \
+               self.relocation_offsets.tobytes() + self.relocation_symbols.tobytes() + names
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, words_count, labels_count, symbols_count, relocations_count = OBJECT_HEADER.unpack_from(data)
+        except struct.error:
+            raise InvalidObjectException("Invalid object header")
+        if magic != OBJECT_MAGIC:
+            raise InvalidObjectException("Invalid object header")
+
+        hack_object = cls()
+        position    = OBJECT_HEADER.size
+        addresses   = array("I")
+        for values, count in ((hack_object.words, words_count), (hack_object.lines, words_count), (addresses, labels_count),
+                              (hack_object.relocation_offsets, relocations_count), (hack_object.relocation_symbols, relocations_count)):
+            end = position + count * values.itemsize
+            if end > len(data):
+                raise InvalidObjectException("Truncated object")
+            values.frombytes(data[position:end])
+            position = end
+
+        names = data[position:].decode("utf-8").split("\n") if labels_count + symbols_count else []
+        if len(names) != labels_count + symbols_count:
+            raise InvalidObjectException("Invalid object symbol table")
+
+        hack_object.labels  = dict(zip(names[:labels_count], addresses))
+        hack_object.symbols = names[labels_count:]
+        return hack_object
+
+def assemble_module(source):
+    """
+    Assemble source of one module into object, predefined symbols and constants are encoded right away.
+    """
+    encoder     = HackAssemblyCompiler(None, None)
+    predefined  = encoder.SYMBOLS
+    hack_object = HackObject()
+    indices     = {}
+
+    for kind, line_number, value in tokenize(source.split("\n")):
+
+        if kind == LABEL:
+            if value not in predefined:
+                hack_object.labels.setdefault(value, len(hack_object.words))
+            continue
+
+        if kind == A_SYMBOL and value not in predefined:
+            index = indices.get(value)
+            if index is None:
+                index = indices[value] = len(hack_object.symbols)
+                hack_object.symbols.append(value)
+            hack_object.relocation_offsets.append(len(hack_object.words))
+            hack_object.relocation_symbols.append(index)
+            word = 0
+        else:
+            word = encoder.encode(kind, line_number, value)
+
+        hack_object.words.append(word)
+        hack_object.lines.append(line_number)
+
+    return hack_object
+
+class HackLinker(object):
+
+    def __init__(self, modules, out_file=None, cache_directory=DEFAULT_CACHE_DIRECTORY):
+        """
+        Constructs linker for list of hack assembly modules, linked in given order. Objects of modules are
+        kept between builds and stored in cache, so only changed modules are assembled again.
+        Cache is not used when cache directory is None.
+        """
+        self.modules    = list(modules)
+        self.out_file   = out_file
+        self.cache      = HackAssemblyCache(cache_directory) if cache_directory is not None else None
+        self.statistics = CompilationStatistics()
+        self.assembled  = []     # Modules assembled in last build
+        self.reused     = []     # Modules taken from memory or cache in last build
+
+        self.__objects                = {}   # Module file -> (modification time, size, object)
+        self.__words                  = array("H")
+        self.__program_counter_buffer = {}
+        self.__module_ranges          = []
+
+    def object_for_module(self, module_file):
+        """
+        Returns object of module, it is assembled only if module changed since it was last assembled.
+        """
+        status = os.stat(module_file)
+        known  = self.__objects.get(module_file)
+        if known is not None and known[0] == status.st_mtime_ns and known[1] == status.st_size:
+            self.reused.append(module_file)
+            return known[2]
+
+        with open(module_file, "r") as file:
+            source = file.read()
+
+        hack_object = None
+        key         = None
+        if self.cache is not None:
+            key  = self.cache.key(source)
+            data = self.cache.read(key, OBJECT_EXTENSION)
+            if data is not None:
+                try:
+                    hack_object = HackObject.from_bytes(data)
+                except (InvalidObjectException, UnicodeDecodeError):
+                    hack_object = None
+
+        if hack_object is not None:
+            self.reused.append(module_file)
+        else:
+            try:
+                hack_object = assemble_module(source)
+            except InvalidSyntaxException as e:
+                raise LinkException("{0}:{1}".format(module_file, e))
+            self.assembled.append(module_file)
+            if self.cache is not None:
+                self.cache.write(key, hack_object.to_bytes(), OBJECT_EXTENSION)
+
+        self.__objects[module_file] = (status.st_mtime_ns, status.st_size, hack_object)
+        return hack_object
+
+    def build(self):
+        """
+        Assemble changed modules, link all objects and write program to output file if it is set.
+        """
+        statistics = self.statistics = CompilationStatistics()
+        self.assembled = []
+        self.reused    = []
+
+        with statistics.phase("assemble"):
+            objects = [self.object_for_module(module_file) for module_file in self.modules]
+
+        with statistics.phase("link"):
+            self.link(objects)
+
+        statistics.instructions = len(self.__words)
+        if self.out_file is not None:
+            with statistics.phase("write"):
+                write_rom(self.__words, self.out_file)
+            statistics.bytes_written = os.path.getsize(self.out_file)
+
+        return self.__words
+
+    def link(self, objects):
+        """
+        Place objects one after another and resolve relocations.
+        """
+        labels = {}
+        base   = 0
+        for hack_object in objects:
+            for name, address in hack_object.labels.items():
+                labels.setdefault(name, base + address)
+            base += len(hack_object.words)
+
+        variables         = {}
+        next_symbol_value = 16
+        words             = array("H")
+        lines             = array("I")
+        module_ranges     = []
+
+        for module_file, hack_object in zip(self.modules, objects):
+            base = len(words)
+            words.extend(hack_object.words)
+            lines.extend(hack_object.lines)
+            module_ranges.append((module_file, base, len(words)))
+
+            addresses = []
+            for name in hack_object.symbols:
+                address = labels.get(name)
+                if address is None:
+                    address = variables.get(name)
+                    if address is None:
+                        address = variables[name] = next_symbol_value
+                        next_symbol_value += 1
+                addresses.append(address)
+
+            for offset, index in zip(hack_object.relocation_offsets, hack_object.relocation_symbols):
+                address = addresses[index]
+                if address > MAX_A_VALUE:
+                    raise LinkException("{0}:{1}:{2}".format(module_file, hack_object.lines[offset], "You can only use 15bit numbers!"))
+                words[base + offset] = address
+
+        self.statistics.labels    = len(labels)
+        self.statistics.variables = len(variables)
+
+        self.__words                  = words
+        self.__program_counter_buffer = dict(enumerate(lines))
+        self.__module_ranges          = module_ranges
+
+    def module_at(self, program_counter):
+        """
+        Returns module file that contains instruction on given address or None.
+        """
+        for module_file, start, end in self.__module_ranges:
+            if start <= program_counter < end:
+                return module_file
+        return None
+
+    @property
+    def words(self):
+        return self.__words
+
+    @property
+    def program_counter_and_lines(self):
+        """ Address of every instruction mapped to line in its module, see module_at. """
+        return self.__program_counter_buffer
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Assemble and link hack assembly modules.")
+    parser.add_argument("out_file", help="Output ROM file, format is taken from extension")
+    parser.add_argument("modules", nargs="+", help="Modules in link order")
+    parser.add_argument("-c", "--cache", default=DEFAULT_CACHE_DIRECTORY, help="Cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use cache")
+    arguments = parser.parse_args()
+
+    linker = HackLinker(arguments.modules, arguments.out_file, None if arguments.no_cache else arguments.cache)
+    try:
+        linker.build()
+    except (LinkException, InvalidSyntaxException, OSError) as e:
+        print("[-] {0}".format(e))
+        sys.exit(1)
+
+    print("[+] Linked {0} modules ({1} assembled, {2} reused) into {3}".format(
+        len(linker.modules), len(linker.assembled), len(linker.reused), arguments.out_file))
+    print(linker.statistics.summary())
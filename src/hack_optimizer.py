@@ -0,0 +1,208 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_optimizer.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Peephole optimizer for tokenized hack assembly.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+
+    Rewrites keep behaviour of program the same, only instructions whose effect is
+    not observable are removed:
+        @X ... @X       Second load is removed when nothing in between changes A or is label
+        @X @Y           First load is removed, A is overwritten before it is used
+        M=M+1 M=M-1     Increment and decrement of same address are removed or folded
+        @L D;JGT (L)    Jump to next instruction loses jump bits, instruction and load
+                        are removed when they have no other effect
+"""
+from src.hack_compiler import C_INSTRUCTIONS, COMPARISONS, LABEL, A_ADDRESS, A_SYMBOL, C_INSTRUCTION, MAX_A_VALUE
+
+# Bits of encoded C instruction.
+JUMP_BITS        = 0b111
+DESTINATION_BITS = 0b111 << 3
+DESTINATION_A    = 0b100 << 3
+DESTINATION_M    = 0b001 << 3
+
+# Comparisons that read A or memory at address A.
+ADDRESS_COMPARISONS = { bits for name, bits in COMPARISONS.items() if "A" in name or "M" in name }
+
+# Two instructions on same address and instruction they fold into, None when both are removed.
+FOLDS = {
+    (C_INSTRUCTIONS["M=M+1"], C_INSTRUCTIONS["M=M-1"]):  None,
+    (C_INSTRUCTIONS["M=M-1"], C_INSTRUCTIONS["M=M+1"]):  None,
+    (C_INSTRUCTIONS["M=M+1"], C_INSTRUCTIONS["AM=M-1"]): C_INSTRUCTIONS["A=M"],
+    (C_INSTRUCTIONS["M=M-1"], C_INSTRUCTIONS["AM=M+1"]): C_INSTRUCTIONS["A=M"],
+    (C_INSTRUCTIONS["M=M+1"], C_INSTRUCTIONS["MD=M-1"]): C_INSTRUCTIONS["D=M"],
+    (C_INSTRUCTIONS["M=M-1"], C_INSTRUCTIONS["MD=M+1"]): C_INSTRUCTIONS["D=M"],
+}
+
+# Passes are repeated while they remove instructions, one rewrite often enables another.
+MAX_PASSES = 8
+
+def is_address(token):
+    return token[0] == A_ADDRESS or token[0] == A_SYMBOL
+
+def is_removable_address(token):
+    """ Load that can be removed, out of range addresses are left for compiler to report. """
+    return token[0] == A_SYMBOL or (token[0] == A_ADDRESS and token[2] <= MAX_A_VALUE)
+
+def is_encoded_c_instruction(token):
+    """ Valid C instruction, invalid ones are left for compiler to report. """
+    return token[0] == C_INSTRUCTION and isinstance(token[2], int)
+
+def uses_address(word):
+    """ Returns True if C instruction reads A, reads memory or writes memory. """
+    return (word >> 6) & 0b1111111 in ADDRESS_COMPARISONS or word & DESTINATION_M != 0
+
+class PeepholeOptimizer(object):
+
+    def __init__(self, symbols):
+        """
+        Constructs optimizer, symbols are predefined symbols of compiler. They are used to
+        recognize loads of same address written differently (@R0 and @SP) and labels that are ignored.
+        """
+        self.symbols = symbols
+        self.saved   = 0
+        self.rules   = { "reload": 0, "dead_load": 0, "fold": 0, "jump_to_next": 0 }
+
+    def optimize(self, tokens):
+        """
+        Returns optimized list of (kind, line number, value) tokens.
+        """
+        count = self.__instructions_count(tokens)
+        for _ in range(MAX_PASSES):
+            before = len(tokens)
+            tokens = self.__remove_jumps_to_next(tokens)
+            tokens = self.__remove_redundant_loads(tokens)
+            if len(tokens) == before:
+                break
+        self.saved += count - self.__instructions_count(tokens)
+        return tokens
+
+    def __instructions_count(self, tokens):
+        return sum(1 for token in tokens if token[0] != LABEL)
+
+    def __address_key(self, token):
+        kind, _, value = token
+        if kind == A_SYMBOL and value in self.symbols:
+            return self.symbols[value]
+        return value
+
+    def __remove_redundant_loads(self, tokens):
+        """
+        Forward pass that tracks value loaded in A register.
+        """
+        result  = []
+        address = None      # Value of last load while A is not changed, None when unknown
+
+        for token in tokens:
+            kind = token[0]
+
+            if kind == LABEL:
+                # Jump can enter here with any value in A
+                address = None
+                result.append(token)
+                continue
+
+            if is_address(token):
+                key = self.__address_key(token)
+                if key == address:
+                    self.rules["reload"] += 1
+                    continue
+                if result and is_removable_address(result[-1]):
+                    self.rules["dead_load"] += 1
+                    result.pop()
+                address = key
+                result.append(token)
+                continue
+
+            if not is_encoded_c_instruction(token):
+                address = None
+                result.append(token)
+                continue
+
+            word = token[2]
+            if result and is_encoded_c_instruction(result[-1]) and result[-1][2] & JUMP_BITS == 0 and (result[-1][2], word) in FOLDS:
+                self.rules["fold"] += 1
+                previous = result.pop()
+                folded   = FOLDS[(previous[2], word)]
+                if folded is not None:
+                    result.append((C_INSTRUCTION, previous[1], folded))
+                    word = folded
+                else:
+                    continue
+
+            else:
+                result.append(token)
+
+            if word & DESTINATION_A:
+                address = None
+
+        return result
+
+    def __remove_jumps_to_next(self, tokens):
+        """
+        Remove jumps whose target label is defined right after jump instruction.
+        """
+        result  = []
+        defined = set()     # Labels defined so far, only first definition of label is used
+        index   = 0
+
+        while index < len(tokens):
+            token = tokens[index]
+
+            if token[0] == LABEL:
+                defined.add(token[2])
+                result.append(token)
+                index += 1
+                continue
+
+            if token[0] != A_SYMBOL or index + 1 >= len(tokens):
+                result.append(token)
+                index += 1
+                continue
+
+            jump = tokens[index + 1]
+            if not is_encoded_c_instruction(jump) or jump[2] & JUMP_BITS == 0 or \
+               not self.__is_next_label(tokens, index + 2, token[2], defined):
+                result.append(token)
+                index += 1
+                continue
+
+            self.rules["jump_to_next"] += 1
+            word = jump[2] & ~JUMP_BITS
+
+            # Load is only needed if instruction uses address or next instruction reads A
+            following = self.__next_instruction(tokens, index + 2)
+            keep_load = (word & DESTINATION_BITS and uses_address(word)) or \
+                        (following is not None and not is_address(following))
+            if keep_load:
+                result.append(token)
+            if word & DESTINATION_BITS:
+                result.append((C_INSTRUCTION, jump[1], word))
+            index += 2
+
+        return result
+
+    def __is_next_label(self, tokens, index, name, defined):
+        """
+        Returns True if label with name is defined between index and next instruction.
+        """
+        if name in self.symbols or name in defined:
+            return False
+        while index < len(tokens) and tokens[index][0] == LABEL:
+            if tokens[index][2] == name:
+                return True
+            index += 1
+        return False
+
+    def __next_instruction(self, tokens, index):
+        while index < len(tokens):
+            if tokens[index][0] != LABEL:
+                return tokens[index]
+            index += 1
+        return None
@@ -0,0 +1,96 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_profiler.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Execution profile of hack program mapped to source lines.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import sys
+import math
+import argparse
+from src.hack_compiler   import HackAssemblyCompiler
+from src.hack_translator import TranslatingHackEmulator
+
+# Number of hot lines shown by default.
+DEFAULT_TOP_LINES = 10
+
+class HackProfile(object):
+
+    def __init__(self, address_hits, program_counter_and_lines):
+        """
+        Constructs profile from executions of every ROM address and map of ROM address to
+        source line (program_counter_and_lines of compiler). Lines are numbered from 1.
+        """
+        self.address_hits = address_hits
+        self.line_hits    = {}
+        self.total        = 0
+
+        for address, hits in enumerate(address_hits):
+            if not hits:
+                continue
+            line = program_counter_and_lines.get(address)
+            if line is not None:
+                self.line_hits[line] = self.line_hits.get(line, 0) + hits
+            self.total += hits
+
+    def hot_lines(self, count=DEFAULT_TOP_LINES):
+        """
+        Returns list of (line, hits, share of all executed instructions) for count hottest lines.
+        """
+        lines = sorted(self.line_hits.items(), key=lambda item: (-item[1], item[0]))[:count]
+        return [(line, hits, hits / self.total) for line, hits in lines]
+
+    def heat(self):
+        """
+        Returns heat of every executed line from 0 to 1. Scale is logarithmic so lines executed
+        few times are still visible next to inner loops.
+        """
+        if not self.line_hits:
+            return {}
+        hottest = math.log1p(max(self.line_hits.values()))
+        return { line: math.log1p(hits) / hottest for line, hits in self.line_hits.items() }
+
+    def summary(self, source_lines=None, count=DEFAULT_TOP_LINES):
+        """
+        Returns text table of hot lines, with source text when source lines are provided.
+        """
+        lines = ["{0:>8} {1:>14} {2:>7}  {3}".format("Line", "Hits", "Share", "Source" if source_lines else "")]
+        for line, hits, share in self.hot_lines(count):
+            source = source_lines[line - 1].strip() if source_lines and line <= len(source_lines) else ""
+            lines.append("{0:>8} {1:>14} {2:>6.1%}  {3}".format(line, hits, share, source))
+        lines.append("{0} instructions executed on {1} lines".format(self.total, len(self.line_hits)))
+        return "\n".join(lines)
+
+def profile_program(hack_assembly_compiler, max_instructions=None):
+    """
+    Run compiled program with profiling and return tuple (profile, emulator).
+    """
+    emulator = TranslatingHackEmulator(hack_assembly_compiler.words, profiling=True)
+    emulator.run(max_instructions)
+    return HackProfile(emulator.address_hits(), hack_assembly_compiler.program_counter_and_lines), emulator
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Profile hack program and show hottest source lines.")
+    parser.add_argument("file", help="Hack assembly file")
+    parser.add_argument("-n", "--instructions", type=int, default=None, help="Maximum number of instructions")
+    parser.add_argument("-t", "--top", type=int, default=DEFAULT_TOP_LINES, help="Number of hot lines to show")
+    arguments = parser.parse_args()
+
+    hack_assembly_compiler = HackAssemblyCompiler(arguments.file, None)
+    hack_assembly_compiler.compile()
+    profile, emulator = profile_program(hack_assembly_compiler, arguments.instructions)
+
+    with open(arguments.file, "r") as file:
+        source_lines = file.read().split("\n")
+
+    print(profile.summary(source_lines, arguments.top))
+    print("[{0}] {1} instructions in {2:.3f}s, {3:.0f} instructions per second".format(
+        "+" if emulator.halted else "-", emulator.instructions, emulator.seconds, emulator.instructions_per_second))
+    sys.exit(0 if emulator.halted else 1)
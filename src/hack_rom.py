@@ -0,0 +1,179 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_rom.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Hack ROM file formats.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import os
+import sys
+import mmap
+import struct
+from array             import array
+from src.hack_compiler import words_to_text
+
+# Binary ROM header: magic, format version, reserved flags and number of words.
+# Words follow header as little endian 16 bit values.
+ROM_MAGIC         = b"HACKROM\0"
+ROM_VERSION       = 1
+ROM_HEADER        = struct.Struct("<8sHHI")
+
+# Format name for every supported file extension.
+ROM_FORMATS = { ".hack": "hack", ".bin": "binary", ".hex": "hex", ".img": "logisim", ".mem": "verilog" }
+
+# Number of words on one line of Logisim memory image.
+LOGISIM_WORDS_PER_LINE = 8
+
+class InvalidRomException(Exception):
+    pass
+
+def rom_format_for_file(file_path):
+    """
+    Returns format name from file extension, unknown extensions are written as hack text.
+    """
+    return ROM_FORMATS.get(os.path.splitext(file_path)[1].lower(), "hack")
+
+def words_to_bytes(words, byteorder="little"):
+    """
+    Returns words packed as 16 bit values with given byte order.
+    """
+    packed = array("H", words)
+    if sys.byteorder != byteorder:
+        packed.byteswap()
+    return packed.tobytes()
+
+def words_to_hex(words):
+    """
+    Returns words as 4 digit hex values, one per line.
+    """
+    if not len(words):
+        return ""
+    return words_to_bytes(words, "big").hex("\n", 2) + "\n"
+
+def write_rom(words, file_path, rom_format=None):
+    """
+    Write words to file in given format, format is taken from file extension if not provided.
+    """
+    rom_format = rom_format or rom_format_for_file(file_path)
+
+    if rom_format == "binary":
+        with open(file_path, "wb") as file:
+            file.write(ROM_HEADER.pack(ROM_MAGIC, ROM_VERSION, 0, len(words)))
+            file.write(words_to_bytes(words))
+
+    elif rom_format == "hex":
+        with open(file_path, "w") as file:
+            file.write(words_to_hex(words))
+
+    elif rom_format == "logisim":
+        values = words_to_hex(words).split()
+        with open(file_path, "w") as file:
+            file.write("v2.0 raw\n")
+            for i in range(0, len(values), LOGISIM_WORDS_PER_LINE):
+                file.write(" ".join(values[i:i + LOGISIM_WORDS_PER_LINE]) + "\n")
+
+    elif rom_format == "verilog":
+        with open(file_path, "w") as file:
+            file.write("// Hack ROM, {0} words, load with $readmemh\n@0\n".format(len(words)))
+            file.write(words_to_hex(words))
+
+    elif rom_format == "hack":
+        with open(file_path, "w") as file:
+            file.write(words_to_text(words))
+
+    else:
+        raise InvalidRomException("Unknown ROM format: {0}".format(rom_format))
+
+class HackRom(object):
+
+    def __init__(self, file_path):
+        """
+        Map binary ROM file into memory, words are exposed without parsing or copying.
+        """
+        self.file_path = file_path
+        self.words     = None
+        self.__mmap    = None
+        self.__file    = open(file_path, "rb")
+        try:
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__file.close()
+            raise InvalidRomException("Empty ROM file: {0}".format(file_path))
+
+        if len(self.__mmap) < ROM_HEADER.size:
+            self.close()
+            raise InvalidRomException("Invalid ROM header: {0}".format(file_path))
+
+        magic, version, _, count = ROM_HEADER.unpack_from(self.__mmap)
+        if magic != ROM_MAGIC or version != ROM_VERSION or len(self.__mmap) < ROM_HEADER.size + count * 2:
+            self.close()
+            raise InvalidRomException("Invalid ROM header: {0}".format(file_path))
+
+        data = memoryview(self.__mmap)[ROM_HEADER.size:ROM_HEADER.size + count * 2]
+        if sys.byteorder == "little":
+            self.words = data.cast("H")
+        else:
+            self.words = array("H", data)
+            self.words.byteswap()
+            data.release()
+
+    def close(self):
+        """ Release mapped ROM file. """
+        if isinstance(self.words, memoryview):
+            self.words.release()
+        if self.__mmap is not None:
+            self.__mmap.close()
+        self.__file.close()
+
+    def __len__(self):
+        return len(self.words)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+def read_words(file_path):
+    """
+    Read words from ROM file of any supported format into array.
+    """
+    rom_format = rom_format_for_file(file_path)
+
+    if rom_format == "binary":
+        with HackRom(file_path) as rom:
+            return array("H", rom.words)
+
+    with open(file_path, "r") as file:
+        text = file.read()
+
+    if rom_format == "hack":
+        return array("H", [int(line, 2) for line in text.split()])
+
+    if rom_format == "logisim" and text.startswith("v2.0 raw"):
+        text = text[len("v2.0 raw"):]
+    elif rom_format == "verilog":
+        text = "\n".join([line.split("//")[0] for line in text.split("\n")])
+
+    words = array("H")
+    for value in text.split():
+        if value.startswith("@"):
+            continue
+        # Logisim images compress repeated values as count*value
+        count, _, value = value.rpartition("*")
+        words.extend([int(value, 16)] * (int(count) if count else 1))
+    return words
+
+if __name__ == "__main__":
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.hack_rom <input> <output>")
+        sys.exit(1)
+
+    write_rom(read_words(sys.argv[1]), sys.argv[2])
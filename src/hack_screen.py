@@ -0,0 +1,63 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_screen.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Hack screen memory to pixels conversion.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import numpy as np
+from src.hack_emulator import SCREEN
+
+SCREEN_WIDTH         = 512
+SCREEN_HEIGHT        = 256
+SCREEN_WORDS_PER_ROW = SCREEN_WIDTH // 16
+SCREEN_WORDS         = SCREEN_HEIGHT * SCREEN_WORDS_PER_ROW
+
+def screen_memory(ram):
+    """
+    Returns SCREEN region of RAM (array of 16 bit words) as 256 x 32 array of words without copying it.
+    """
+    return np.frombuffer(ram, dtype=np.uint16, count=SCREEN_WORDS, offset=SCREEN * 2).reshape(SCREEN_HEIGHT, SCREEN_WORDS_PER_ROW)
+
+def dirty_bands(rows):
+    """
+    Returns sorted dirty rows grouped into bands of consecutive rows as list of (first row, end row).
+    """
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    return [(int(band[0]), int(band[-1]) + 1) for band in np.split(rows, breaks)]
+
+class HackScreen(object):
+
+    def __init__(self):
+        """
+        Constructs screen with pixel buffer, pixel is 1 when it is black. Pixel buffer never moves
+        in memory so image can be created on top of it.
+        """
+        self.words  = np.zeros((SCREEN_HEIGHT, SCREEN_WORDS_PER_ROW), dtype=np.uint16)
+        self.pixels = np.zeros((SCREEN_HEIGHT, SCREEN_WIDTH), dtype=np.uint8)
+
+    def update(self, ram):
+        """
+        Update pixels from screen memory, returns array of rows that changed since last update.
+        """
+        memory = screen_memory(ram)
+        dirty  = np.flatnonzero((memory != self.words).any(axis=1))
+        if dirty.size:
+            # Copy of changed rows so pixels match words even if RAM is written meanwhile
+            rows = memory[dirty]
+            self.words[dirty]  = rows
+            # Bit 0 of word is leftmost pixel, so little endian bytes unpacked from lowest bit give pixel order
+            self.pixels[dirty] = np.unpackbits(rows.astype("<u2").view(np.uint8), axis=1, bitorder="little")
+        return dirty
+
+    def clear(self):
+        self.words[:]  = 0
+        self.pixels[:] = 0
@@ -0,0 +1,440 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_test_runner.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Headless runner for nand2tetris CPU emulator test scripts.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+
+    Test script (.tst) is list of commands ended by "," ";" or "!":
+
+        load Mult.asm,
+        output-file Mult.out,
+        compare-to Mult.cmp,
+        output-list RAM[0]%D2.6.2 RAM[1]%D2.6.2 RAM[2]%D2.6.2;
+        set RAM[0] 2, set RAM[1] 3;
+        repeat 20 {
+            ticktock;
+        }
+        output;
+
+    Every output line is compared with same line of compare file, "*" in compare file matches any character.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures  import ProcessPoolExecutor
+from src.hack_compiler   import HackAssemblyCompiler
+from src.hack_cache      import HackAssemblyCache, DEFAULT_CACHE_DIRECTORY
+from src.hack_rom        import read_words
+from src.hack_translator import TranslatingHackEmulator
+
+# Most instructions one test can execute before it fails.
+DEFAULT_MAX_CYCLES = 50000000
+
+# Tokens of test script: blocks, command terminators, strings and words.
+TOKEN_REGEX   = re.compile(r'[{}]|[,;!]|"[^"]*"|[^\s,;!{}"]+')
+COMMENT_REGEX = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Output list entry, variable with optional format, left padding, width and right padding.
+OUTPUT_REGEX = re.compile(r"^([^%]+)(?:%([BDXS])(\d+)\.(\d+)\.(\d+))?$")
+
+# Variable of emulator, register or memory address.
+VARIABLE_REGEX = re.compile(r"^(?:(A|D|PC)|RAM\[(\d+)\])$")
+
+# Conditions of while loop.
+CONDITIONS = {
+    "=":  lambda x, y: x == y,
+    "<>": lambda x, y: x != y,
+    "<":  lambda x, y: x < y,
+    ">":  lambda x, y: x > y,
+    "<=": lambda x, y: x <= y,
+    ">=": lambda x, y: x >= y,
+}
+
+# Commands that only advance clock, number of instructions executed by each.
+CLOCK_COMMANDS = { "tick": 0, "tock": 1, "ticktock": 1 }
+
+# Commands that are accepted but have no effect in headless run.
+IGNORED_COMMANDS = { "echo", "clear-echo", "breakpoint", "clear-breakpoints" }
+
+# Cache used by each worker process, keyed by cache directory.
+worker_caches = {}
+
+class TestScriptException(Exception):
+    pass
+
+class ComparisonException(Exception):
+    pass
+
+def parse_script(text):
+    """
+    Returns list of commands, command is tuple (name, arguments) and loops are
+    tuples ("repeat", count, commands) and ("while", condition, commands).
+    """
+    tokens = TOKEN_REGEX.findall(COMMENT_REGEX.sub(" ", text))
+    commands, index = parse_block(tokens, 0)
+    # Block reaching end of script ends past last token, otherwise it was closed by "}"
+    if index <= len(tokens):
+        raise TestScriptException("Unexpected '}'")
+    return commands
+
+def parse_block(tokens, index):
+    """
+    Returns tuple (commands, index after block), block ends with "}" or end of script.
+    """
+    commands = []
+    words    = []
+    while index < len(tokens):
+        token  = tokens[index]
+        index += 1
+
+        if token in ",;!":
+            if words:
+                commands.append((words[0], words[1:]))
+            words = []
+        elif token == "{":
+            if not words or words[0] not in ("repeat", "while"):
+                raise TestScriptException("Block must follow repeat or while")
+            body, index = parse_block(tokens, index)
+            if index > len(tokens) or tokens[index - 1] != "}":
+                raise TestScriptException("Missing '}' in {0} loop".format(words[0]))
+            if words[0] == "repeat":
+                commands.append(("repeat", int(words[1]) if len(words) > 1 else None, body))
+            elif len(words) == 4 and words[2] in CONDITIONS:
+                commands.append(("while", (words[1], words[2], words[3]), body))
+            else:
+                raise TestScriptException("Invalid while condition: {0}".format(" ".join(words[1:])))
+            words = []
+        elif token == "}":
+            if words:
+                raise TestScriptException("Missing terminator after '{0}'".format(" ".join(words)))
+            return commands, index
+        else:
+            words.append(token.strip('"'))
+
+    if words:
+        raise TestScriptException("Missing terminator after '{0}'".format(" ".join(words)))
+    return commands, index + 1
+
+def parse_value(text):
+    """
+    Returns 16 bit value of number written as decimal or with %D, %X or %B prefix.
+    """
+    try:
+        if text[:2] in ("%X", "%B", "%D"):
+            value = int(text[2:], { "%X": 16, "%B": 2, "%D": 10 }[text[:2]])
+        else:
+            value = int(text)
+    except ValueError:
+        raise TestScriptException("Invalid value: {0}".format(text))
+    return value & 0xFFFF
+
+def is_clock_loop(commands):
+    """ Returns True if all commands only advance clock, such loops run without interpreting script. """
+    return all(command[0] in CLOCK_COMMANDS for command in commands)
+
+class OutputColumn(object):
+
+    __slots__ = ("variable", "format", "left", "width", "right")
+
+    def __init__(self, entry):
+        """
+        Constructs column of output list from entry like RAM[0]%D2.6.2, default format is %D1.6.1.
+        """
+        match = OUTPUT_REGEX.match(entry)
+        if match is None or VARIABLE_REGEX.match(match.group(1)) is None:
+            raise TestScriptException("Invalid output list entry: {0}".format(entry))
+        self.variable = match.group(1)
+        self.format   = match.group(2) or "D"
+        self.left     = int(match.group(3) or 1)
+        self.width    = int(match.group(4) or 6)
+        self.right    = int(match.group(5) or 1)
+
+    def header(self):
+        size  = self.left + self.width + self.right
+        name  = self.variable[:size]
+        left  = (size - len(name)) // 2
+        return " " * left + name + " " * (size - left - len(name))
+
+    def cell(self, value):
+        if self.format == "B":
+            text = format(value, "016b")
+        elif self.format == "X":
+            text = format(value, "04X")
+        else:
+            text = str(value - 0x10000 if value & 0x8000 else value)
+        return " " * self.left + text[-self.width:].rjust(self.width) + " " * self.right
+
+class HackTestScript(object):
+
+    def __init__(self, tst_file, max_cycles=DEFAULT_MAX_CYCLES, cache=None):
+        """
+        Constructs test script, files named in script are relative to its directory. Test fails
+        when program executes more than max cycles instructions.
+        """
+        self.tst_file   = tst_file
+        self.directory  = os.path.dirname(os.path.abspath(tst_file))
+        self.max_cycles = max_cycles
+        self.cache      = cache
+        self.emulator   = TranslatingHackEmulator()
+        self.columns    = []
+        self.output     = []
+        self.expected   = None
+        self.out_file   = None
+
+        with open(tst_file, "r") as file:
+            self.commands = parse_script(file.read())
+
+    @property
+    def cycles(self):
+        return self.emulator.instructions
+
+    def run(self):
+        """
+        Execute script, raises ComparisonException on first output line that differs from compare file.
+        Output file is written even when test fails.
+        """
+        try:
+            self.execute(self.commands)
+        finally:
+            if self.out_file is not None:
+                with open(self.out_file, "w") as file:
+                    file.write("".join([line + "\n" for line in self.output]))
+
+    def execute(self, commands):
+        for command in commands:
+            name = command[0]
+
+            if name == "repeat":
+                self.repeat(command[1], command[2])
+            elif name == "while":
+                self.loop_while(command[1], command[2])
+            elif name in CLOCK_COMMANDS:
+                self.tick(CLOCK_COMMANDS[name])
+            elif name == "set":
+                self.set(*command[1])
+            elif name == "output":
+                self.write_line("|" + "|".join([column.cell(self.get(column.variable)) for column in self.columns]) + "|")
+            elif name == "output-list":
+                self.columns = [OutputColumn(entry) for entry in command[1]]
+                self.write_line("|" + "|".join([column.header() for column in self.columns]) + "|")
+            elif name == "load":
+                self.load(command[1][0])
+            elif name == "output-file":
+                self.out_file = os.path.join(self.directory, command[1][0])
+            elif name == "compare-to":
+                with open(os.path.join(self.directory, command[1][0]), "r") as file:
+                    self.expected = [line.rstrip() for line in file.read().splitlines()]
+            elif name not in IGNORED_COMMANDS:
+                raise TestScriptException("Unknown command: {0}".format(name))
+
+    def repeat(self, count, commands):
+        """
+        Repeat commands count times, forever when count is None. Loops that only advance clock
+        are run by emulator in one call.
+        """
+        if is_clock_loop(commands):
+            per_iteration = sum(CLOCK_COMMANDS[command[0]] for command in commands)
+            self.tick(per_iteration * count if count is not None else None)
+            return
+
+        iteration = 0
+        while count is None or iteration < count:
+            self.execute(commands)
+            iteration += 1
+
+    def loop_while(self, condition, commands):
+        variable, operator, value = condition
+        compare = CONDITIONS[operator]
+        while compare(self.signed(self.get(variable)), self.signed(parse_value(value))):
+            before = self.cycles
+            self.execute(commands)
+            if self.cycles == before and self.emulator.halted:
+                raise TestScriptException("While loop never ends, program halted at {0}".format(self.emulator.pc))
+
+    def tick(self, count):
+        """
+        Execute count instructions, until cycle limit when count is None. Halted program stays halted.
+        """
+        remaining = self.max_cycles - self.cycles
+        budget    = remaining if count is None else min(count, remaining)
+        if not self.emulator.halted:
+            self.emulator.run(budget)
+        if not self.emulator.halted and (count is None or count > remaining):
+            raise TestScriptException("Cycle limit of {0} instructions exceeded".format(self.max_cycles))
+
+    def load(self, file_name):
+        """
+        Load program from .asm file (assembled first) or ROM file of any supported format.
+        """
+        file_path = os.path.join(self.directory, file_name)
+        if file_path.endswith(".asm"):
+            hack_assembly_compiler = HackAssemblyCompiler(file_path, None, cache=self.cache)
+            hack_assembly_compiler.compile()
+            self.emulator.load(hack_assembly_compiler.words)
+        else:
+            self.emulator.load(read_words(file_path))
+
+    def get(self, variable):
+        match = VARIABLE_REGEX.match(variable)
+        if match is None:
+            raise TestScriptException("Unknown variable: {0}".format(variable))
+        if match.group(2) is not None:
+            return self.emulator.ram[int(match.group(2)) & 0x7FFF]
+        return { "A": self.emulator.a, "D": self.emulator.d, "PC": self.emulator.pc }[match.group(1)]
+
+    def set(self, variable, value):
+        match = VARIABLE_REGEX.match(variable)
+        if match is None:
+            raise TestScriptException("Unknown variable: {0}".format(variable))
+        value = parse_value(value)
+        if match.group(2) is not None:
+            self.emulator.ram[int(match.group(2)) & 0x7FFF] = value
+        elif match.group(1) == "A":
+            self.emulator.a = value
+        elif match.group(1) == "D":
+            self.emulator.d = value
+        else:
+            self.emulator.pc = value
+
+    def signed(self, value):
+        return value - 0x10000 if value & 0x8000 else value
+
+    def write_line(self, line):
+        """
+        Add line to output and compare it with same line of compare file.
+        """
+        self.output.append(line)
+        if self.expected is None:
+            return
+        number = len(self.output)
+        if number > len(self.expected):
+            raise ComparisonException("Comparison failure at line {0}: compare file has only {1} lines".format(number, len(self.expected)))
+        expected = self.expected[number - 1]
+        if len(expected) != len(line) or any(e != "*" and e != c for e, c in zip(expected, line)):
+            raise ComparisonException("Comparison failure at line {0}: expected '{1}', got '{2}'".format(number, expected, line))
+
+class TestResult(object):
+
+    def __init__(self, tst_file):
+        """
+        Constructs result of running one test script.
+        """
+        self.file    = tst_file
+        self.success = False
+        self.error   = None
+        self.cycles  = 0
+        self.seconds = 0.0
+
+def run_test(tst_file, max_cycles=DEFAULT_MAX_CYCLES, cache_directory=None):
+    """
+    Run one test script, runs in worker process.
+    """
+    result = TestResult(tst_file)
+    start  = time.perf_counter()
+    script = None
+    try:
+        cache = None
+        if cache_directory is not None:
+            if cache_directory not in worker_caches:
+                worker_caches[cache_directory] = HackAssemblyCache(cache_directory)
+            cache = worker_caches[cache_directory]
+        script = HackTestScript(tst_file, max_cycles, cache)
+        script.run()
+        result.success = True
+    except ComparisonException as e:
+        result.error = str(e)
+    except Exception as e:
+        result.error = "{0}: {1}".format(type(e).__name__, e)
+    if script is not None:
+        result.cycles = script.cycles
+    result.seconds = time.perf_counter() - start
+    return result
+
+class HackTestRunner(object):
+
+    def __init__(self, paths, jobs=None, max_cycles=DEFAULT_MAX_CYCLES, cache_directory=DEFAULT_CACHE_DIRECTORY):
+        """
+        Constructs runner for test scripts, paths are .tst files or directories searched for them.
+        Scripts are run in process pool with jobs workers (all cores by default).
+        """
+        self.paths           = paths
+        self.jobs            = jobs or os.cpu_count() or 1
+        self.max_cycles      = max_cycles
+        self.cache_directory = cache_directory
+        self.results         = []
+        self.seconds         = 0.0
+
+    def find_files(self):
+        """
+        Returns sorted list of all test scripts.
+        """
+        files = []
+        for path in self.paths:
+            if not os.path.isdir(path):
+                files.append(path)
+                continue
+            for directory, _, file_names in os.walk(path):
+                for file_name in file_names:
+                    if file_name.endswith(".tst"):
+                        files.append(os.path.join(directory, file_name))
+        return sorted(files)
+
+    def run(self):
+        """
+        Run all scripts and return list of results in same order as files.
+        """
+        start = time.perf_counter()
+        files = self.find_files()
+
+        if self.jobs == 1 or len(files) < 2:
+            self.results = [run_test(file, self.max_cycles, self.cache_directory) for file in files]
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                # Tests differ a lot in length, so they are sent one by one to keep all workers busy
+                self.results = list(executor.map(run_test, files, [self.max_cycles] * len(files),
+                                                 [self.cache_directory] * len(files)))
+
+        self.seconds = time.perf_counter() - start
+        return self.results
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.success]
+
+    def summary(self):
+        """
+        Returns text summary with cycles, timing and error for every test.
+        """
+        lines = []
+        for result in self.results:
+            if result.success:
+                lines.append("[+] {0} - {1} cycles in {2:.3f}s".format(result.file, result.cycles, result.seconds))
+            else:
+                lines.append("[-] {0} - {1} after {2} cycles in {3:.3f}s".format(result.file, result.error, result.cycles, result.seconds))
+        lines.append("Ran {0} tests, {1} failed, {2:.3f}s total with {3} workers".format(
+            len(self.results), len(self.failed), self.seconds, self.jobs))
+        return "\n".join(lines)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run nand2tetris CPU emulator test scripts.")
+    parser.add_argument("paths", nargs="+", help="Test scripts (.tst) or directories with them")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("-n", "--max-cycles", type=int, default=DEFAULT_MAX_CYCLES, help="Most instructions one test can execute")
+    parser.add_argument("-c", "--cache", default=DEFAULT_CACHE_DIRECTORY, help="Cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use cache")
+    arguments = parser.parse_args()
+
+    test_runner = HackTestRunner(arguments.paths, arguments.jobs, arguments.max_cycles, None if arguments.no_cache else arguments.cache)
+    test_runner.run()
+    print(test_runner.summary())
+    sys.exit(1 if test_runner.failed else 0)
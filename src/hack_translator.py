@@ -0,0 +1,346 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_translator.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Hack CPU emulator that translates basic blocks into Python functions.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+
+    Block starts on address where execution enters it and ends with first instruction
+    that can jump. Blocks reachable from entry through constant jump targets are translated
+    together into one region function, so loops run without leaving it:
+
+        def region(a, d, ram, budget):
+            pc = 9
+            n  = 0
+            while True:
+                if pc == 9:
+                    ...straight line code of block...
+                    if v == 0:
+                        pc = 24
+                    else:
+                        pc = 18
+                elif pc == 18:
+                    ...
+                else:
+                    break
+            return a, d, pc, n
+
+    Loaded A values are propagated as constants, so memory accesses after @X use fixed addresses.
+    When profiling, every block also counts its entries in hits list, one increment per block
+    keeps overhead low while counts of all instructions in block can still be computed.
+"""
+import sys
+import time
+import argparse
+from array             import array
+from src.hack_emulator import HackEmulator, alu_computation, SIGN_BIT, JUMP_ALWAYS, JUMP_LESS, JUMP_EQUAL, JUMP_GREATER
+
+# Longest straight line block, longer runs are split so translation time stays small.
+MAX_BLOCK_LENGTH = 256
+
+# Most blocks translated into one region.
+MAX_REGION_BLOCKS = 64
+
+# Python expression of every ALU control code used by assembler, y is A or M.
+EXPRESSIONS = {
+    0b101010: "0",
+    0b111111: "1",
+    0b111010: "65535",
+    0b001100: "{d}",
+    0b110000: "{y}",
+    0b001101: "{d} ^ 65535",
+    0b110001: "{y} ^ 65535",
+    0b001111: "-{d} & 65535",
+    0b110011: "-{y} & 65535",
+    0b011111: "({d} + 1) & 65535",
+    0b110111: "({y} + 1) & 65535",
+    0b001110: "({d} - 1) & 65535",
+    0b110010: "({y} - 1) & 65535",
+    0b000010: "({d} + {y}) & 65535",
+    0b010011: "({d} - {y}) & 65535",
+    0b000111: "({y} - {d}) & 65535",
+    0b000000: "{d} & {y}",
+    0b010101: "{d} | {y}",
+}
+
+# Condition on ALU output of every jump.
+CONDITIONS = {
+    JUMP_GREATER:              "0 < v < 32768",
+    JUMP_EQUAL:                "v == 0",
+    JUMP_GREATER | JUMP_EQUAL: "v < 32768",
+    JUMP_LESS:                 "v >= 32768",
+    JUMP_LESS | JUMP_GREATER:  "v != 0",
+    JUMP_LESS | JUMP_EQUAL:    "v == 0 or v >= 32768",
+}
+
+def is_jump(word):
+    """ Returns True if word is C instruction with jump bits. """
+    return bool(word & SIGN_BIT and word & JUMP_ALWAYS)
+
+def translate_block(words, entry, halts):
+    """
+    Returns tuple (statements, number of instructions, next addresses) for block starting on entry.
+    Statements update a, d, ram and set pc to next address, next addresses are None when they are not constant.
+    Block also ends before halt address.
+    """
+    lines   = []
+    address = "a"       # Expression of A register, constant while it is known
+    pc      = entry
+    end     = min(len(words), entry + MAX_BLOCK_LENGTH)
+
+    while pc < end and (pc == entry or pc not in halts):
+        word = words[pc]
+        pc  += 1
+
+        if not word & SIGN_BIT:
+            address = str(word)
+            continue
+
+        control     = (word >> 6) & 0b111111
+        destination = (word >> 3) & 0b111
+        jump        = word & JUMP_ALWAYS
+        memory      = "ram[{0}]".format(int(address) & 0x7FFF if address != "a" else "a & 32767")
+        y           = memory if word & 0x1000 else address
+
+        if control in EXPRESSIONS:
+            value = EXPRESSIONS[control].format(d="d", y=y)
+        else:
+            value = "alu[{0}](d, {1})".format(control, y)
+
+        if not jump:
+            # Common single destination instructions are assigned directly
+            if destination == 0b010:
+                lines.append("d = " + value)
+                continue
+            if destination == 0b001:
+                lines.append("{0} = {1}".format(memory, value))
+                continue
+            if destination == 0:
+                continue
+
+        target = address
+        if jump and destination & 0b100 and address == "a":
+            lines.append("t = a")
+            target = "t"
+
+        if destination or jump != JUMP_ALWAYS:
+            lines.append("v = " + value)
+        if destination & 0b001:
+            lines.append("{0} = v".format(memory))
+        if destination & 0b010:
+            lines.append("d = v")
+        if destination & 0b100:
+            lines.append("a = v")
+            address = "a"
+
+        if jump:
+            if address != "a":
+                lines.append("a = " + address)
+            constant = int(target) if target.isdigit() else None
+            if jump == JUMP_ALWAYS:
+                lines.append("pc = " + target)
+                return lines, pc - entry, [constant]
+            lines += ["if {0}:".format(CONDITIONS[jump]), "    pc = " + target, "else:", "    pc = {0}".format(pc)]
+            return lines, pc - entry, [constant, pc]
+
+    if address != "a":
+        lines.append("a = " + address)
+    lines.append("pc = {0}".format(pc))
+    return lines, pc - entry, [pc]
+
+def translate_region(words, entry, halts, profile=False):
+    """
+    Returns tuple (source of region function, addresses of translated blocks as (start, length)).
+    Profiled region counts block entries in global hits list indexed by block start.
+    """
+    blocks = {}
+    queue  = [entry]
+    while queue and len(blocks) < MAX_REGION_BLOCKS:
+        pc = queue.pop(0)
+        if pc is None or pc in blocks or pc >= len(words) or pc in halts:
+            continue
+        blocks[pc] = translate_block(words, pc, halts)
+        queue.extend(blocks[pc][2])
+
+    lines = ["def region(a, d, ram, budget):", "    pc = {0}".format(entry), "    n  = 0", "    while True:"]
+    for index, (pc, (statements, length, _)) in enumerate(blocks.items()):
+        lines.append("        {0} pc == {1}:".format("if" if index == 0 else "elif", pc))
+        lines.append("            if n + {0} > budget:".format(length))
+        lines.append("                break")
+        lines.append("            n += {0}".format(length))
+        if profile:
+            lines.append("            hits[{0}] += 1".format(pc))
+        lines.extend(["            " + statement for statement in statements])
+    lines += ["        else:", "            break", "    return a, d, pc, n"]
+
+    return "\n".join(lines), [(pc, block[1]) for pc, block in blocks.items()]
+
+class TranslatingHackEmulator(HackEmulator):
+
+    def __init__(self, words=None, profiling=False):
+        """
+        Constructs emulator that runs translated regions of basic blocks. Regions are translated on
+        first entry and kept until ROM changes, instructions that do not fit in instruction limit are interpreted.
+        When profiling, executions of every instruction are counted (see address_hits).
+        """
+        self.regions          = []
+        self.profiling        = profiling
+        self.block_hits       = []      # Entries of translated block, indexed by block start
+        self.block_lengths    = {}      # Length of translated block, indexed by block start
+        self.instruction_hits = []      # Executions of interpreted instruction, indexed by address
+        super().__init__(words)
+
+    def load(self, words):
+        """
+        Load program, translated regions are kept when program did not change.
+        """
+        words = array("H", words)
+        if words == self.rom and len(self.regions) == len(words):
+            self.reset()
+            self.clear_profile()
+            return
+        super().load(words)
+        self.regions = [None] * len(self.rom)
+        self.block_lengths.clear()
+        self.clear_profile()
+
+    def set_profiling(self, profiling):
+        """
+        Turn profiling on or off, regions are translated again with or without counting.
+        """
+        if profiling != self.profiling:
+            self.profiling = profiling
+            self.regions   = [None] * len(self.rom)
+
+    def clear_profile(self):
+        """
+        Reset hit counts, lists are changed in place because translated regions refer to them.
+        """
+        self.block_hits[:]       = [0] * len(self.rom)
+        self.instruction_hits[:] = [0] * len(self.rom)
+
+    def address_hits(self):
+        """
+        Returns list with number of executions of every ROM address since profile was cleared.
+        """
+        hits = list(self.instruction_hits)
+        for start, length in self.block_lengths.items():
+            count = self.block_hits[start]
+            if count:
+                for address in range(start, start + length):
+                    hits[address] += count
+        return hits
+
+    def write_rom(self, address, word):
+        """
+        Change one instruction in ROM, regions that contain it are translated again. Halts and jumps
+        decide where blocks end, so all regions are translated again when write changes them.
+        """
+        halts = self.halts
+        jumps = is_jump(self.rom[address])
+        super().write_rom(address, word)
+
+        if self.halts != halts or is_jump(word) != jumps:
+            self.regions = [None] * len(self.rom)
+        else:
+            for entry, region in enumerate(self.regions):
+                if region is not None and any(start <= address < start + length for start, length in region[1]):
+                    self.regions[entry] = None
+        self.flush_block_hits()
+
+    def flush_block_hits(self):
+        """
+        Move entries of translated blocks to executions of their instructions and keep only
+        lengths of blocks in remaining regions, so dropped blocks can be translated with other length.
+        """
+        for start, length in self.block_lengths.items():
+            count = self.block_hits[start]
+            if count:
+                for address in range(start, start + length):
+                    self.instruction_hits[address] += count
+                self.block_hits[start] = 0
+        self.block_lengths.clear()
+        for region in self.regions:
+            if region is not None:
+                self.block_lengths.update(region[1])
+
+    def translate(self, entry):
+        """
+        Returns tuple (region function, addresses of translated blocks) for region starting on entry.
+        """
+        source, blocks = translate_region(self.rom, entry, self.halts, self.profiling)
+        namespace      = { "alu": { control: alu_computation(control) for control in range(64) }, "hits": self.block_hits }
+        exec(compile(source, "<hack region {0}>".format(entry), "exec"), namespace)
+        self.block_lengths.update(blocks)
+        return namespace["region"], blocks
+
+    def run(self, max_instructions=None):
+        """
+        Execute until program halts or max instructions are executed, returns number of executed instructions.
+        """
+        regions  = self.regions
+        halts    = self.halts
+        ram      = self.ram
+        size     = len(regions)
+        a, d, pc = self.a, self.d, self.pc
+        limit    = max_instructions if max_instructions is not None else sys.maxsize
+        executed = 0
+        start    = time.perf_counter()
+
+        while pc < size and pc not in halts:
+            region = regions[pc]
+            if region is None:
+                region = regions[pc] = self.translate(pc)
+            a, d, pc, count = region[0](a, d, ram, limit - executed)
+            if not count:
+                break
+            executed += count
+
+        self.seconds      += time.perf_counter() - start
+        self.instructions += executed
+        self.a, self.d, self.pc = a, d, pc
+
+        # Rest of block that does not fit in limit is interpreted instruction by instruction
+        if executed < limit and not self.halted:
+            executed += self.interpret(limit - executed)
+        return executed
+
+    def interpret(self, count):
+        """
+        Interpret up to count instructions, when profiling every instruction is counted on its own.
+        """
+        if not self.profiling:
+            return HackEmulator.run(self, count)
+        executed = 0
+        while executed < count and not self.halted:
+            pc = self.pc
+            if not HackEmulator.run(self, 1):
+                break
+            self.instruction_hits[pc] += 1
+            executed += 1
+        return executed
+
+if __name__ == "__main__":
+
+    from src.hack_rom import read_words
+
+    parser = argparse.ArgumentParser(description="Run hack program with block translation and report emulator speed.")
+    parser.add_argument("program", help="Program ROM file (.hack, .bin, .hex, .img, .mem)")
+    parser.add_argument("-n", "--instructions", type=int, default=None, help="Maximum number of instructions")
+    parser.add_argument("-r", "--ram", type=int, default=16, help="Number of RAM words to print")
+    arguments = parser.parse_args()
+
+    emulator = TranslatingHackEmulator(read_words(arguments.program))
+    emulator.run(arguments.instructions)
+
+    print("[{0}] {1} instructions in {2:.3f}s, {3:.0f} instructions per second, {4} regions translated".format(
+        "+" if emulator.halted else "-", emulator.instructions, emulator.seconds, emulator.instructions_per_second,
+        sum(1 for region in emulator.regions if region is not None)))
+    print(" ".join("RAM[{0}]={1}".format(address, emulator.ram[address]) for address in range(arguments.ram)))
+    sys.exit(0 if emulator.halted else 1)
@@ -0,0 +1,361 @@
+"""
+------------------------------------------------------------------------------
+    @file       hack_vm_translator.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      VM code to hack assembly translator.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+
+    call, return, eq, gt and lt are translated as jumps into shared routines that are written
+    once at the end of program, instead of expanding them inline on every use:
+
+        @Main.main$ret.3        // call Main.fib 1
+        D=A
+        @$$CALL
+        0;JMP
+        (Main.main$ret.3)
+
+    Routine gets return address in D, number of arguments in R13 and called function in R14.
+    Only routines that are used are written. Sharing is selected per routine: by default call and
+    return are shared, comparisons are expanded inline. Shared comparison saves only 5 words
+    on every use but costs about 10 cycles, and comparisons usually run in loops and recursion.
+"""
+import os
+import sys
+import argparse
+from src.hack_compiler import HackAssemblyCompiler
+
+# Base address of every segment, pointer segments hold address in RAM.
+POINTER_SEGMENTS = { "local": "LCL", "argument": "ARG", "this": "THIS", "that": "THAT" }
+FIXED_SEGMENTS   = { "temp": 5, "pointer": 3 }
+SEGMENT_SIZES    = { "temp": 8, "pointer": 2 }
+
+# Biggest offset that pop reaches by incrementing A instead of computing address in R13.
+MAX_INCREMENTED_OFFSET = 6
+
+# Arithmetic commands that combine two values or change one value in place.
+BINARY_OPERATIONS = { "add": "M=D+M", "sub": "M=M-D", "and": "M=D&M", "or": "M=D|M" }
+UNARY_OPERATIONS  = { "neg": "M=-M", "not": "M=!M" }
+
+# Jump taken when comparison is true, condition is on x - y.
+COMPARISON_JUMPS = { "eq": "JEQ", "gt": "JGT", "lt": "JLT" }
+
+# Push D on stack.
+PUSH_D = ["@SP", "AM=M+1", "A=A-1", "M=D"]
+
+# Pop stack into D, A points to popped value.
+POP_D = ["@SP", "AM=M-1", "D=M"]
+
+# Jump to return address saved in R15.
+RETURN_R15 = ["@R15", "A=M", "0;JMP"]
+
+# Program end, code after it is never reached by falling through.
+END_LABEL = "$$END"
+
+def comparison_routine(name):
+    """
+    Shared comparison, x - y is computed in place of x and replaced by true (-1) or false (0).
+    """
+    label = "$$" + name.upper()
+    return ["(" + label + ")", "@R15", "M=D", "@SP", "AM=M-1", "D=M", "A=A-1", "D=M-D", "M=0",
+            "@" + label + ".TRUE", "D;" + COMPARISON_JUMPS[name]] + RETURN_R15 + \
+           ["(" + label + ".TRUE)", "@SP", "A=M-1", "M=-1"] + RETURN_R15
+
+def call_code():
+    """
+    Save frame of caller and jump to function, return address is in D, arguments in R13 and function in R14.
+    """
+    lines = ["@SP", "A=M", "M=D"]
+    for pointer in ("LCL", "ARG", "THIS", "THAT"):
+        lines += ["@" + pointer, "D=M", "@SP", "AM=M+1", "M=D"]
+    return lines + ["@SP", "MD=M+1", "@LCL", "M=D", "@R13", "D=D-M", "@5", "D=D-A", "@ARG", "M=D", "@R14", "A=M", "0;JMP"]
+
+def return_code():
+    """
+    Restore frame of caller, return value is moved to first argument.
+    """
+    lines = ["@LCL", "D=M", "@R13", "M=D", "@5", "A=D-A", "D=M", "@R14", "M=D"] + POP_D + \
+            ["@ARG", "A=M", "M=D", "@ARG", "D=M+1", "@SP", "M=D"]
+    for pointer in ("THAT", "THIS", "ARG", "LCL"):
+        lines += ["@R13", "AM=M-1", "D=M", "@" + pointer, "M=D"]
+    return lines + ["@R14", "A=M", "0;JMP"]
+
+# Shared routines written at end of program.
+ROUTINES = {
+    "eq":     comparison_routine("eq"),
+    "gt":     comparison_routine("gt"),
+    "lt":     comparison_routine("lt"),
+    "call":   ["($$CALL)"] + call_code(),
+    "return": ["($$RETURN)"] + return_code(),
+}
+
+# Routines shared by default, they save most ROM for fewest cycles.
+DEFAULT_SHARED_ROUTINES = ("call", "return")
+
+def shared_routines(shared):
+    """ Returns set of shared routine names, shared is True (all), False (none) or iterable of names. """
+    if shared is True:
+        return set(ROUTINES)
+    if shared is False:
+        return set()
+    names = set(shared)
+    if not names <= ROUTINES.keys():
+        raise InvalidVMCommandException("Unknown shared routines: {0}".format(", ".join(sorted(names - ROUTINES.keys()))))
+    return names
+
+class InvalidVMCommandException(Exception):
+
+    def __init__(self, message, file=None, line=None):
+        """
+        Constructs VM error, message is prefixed with file and line when they are known.
+        """
+        super().__init__(message if line is None else "{0}:{1}:{2}".format(file, line, message))
+        self.message = message
+        self.file    = file
+        self.line    = line
+
+def instructions_count(lines):
+    """ Returns number of instructions in assembly lines, labels are not instructions. """
+    return sum(1 for line in lines if line[0] != "(")
+
+class VMCodeWriter(object):
+
+    def __init__(self, shared=DEFAULT_SHARED_ROUTINES):
+        """
+        Constructs code writer that returns assembly lines for every VM command. Shared routines
+        (True for all, False for none or names of routines) jump to routines written by end().
+        """
+        self.shared       = shared_routines(shared)
+        self.file_name    = ""
+        self.function     = ""
+        self.label_number = 0
+        self.used         = set()       # Shared routines that were used
+
+    def unique_label(self, prefix):
+        self.label_number += 1
+        return "{0}.{1}".format(prefix, self.label_number)
+
+    def bootstrap(self):
+        """ Set stack pointer and call Sys.init. """
+        self.function = "Sys.bootstrap"
+        return ["@256", "D=A", "@SP", "M=D"] + self.call("Sys.init", 0)
+
+    def command(self, words):
+        """
+        Returns assembly lines of one VM command given as list of words.
+        """
+        name = words[0]
+        arguments_count = { "push": 2, "pop": 2, "label": 1, "goto": 1, "if-goto": 1, "function": 2, "call": 2 }.get(name, 0)
+        if len(words) != arguments_count + 1:
+            raise InvalidVMCommandException("Command {0} expects {1} arguments".format(name, arguments_count))
+
+        if name in BINARY_OPERATIONS:
+            return POP_D + ["A=A-1", BINARY_OPERATIONS[name]]
+        if name in UNARY_OPERATIONS:
+            return ["@SP", "A=M-1", UNARY_OPERATIONS[name]]
+        if name in COMPARISON_JUMPS:
+            return self.comparison(name)
+        if name == "push":
+            return self.push(words[1], self.index(words[2]))
+        if name == "pop":
+            return self.pop(words[1], self.index(words[2]))
+        if name == "label":
+            return ["({0}${1})".format(self.function, words[1])]
+        if name == "goto":
+            return ["@{0}${1}".format(self.function, words[1]), "0;JMP"]
+        if name == "if-goto":
+            return POP_D + ["@{0}${1}".format(self.function, words[1]), "D;JNE"]
+        if name == "function":
+            self.function = words[1]
+            return ["(" + words[1] + ")"] + self.locals(self.index(words[2]))
+        if name == "call":
+            return self.call(words[1], self.index(words[2]))
+        if name == "return":
+            if "return" in self.shared:
+                self.used.add("return")
+                return ["@$$RETURN", "0;JMP"]
+            return return_code()
+        raise InvalidVMCommandException("Unknown command: {0}".format(name))
+
+    def index(self, text):
+        if not text.isdigit() or int(text) > 32767:
+            raise InvalidVMCommandException("Invalid index: {0}".format(text))
+        return int(text)
+
+    def segment_address(self, segment, index):
+        """ Returns symbol of fixed address of temp, pointer or static segment. """
+        if segment == "static":
+            return "{0}.{1}".format(self.file_name, index)
+        if index >= SEGMENT_SIZES[segment]:
+            raise InvalidVMCommandException("Index {0} is out of {1} segment".format(index, segment))
+        return "R{0}".format(FIXED_SEGMENTS[segment] + index)
+
+    def push(self, segment, index):
+        if segment == "constant":
+            if index <= 1:
+                return ["@SP", "AM=M+1", "A=A-1", "M={0}".format(index)]
+            return ["@{0}".format(index), "D=A"] + PUSH_D
+        if segment in POINTER_SEGMENTS:
+            base = "@" + POINTER_SEGMENTS[segment]
+            if index <= 1:
+                return [base, "A=M" if index == 0 else "A=M+1", "D=M"] + PUSH_D
+            return ["@{0}".format(index), "D=A", base, "A=D+M", "D=M"] + PUSH_D
+        if segment in FIXED_SEGMENTS or segment == "static":
+            return ["@" + self.segment_address(segment, index), "D=M"] + PUSH_D
+        raise InvalidVMCommandException("Unknown segment: {0}".format(segment))
+
+    def pop(self, segment, index):
+        if segment in POINTER_SEGMENTS:
+            base = "@" + POINTER_SEGMENTS[segment]
+            if index <= MAX_INCREMENTED_OFFSET:
+                return POP_D + [base, "A=M"] + ["A=A+1"] * index + ["M=D"]
+            return ["@{0}".format(index), "D=A", base, "D=D+M", "@R13", "M=D"] + POP_D + ["@R13", "A=M", "M=D"]
+        if segment in FIXED_SEGMENTS or segment == "static":
+            return POP_D + ["@" + self.segment_address(segment, index), "M=D"]
+        raise InvalidVMCommandException("Cannot pop to segment: {0}".format(segment))
+
+    def locals(self, count):
+        """ Initialize count local variables to 0. """
+        if not count:
+            return []
+        return ["@SP", "A=M"] + ["M=0", "A=A+1"] * count + ["D=A", "@SP", "M=D"]
+
+    def comparison(self, name):
+        if name in self.shared:
+            self.used.add(name)
+            label = self.unique_label("$$RET")
+            return ["@" + label, "D=A", "@$$" + name.upper(), "0;JMP", "(" + label + ")"]
+        label = self.unique_label("$$TRUE")
+        return POP_D + ["A=A-1", "D=M-D", "M=-1", "@" + label, "D;" + COMPARISON_JUMPS[name], "@SP", "A=M-1", "M=0", "(" + label + ")"]
+
+    def call(self, function, arguments):
+        label = self.unique_label(self.function + "$ret")
+        if "call" not in self.shared:
+            return ["@" + label, "D=A", "@SP", "A=M", "M=D", "@SP", "M=M+1"] + self.push_pointers() + \
+                   ["@SP", "D=M", "@{0}".format(arguments + 5), "D=D-A", "@ARG", "M=D", "@SP", "D=M", "@LCL", "M=D",
+                    "@" + function, "0;JMP", "(" + label + ")"]
+        self.used.add("call")
+        lines = ["@R13", "M={0}".format(arguments)] if arguments <= 1 else ["@{0}".format(arguments), "D=A", "@R13", "M=D"]
+        return lines + ["@" + function, "D=A", "@R14", "M=D", "@" + label, "D=A", "@$$CALL", "0;JMP", "(" + label + ")"]
+
+    def push_pointers(self):
+        lines = []
+        for pointer in ("LCL", "ARG", "THIS", "THAT"):
+            lines += ["@" + pointer, "D=M"] + PUSH_D
+        return lines
+
+    def end(self):
+        """ Stop program, then write used shared routines. """
+        lines = ["(" + END_LABEL + ")", "@" + END_LABEL, "0;JMP"]
+        for name in sorted(self.used):
+            lines += ROUTINES[name]
+        return lines
+
+class VMTranslator(object):
+
+    def __init__(self, vm_path, out_file, shared=DEFAULT_SHARED_ROUTINES, bootstrap=None):
+        """
+        Constructs translator of .vm file or directory with .vm files into one assembly file.
+        Shared routines are selected like in VMCodeWriter.
+        Bootstrap code is written when Sys.vm is translated unless bootstrap is given.
+        Inline instructions count is computed next to translation so saving can be reported.
+        """
+        self.vm_path             = vm_path
+        self.out_file            = out_file
+        self.writer              = VMCodeWriter(shared)
+        self.inline_writer       = VMCodeWriter(False) if self.writer.shared else None
+        self.files               = self.find_files()
+        self.bootstrap           = bootstrap if bootstrap is not None else any(os.path.basename(file) == "Sys.vm" for file in self.files)
+        self.commands            = 0
+        self.instructions        = 0
+        self.inline_instructions = 0
+
+    def find_files(self):
+        if not os.path.isdir(self.vm_path):
+            return [self.vm_path]
+        return sorted(os.path.join(self.vm_path, file_name) for file_name in os.listdir(self.vm_path) if file_name.endswith(".vm"))
+
+    def translate(self):
+        """
+        Read VM files line by line and write assembly to output file.
+        """
+        with open(self.out_file, "w") as out:
+            if self.bootstrap:
+                self.__write(out, "// bootstrap", self.writer.bootstrap(), self.inline_writer and self.inline_writer.bootstrap())
+
+            for vm_file in self.files:
+                file_name = os.path.splitext(os.path.basename(vm_file))[0]
+                self.writer.file_name = file_name
+                if self.inline_writer:
+                    self.inline_writer.file_name = file_name
+
+                with open(vm_file, "r") as vm:
+                    for line_number, line in enumerate(vm, 1):
+                        words = line.split("//", 1)[0].split()
+                        if not words:
+                            continue
+                        try:
+                            lines        = self.writer.command(words)
+                            inline_lines = self.inline_writer and self.inline_writer.command(words)
+                        except InvalidVMCommandException as e:
+                            raise InvalidVMCommandException(e.message, vm_file, line_number)
+                        self.commands += 1
+                        self.__write(out, "// " + " ".join(words), lines, inline_lines)
+
+            self.__write(out, "// end", self.writer.end(), self.inline_writer and self.inline_writer.end())
+
+        if not self.inline_writer:
+            self.inline_instructions = self.instructions
+
+    def __write(self, out, comment, lines, inline_lines):
+        out.write(comment + "\n" + "\n".join(lines) + "\n")
+        self.instructions += instructions_count(lines)
+        if inline_lines:
+            self.inline_instructions += instructions_count(inline_lines)
+
+    def summary(self):
+        saved = self.inline_instructions - self.instructions
+        return "Translated {0} commands from {1} files into {2} instructions, inline expansion takes {3} ({4} saved)".format(
+            self.commands, len(self.files), self.instructions, self.inline_instructions, saved)
+
+if __name__ == "__main__":
+
+    from src.hack_translator import TranslatingHackEmulator
+
+    parser = argparse.ArgumentParser(description="Translate VM code to hack assembly.")
+    parser.add_argument("path", help="VM file or directory with VM files")
+    parser.add_argument("-o", "--out", default=None, help="Output assembly file")
+    parser.add_argument("--shared", nargs="*", choices=sorted(ROUTINES), default=DEFAULT_SHARED_ROUTINES, metavar="ROUTINE",
+                        help="Routines written once and shared ({0}), none when empty, default: {1}".format(
+                            ", ".join(sorted(ROUTINES)), " ".join(DEFAULT_SHARED_ROUTINES)))
+    parser.add_argument("--bootstrap", choices=["auto", "yes", "no"], default="auto", help="Write bootstrap code")
+    parser.add_argument("-a", "--assemble", action="store_true", help="Assemble output to .hack file")
+    parser.add_argument("-r", "--run", type=int, default=None, metavar="CYCLES", help="Run assembled program and report cycles")
+    arguments = parser.parse_args()
+
+    path     = arguments.path.rstrip("/\\")
+    out_file = arguments.out or (os.path.join(path, os.path.basename(path)) if os.path.isdir(path) else os.path.splitext(path)[0]) + ".asm"
+
+    try:
+        translator = VMTranslator(path, out_file, arguments.shared, { "auto": None, "yes": True, "no": False }[arguments.bootstrap])
+        translator.translate()
+    except Exception as e:
+        print("[-] {0}".format(e))
+        sys.exit(1)
+    print("[+] {0} - {1}".format(out_file, translator.summary()))
+
+    if arguments.assemble or arguments.run is not None:
+        hack_assembly_compiler = HackAssemblyCompiler(out_file, os.path.splitext(out_file)[0] + ".hack")
+        hack_assembly_compiler.compile()
+        print("[+] ROM size {0} words".format(len(hack_assembly_compiler.words)))
+
+        if arguments.run is not None:
+            emulator = TranslatingHackEmulator(hack_assembly_compiler.words)
+            emulator.run(arguments.run)
+            print("[{0}] {1} cycles, SP={2} top of stack={3}".format("+" if emulator.halted else "-", emulator.instructions,
+                                                                      emulator.ram[0], emulator.ram[(emulator.ram[0] - 1) & 0x7FFF]))
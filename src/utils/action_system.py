@@ -16,11 +16,15 @@ import datetime
 from PyQt5                          import QtWidgets, QtCore, QtGui
 from src.utils.log_system           import LogSystem
 from src.widgets.syntax_highlighter import SyntaxHighlighter
-from src.hack_compiler              import HackAssemblyCompiler, InvalidSyntaxException, InternalException
+from src.hack_rom                   import write_rom
+from src.hack_cache                 import HackAssemblyCache
+from src.hack_disassembler          import read_hack
+from src.utils.compile_system       import CompileSystem
 
 class ActionSystem(object):
 
     main_form = None
+    cache     = None
 
     @classmethod
     def initialize(cls, main_form):
@@ -28,6 +32,7 @@ class ActionSystem(object):
         Set action for specific form, in our case we want these actions on our main form.
         """
         cls.main_form = main_form
+        cls.cache     = HackAssemblyCache()     # Compilation results shared between sessions
 
     @classmethod
     def new_file(cls, file_path=None):
@@ -165,15 +170,11 @@ class ActionSystem(object):
             file_path, ok = QtWidgets.QFileDialog.getOpenFileName(cls.main_form, "Open File", "./repository", "Hack files (*.hack)", options=options)
             
             if ok:
-                with open(file_path, "r") as file:
-                    cls.main_form.comparison_dock.list.clear()
-                    cls.main_form.comparison_dock.file = file_path
-                    text_buffer = file.read().split("\n")
-
-                    for line in text_buffer:
-                        if line:
-                            list_item = QtWidgets.QListWidgetItem(line)
-                            cls.main_form.comparison_dock.list.addItem(list_item)
+                # Whole file is decoded at once, rows are only created when they scroll into view
+                words = read_hack(file_path)
+                cls.main_form.comparison_dock.file  = file_path
+                cls.main_form.comparison_dock.words = words
+                cls.main_form.comparison_dock.set_words(words)
 
                 cls.main_form.comparison_dock.show()
         except Exception as e:
@@ -187,8 +188,9 @@ class ActionSystem(object):
         """
         LogSystem.information("Starting Action Clear Comparison File!")
         try:
-            cls.main_form.comparison_dock.list.clear()
-            cls.main_form.comparison_dock.file = None
+            cls.main_form.comparison_dock.set_words(None)
+            cls.main_form.comparison_dock.file  = None
+            cls.main_form.comparison_dock.words = None
         except Exception as e:
             LogSystem.error(e)
 
@@ -207,115 +209,55 @@ class ActionSystem(object):
                 if current_tab.saved == False:
                     return
 
-            file_path = current_tab.file_path
-
             cls.main_form.destination_dock.pc        = None
             cls.main_form.destination_dock.file_path = None
+            cls.main_form.destination_dock.words     = None
             cls.main_form.compilation_dock.textarea.clear()
             cls.main_form.compilation_dock.show()
             cls.main_form.compilation_dock.textarea.appendPlainText("Time: {0}".format(datetime.datetime.now()))
 
             cls.main_form.destination_dock.dock.show()
             cls.main_form.tab_bar.current.textarea.setExtraSelections([])
+            cls.main_form.tab_bar.current.textarea.clearLineHeat()     # Profile no longer matches lines
 
-            for i in range(cls.main_form.comparison_dock.list.count()):
-                cls.main_form.comparison_dock.list.item(i).setBackground(QtGui.QColor(255, 255, 255))
-
-            try:
-                cls.main_form.destination_dock.list.clear()
-
-                hack_assembly_compiler = HackAssemblyCompiler(file_path, "temp.hack")
-                hack_assembly_compiler.compile()
-
-                for binary in hack_assembly_compiler.binary_data:
-                    list_item = QtWidgets.QListWidgetItem(binary)
-                    cls.main_form.destination_dock.list.addItem(list_item)
-
-                cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Success... ✔️")
-                cls.main_form.destination_dock.pc = hack_assembly_compiler.program_counter_and_lines.copy()
-                cls.main_form.destination_dock.file_path = cls.main_form.tab_bar.current.file_path
-
-            except InvalidSyntaxException as e:
-                LogSystem.error("Invalid syntax error")
-                
-                error_msg  = str(e)
-                error_line = ""
-                error      = ""
-                for i in range(len(error_msg)):
-                    if error_msg[i] == ":":
-                        error = error_msg[i+1:]
-                        break
-                    error_line += error_msg[i]
-
-                cls.main_form.destination_dock.pc = None
-                cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error on line {0} - {1} ❌".format(error_line, error))
-                cls.main_form.tab_bar.current.textarea.highlightErrorLine(int(error_line) - 1)
-                return
-            except InternalException as e:
-                LogSystem.error("Internal error")
-                cls.main_form.destination_dock.pc = None
-                cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error {0} ❌".format(e))
-                return
-            except Exception as e:
-                LogSystem.error(e)
-                cls.main_form.destination_dock.pc = None
-                cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error {0} ❌".format(e))
-                return
+            cls.main_form.comparison_dock.clear_comparison()
+            cls.main_form.destination_dock.clear_comparison()
+            cls.main_form.destination_dock.set_words(None)
 
+            # Every tab keeps its own incremental compiler so only edited lines are compiled again,
+            # it runs in background and results are shown when it finishes.
+            comparison_words = cls.main_form.comparison_dock.words if cls.main_form.comparison_dock.file else None
+            CompileSystem.start(current_tab, comparison_words)
 
-            if not cls.main_form.comparison_dock.file:
-                return
-
-            destination_items_counter = cls.main_form.destination_dock.list.count()
-            comparison_items_counter  = cls.main_form.comparison_dock.list.count()
+        except Exception as e:
+            LogSystem.error(e)
 
-            max_items = destination_items_counter if destination_items_counter > comparison_items_counter else comparison_items_counter
-            min_items = destination_items_counter if destination_items_counter < comparison_items_counter else comparison_items_counter
 
-            try:
-                for i in range(max_items):
-                    try:
-                        destination_item = cls.main_form.destination_dock.list.item(i).text()
-                    except:
-                        cls.main_form.comparison_dock.list.item(i).setBackground(QtGui.QColor(255, 255, 100))
-                        cls.main_form.compilation_dock.textarea.appendPlainText("Comparison: Failed - There are more lines of code in comparison file! ❌")
-                        return
+    @classmethod
+    def compile_directory(cls, directory_path):
+        """
+        Compile all hack assembly files in directory tree and show summary in compilation dock.
+        """
+        LogSystem.information("Starting Action Compile Directory!")
+        try:
+            cls.main_form.compilation_dock.textarea.clear()
+            cls.main_form.compilation_dock.show()
+            cls.main_form.compilation_dock.textarea.appendPlainText("Time: {0}".format(datetime.datetime.now()))
 
-                    try:
-                        comparison_item = cls.main_form.comparison_dock.list.item(i).text()
-                    except:
-                        cls.main_form.destination_dock.list.item(i).setBackground(QtGui.QColor(255, 255, 100))
-                        cls.main_form.compilation_dock.textarea.appendPlainText("Comparison: Failed at line {0} ❌".format(hack_assembly_compiler.program_counter_and_lines[i]))
-                        cls.main_form.tab_bar.current.textarea.highlightComparisonLine(int(hack_assembly_compiler.program_counter_and_lines[i]) - 1)
-                        return
-
-                    if destination_item == comparison_item:
-                        cls.main_form.destination_dock.list.item(i).setBackground(QtGui.QColor(170, 255, 170))
-                        cls.main_form.comparison_dock.list.item(i).setBackground(QtGui.QColor(170, 255, 170))
-                    else:
-                        cls.main_form.destination_dock.list.item(i).setBackground(QtGui.QColor(255, 255, 100))
-                        cls.main_form.comparison_dock.list.item(i).setBackground(QtGui.QColor(255, 255, 100))
-                        
-                        cls.main_form.compilation_dock.textarea.appendPlainText("Comparison: Failed at line {0} ❌".format(hack_assembly_compiler.program_counter_and_lines[i]))
-                        cls.main_form.tab_bar.current.textarea.highlightComparisonLine(int(hack_assembly_compiler.program_counter_and_lines[i]) - 1)
-                        return
-
-                cls.main_form.compilation_dock.textarea.appendPlainText("Comparison: Success... ✔️")
-
-            except Exception as e:
-                LogSystem.error(e)
+            cls.main_form.compilation_dock.textarea.appendPlainText("Compiling directory: {0}".format(directory_path))
 
+            # Batch runs in background, summary is shown when it finishes
+            CompileSystem.compile_directory(directory_path)
         except Exception as e:
             LogSystem.error(e)
 
-
     @classmethod
     def export_destination(cls):
         """
         Save compiled data.
         """
         try:
-            if cls.main_form.destination_dock.list.count() == 0:
+            if cls.main_form.destination_dock.model.rowCount() == 0:
                 LogSystem.warning("Nothing to export!")
                 dialog = QtWidgets.QMessageBox()
                 dialog.setIcon(QtWidgets.QMessageBox.Information)
@@ -326,13 +268,13 @@ class ActionSystem(object):
                 dialog.exec_()
                 return
 
+            formats = { "Hack files (*.hack)": "hack", "Binary ROM (*.bin)": "binary", "Hex files (*.hex)": "hex",
+                        "Logisim memory image (*.img)": "logisim", "Verilog memory (*.mem)": "verilog" }
+
             options = QtWidgets.QFileDialog.Option() | QtWidgets.QFileDialog.DontUseNativeDialog
-            file_path, ok = QtWidgets.QFileDialog.getSaveFileName(cls.main_form, "Save file", ".hack", "Hack files (*.hack)", options=options)
-            if ok:
-                with open(file_path, "w") as file:
-                    for i in range(cls.main_form.destination_dock.list.count()):
-                        destination_item = cls.main_form.destination_dock.list.item(i).text()
-                        file.write(destination_item + "\n")
+            file_path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(cls.main_form, "Save file", ".hack", ";;".join(formats), options=options)
+            if file_path:
+                write_rom(cls.main_form.destination_dock.words, file_path, formats.get(selected_filter))
                 LogSystem.warning("Destination saved to: {0}".format(file_path))
 
         except Exception as e:
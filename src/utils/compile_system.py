@@ -0,0 +1,326 @@
+"""
+------------------------------------------------------------------------------
+    @file       compile_system.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Compilation of current tab in background thread.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import threading
+from PyQt5                          import QtCore
+from src.utils.log_system           import LogSystem
+from src.hack_compiler              import InvalidSyntaxException, InternalException
+from src.hack_incremental_compiler  import CompilationCancelledException
+from src.hack_comparison            import HackComparison
+from src.hack_batch_compiler        import HackBatchCompiler
+
+# Most mismatching lines listed in compilation dock, all of them are highlighted.
+MAX_REPORTED_MISMATCHES = 20
+
+class CompileResult(object):
+
+    __slots__ = ("tab", "file_path", "words", "program_counter_and_lines", "diagnostics", "statistics", "comparison", "error")
+
+    def __init__(self, tab, file_path):
+        """
+        Constructs result of one compilation, GUI applies all of it at once when compilation finishes.
+        """
+        self.tab                       = tab
+        self.file_path                 = file_path
+        self.words                     = None
+        self.program_counter_and_lines = None
+        self.diagnostics               = []
+        self.statistics                = None
+        self.comparison                = None    # HackComparison when comparison file is loaded
+        self.error                     = None    # Exception that stopped compilation
+
+class CompileSignals(QtCore.QObject):
+
+    progress  = QtCore.pyqtSignal(str, int)     # Phase name and percent of phase done
+    finished  = QtCore.pyqtSignal(object)       # CompileResult
+    cancelled = QtCore.pyqtSignal()
+
+class CompileTask(QtCore.QRunnable):
+
+    def __init__(self, tab, text, comparison_words, live=False):
+        """
+        Constructs task that compiles text with incremental compiler of tab and compares words
+        with comparison words (None without comparison file). Live task only collects diagnostics.
+        Signals are created in GUI thread so they are delivered to it through queued connections.
+        """
+        super().__init__()
+        self.setAutoDelete(False)    # Task is kept by CompileSystem until its result is shown
+        self.tab              = tab
+        self.file_path        = tab.file_path
+        self.text             = text
+        self.comparison_words = comparison_words
+        self.live             = live
+        self.signals          = CompileSignals()
+        self.cancelling       = threading.Event()
+        self.last_progress    = None
+
+    def cancel(self):
+        """ Stop compilation on next progress report, called from GUI thread. """
+        self.cancelling.set()
+
+    def report(self, phase, done, total):
+        if self.cancelling.is_set():
+            raise CompilationCancelledException()
+        progress = (phase, done * 100 // total if total else 100)
+        if progress != self.last_progress:
+            self.last_progress = progress
+            self.signals.progress.emit(*progress)
+
+    def run(self):
+        result = CompileResult(self.tab, self.file_path)
+        try:
+            assembler = self.tab.assembler
+            assembler.update(self.text, self.report)
+            result.statistics  = assembler.statistics
+            result.diagnostics = assembler.diagnostics
+
+            if not result.diagnostics and not self.live:
+                result.words                     = assembler.words
+                result.program_counter_and_lines = assembler.program_counter_and_lines.copy()
+
+                if self.comparison_words is not None:
+                    self.report("comparison", 0, 1)
+                    result.comparison = HackComparison(result.words, self.comparison_words)
+
+        except CompilationCancelledException:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            result.error = e
+
+        self.signals.finished.emit(result)
+
+class BatchCompileSignals(QtCore.QObject):
+
+    finished = QtCore.pyqtSignal(object, object)   # HackBatchCompiler and exception that stopped it or None
+
+class BatchCompileTask(QtCore.QRunnable):
+
+    def __init__(self, directory_path):
+        """
+        Constructs task that compiles all files in directory tree with batch compiler, batch compiler
+        waits for its process pool in pool thread so GUI keeps running.
+        """
+        super().__init__()
+        self.setAutoDelete(False)    # Task is kept by CompileSystem until its result is shown
+        self.directory_path = directory_path
+        self.batch_compiler = HackBatchCompiler(directory_path)
+        self.signals        = BatchCompileSignals()
+
+    def run(self):
+        error = None
+        try:
+            self.batch_compiler.compile()
+        except Exception as e:
+            error = e
+        self.signals.finished.emit(self.batch_compiler, error)
+
+class CompileSystem(object):
+
+    main_form = None
+    pool      = None
+    task      = None    # Task whose result is shown, results of older tasks are dropped
+    live_task = None    # Task whose diagnostics are shown while typing
+    batches   = []      # Running directory compilations
+
+    @classmethod
+    def initialize(cls, main_form):
+        """
+        Create thread pool for compilations of main form. Pool has one thread so incremental compiler
+        of a tab is never used by two tasks, new compilation waits until cancelled one stops.
+        """
+        cls.main_form = main_form
+        cls.pool      = QtCore.QThreadPool()
+        cls.pool.setMaxThreadCount(1)
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(cls.shutdown)
+
+    @classmethod
+    def shutdown(cls):
+        """ Cancel running compilation and wait for pool thread. """
+        cls.cancel()
+        if cls.live_task is not None:
+            cls.live_task.cancel()
+        cls.pool.waitForDone()
+
+    @classmethod
+    def start(cls, tab, comparison_words=None):
+        """
+        Compile text of tab in background, running compilation is cancelled.
+        """
+        if cls.task is not None:
+            cls.task.cancel()
+        if cls.live_task is not None:
+            cls.live_task.cancel()      # Compilation shows same diagnostics
+
+        task = cls.task = CompileTask(tab, tab.textarea.toPlainText(), comparison_words)
+        task.signals.progress.connect(lambda phase, percent: cls.show_progress(task, phase, percent), QtCore.Qt.QueuedConnection)
+        task.signals.finished.connect(lambda result: cls.show_result(task, result), QtCore.Qt.QueuedConnection)
+        task.signals.cancelled.connect(lambda: cls.show_cancelled(task), QtCore.Qt.QueuedConnection)
+        cls.main_form.compilation_dock.start_progress()
+        cls.pool.start(task)
+
+    @classmethod
+    def compile_directory(cls, directory_path):
+        """
+        Compile directory tree in background, it runs in global thread pool so tabs can be compiled meanwhile.
+        """
+        task = BatchCompileTask(directory_path)
+        task.signals.finished.connect(lambda batch_compiler, error: cls.show_batch_result(task, batch_compiler, error), QtCore.Qt.QueuedConnection)
+        cls.batches.append(task)
+        QtCore.QThreadPool.globalInstance().start(task)
+
+    @classmethod
+    def show_batch_result(cls, task, batch_compiler, error):
+        """
+        Show summary of finished directory compilation in compilation dock.
+        """
+        cls.batches.remove(task)
+        try:
+            if error is not None:
+                raise error
+            cls.main_form.compilation_dock.show()
+            cls.main_form.compilation_dock.textarea.appendPlainText(batch_compiler.summary())
+            if batch_compiler.failed:
+                LogSystem.error("Failed to compile {0} files in: {1}".format(len(batch_compiler.failed), task.directory_path))
+            else:
+                LogSystem.success("Compiled all files in: {0}".format(task.directory_path))
+        except Exception as e:
+            LogSystem.error(e)
+            cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error {0} ❌".format(e))
+
+    @classmethod
+    def diagnose(cls, tab, text):
+        """
+        Collect diagnostics of text in background and show them as editor markers, running live task
+        is cancelled. Compilation started by user runs first when it is waiting in pool.
+        """
+        if cls.live_task is not None:
+            cls.live_task.cancel()
+
+        task = cls.live_task = CompileTask(tab, text, None, live=True)
+        task.signals.finished.connect(lambda result: cls.show_diagnostics(task, result), QtCore.Qt.QueuedConnection)
+        task.signals.cancelled.connect(lambda: cls.drop_live_task(task), QtCore.Qt.QueuedConnection)
+        cls.pool.start(task, -1)
+
+    @classmethod
+    def drop_live_task(cls, task):
+        if task is cls.live_task:
+            cls.live_task = None
+
+    @classmethod
+    def show_diagnostics(cls, task, result):
+        """
+        Mark lines with errors in editor of compiled tab.
+        """
+        if task is not cls.live_task:
+            return
+        cls.live_task = None
+
+        try:
+            if result.error is not None:
+                raise result.error
+            if result.tab in cls.main_form.tab_bar.tabs:
+                result.tab.textarea.setLineErrors({ diagnostic.line: diagnostic.message for diagnostic in result.diagnostics })
+        except Exception as e:
+            LogSystem.error(e)
+
+    @classmethod
+    def cancel(cls):
+        """ Cancel running compilation. """
+        if cls.task is not None:
+            cls.task.cancel()
+
+    @classmethod
+    def show_progress(cls, task, phase, percent):
+        if task is cls.task:
+            cls.main_form.compilation_dock.update_progress(phase, percent)
+
+    @classmethod
+    def show_cancelled(cls, task):
+        if task is not cls.task:
+            return
+        cls.task = None
+        LogSystem.warning("Compilation cancelled")
+        cls.main_form.compilation_dock.stop_progress()
+        cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Cancelled ❌")
+
+    @classmethod
+    def show_result(cls, task, result):
+        """
+        Show result of finished compilation in docks and editor, all rows are set at once.
+        """
+        if task is not cls.task:
+            return
+        cls.task = None
+        cls.main_form.compilation_dock.stop_progress()
+
+        try:
+            # Tab could be closed while it was compiled
+            textarea = result.tab.textarea if result.tab in cls.main_form.tab_bar.tabs else None
+
+            if result.error is not None:
+                raise result.error
+
+            if result.diagnostics:
+                LogSystem.error("Found {0} errors".format(len(result.diagnostics)))
+                # All errors are appended at once, generated sources can have thousands of them
+                cls.main_form.compilation_dock.textarea.appendPlainText("\n".join([
+                    "Compilation: Error on line {0}, column {1} - {2} error: {3} ❌".format(
+                        diagnostic.line, diagnostic.column, diagnostic.kind, diagnostic.message) for diagnostic in result.diagnostics]))
+                if textarea is not None:
+                    textarea.highlightErrorLines([diagnostic.line - 1 for diagnostic in result.diagnostics])
+                    textarea.setLineErrors({ diagnostic.line: diagnostic.message for diagnostic in result.diagnostics })
+                return
+
+            if textarea is not None:
+                textarea.clearLineErrors()
+
+            cls.main_form.destination_dock.set_words(result.words)
+
+            cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Success... ✔️")
+            cls.main_form.compilation_dock.textarea.appendPlainText(result.statistics.summary())
+            cls.main_form.destination_dock.pc        = result.program_counter_and_lines
+            cls.main_form.destination_dock.words     = result.words
+            cls.main_form.destination_dock.file_path = result.file_path
+
+        except InvalidSyntaxException as e:
+            LogSystem.error("Invalid syntax error")
+            cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error on line {0} - {1} ❌".format(e.line, e.message))
+            if textarea is not None:
+                textarea.highlightErrorLine(e.line - 1)
+            return
+        except InternalException as e:
+            LogSystem.error("Internal error")
+            cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error {0} ❌".format(e))
+            return
+        except Exception as e:
+            LogSystem.error(e)
+            cls.main_form.compilation_dock.textarea.appendPlainText("Compilation: Error {0} ❌".format(e))
+            return
+
+        if result.comparison is None:
+            return
+
+        try:
+            # Words were compared in background, views only paint rows that differ
+            comparison = result.comparison
+            cls.main_form.destination_dock.mark_comparison(comparison.destination_rows())
+            cls.main_form.comparison_dock.mark_comparison(comparison.comparison_rows())
+
+            program_counter_and_lines = result.program_counter_and_lines
+            cls.main_form.compilation_dock.textarea.appendPlainText(comparison.summary(program_counter_and_lines, MAX_REPORTED_MISMATCHES))
+            if not comparison.success and textarea is not None:
+                textarea.highlightComparisonLines([line - 1 for line in comparison.lines(program_counter_and_lines)])
+
+        except Exception as e:
+            LogSystem.error(e)
@@ -0,0 +1,270 @@
+"""
+------------------------------------------------------------------------------
+    @file       emulator_system.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Emulator system for IDE, emulator runs in worker thread.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import time
+import threading
+from array                import array
+from PyQt5                import QtCore
+from src.utils.log_system import LogSystem
+from src.hack_emulator    import HackEmulator
+from src.hack_translator  import TranslatingHackEmulator
+from src.hack_profiler    import HackProfile
+
+# Instructions executed between checks for pause, small enough to pause within few milliseconds.
+SLICE_INSTRUCTIONS = 20000
+
+# Shortest time between two snapshots sent to GUI, 30 per second.
+SNAPSHOT_INTERVAL = 1.0 / 30
+
+class EmulatorSnapshot(object):
+
+    __slots__ = ("a", "d", "pc", "instructions", "instructions_per_second", "halted", "ram")
+
+    def __init__(self, emulator):
+        """
+        Constructs copy of emulator state, GUI can read it while emulator keeps running.
+        """
+        self.a                       = emulator.a
+        self.d                       = emulator.d
+        self.pc                      = emulator.pc
+        self.instructions            = emulator.instructions
+        self.instructions_per_second = emulator.instructions_per_second
+        self.halted                  = emulator.halted
+        self.ram                     = array("H", emulator.ram)
+
+class EmulatorWorker(QtCore.QObject):
+
+    snapshot = QtCore.pyqtSignal(object)   # EmulatorSnapshot
+    stopped  = QtCore.pyqtSignal(object)   # EmulatorSnapshot of state where run stopped
+    profiled = QtCore.pyqtSignal(object)   # Executions of every ROM address in profiled run
+
+    def __init__(self):
+        """
+        Constructs worker that owns emulator, its slots are only called through queued connections
+        so emulator is used only from worker thread. Pause is the only request that does not wait in queue.
+        """
+        super().__init__()
+        self.emulator = TranslatingHackEmulator()
+        self.pausing  = threading.Event()
+
+    def pause(self):
+        """ Stop running program, called from GUI thread. """
+        self.pausing.set()
+
+    def resume(self):
+        """ Allow next queued run, called from GUI thread before run is queued so later pause is not lost. """
+        self.pausing.clear()
+
+    @QtCore.pyqtSlot(object)
+    def load(self, words):
+        try:
+            self.emulator.load(words)
+            self.snapshot.emit(EmulatorSnapshot(self.emulator))
+        except Exception as e:
+            LogSystem.error(e)
+
+    @QtCore.pyqtSlot()
+    def reset(self):
+        self.emulator.reset()
+        self.snapshot.emit(EmulatorSnapshot(self.emulator))
+
+    @QtCore.pyqtSlot(bool)
+    def profile(self, profiling):
+        """
+        Turn profiling of next runs on or off, counts start from zero. Profiled run starts
+        from reset state, so whole program is counted even when previous run halted.
+        """
+        self.emulator.set_profiling(profiling)
+        if profiling:
+            self.emulator.reset()
+        self.emulator.clear_profile()
+
+    @QtCore.pyqtSlot()
+    def step(self):
+        self.emulator.step()
+        self.stopped.emit(EmulatorSnapshot(self.emulator))
+
+    @QtCore.pyqtSlot(bool)
+    def run(self, fast):
+        """
+        Run until program halts or pause is requested, fast run executes translated blocks
+        while normal run interprets instruction by instruction.
+        """
+        emulator = self.emulator
+        execute  = emulator.run if fast else (lambda count: HackEmulator.run(emulator, count))
+        last     = time.perf_counter()
+
+        try:
+            while not self.pausing.is_set() and not emulator.halted:
+                execute(SLICE_INSTRUCTIONS)
+                now = time.perf_counter()
+                if now - last >= SNAPSHOT_INTERVAL:
+                    self.snapshot.emit(EmulatorSnapshot(emulator))
+                    last = now
+        except Exception as e:
+            LogSystem.error(e)
+
+        if emulator.profiling:
+            self.profiled.emit(emulator.address_hits())
+        self.stopped.emit(EmulatorSnapshot(emulator))
+
+class EmulatorSystem(object):
+
+    main_form = None
+    thread    = None
+    worker    = None
+    words     = None    # Program loaded into emulator
+    running   = False
+
+    @classmethod
+    def initialize(cls, main_form):
+        """
+        Start emulator worker thread for main form.
+        """
+        cls.main_form = main_form
+        cls.thread    = QtCore.QThread()
+        cls.worker    = EmulatorWorker()
+        cls.worker.moveToThread(cls.thread)
+        cls.worker.snapshot.connect(cls.show_snapshot, QtCore.Qt.QueuedConnection)
+        cls.worker.stopped.connect(cls.show_stopped, QtCore.Qt.QueuedConnection)
+        cls.worker.profiled.connect(cls.show_profile, QtCore.Qt.QueuedConnection)
+        cls.thread.start()
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(cls.shutdown)
+
+    @classmethod
+    def shutdown(cls):
+        """ Stop worker thread. """
+        cls.worker.pause()
+        cls.thread.quit()
+        cls.thread.wait()
+
+    @classmethod
+    def invoke(cls, method, *arguments):
+        """ Queue call of worker slot, it is executed in worker thread. """
+        QtCore.QMetaObject.invokeMethod(cls.worker, method, QtCore.Qt.QueuedConnection, *arguments)
+
+    @classmethod
+    def load_program(cls):
+        """
+        Load last compiled program into emulator.
+        """
+        LogSystem.information("Starting Action Load Program!")
+        words = cls.main_form.destination_dock.words
+        if not words:
+            LogSystem.error("There is no compiled program to run")
+            return False
+        cls.words = words
+        cls.worker.pause()
+        cls.invoke("load", QtCore.Q_ARG(object, list(words)))
+        return True
+
+    @classmethod
+    def run(cls):
+        cls.start(False)
+
+    @classmethod
+    def fast_forward(cls):
+        cls.start(True)
+
+    @classmethod
+    def profile(cls):
+        """
+        Run program fast from start while counting executions of every instruction.
+        """
+        cls.start(True, True)
+
+    @classmethod
+    def start(cls, fast, profiling=False):
+        """
+        Run program in worker thread, program is loaded first if it was compiled since last run.
+        """
+        LogSystem.information("Starting Action Run!")
+        if cls.running:
+            return
+        if cls.main_form.destination_dock.words is not cls.words and not cls.load_program():
+            return
+        cls.running = True
+        cls.main_form.tool_bar.update_emulator_buttons(True)
+        cls.main_form.screen_dock.show()
+        # Screen follows RAM of running emulator on every display refresh, RAM is only read
+        cls.main_form.screen_dock.attach(cls.worker.emulator.ram)
+        cls.worker.resume()
+        cls.invoke("profile", QtCore.Q_ARG(bool, profiling))
+        cls.invoke("run", QtCore.Q_ARG(bool, fast))
+
+    @classmethod
+    def pause(cls):
+        LogSystem.information("Starting Action Pause!")
+        cls.worker.pause()
+
+    @classmethod
+    def step(cls):
+        LogSystem.information("Starting Action Step!")
+        if cls.running:
+            return
+        if cls.main_form.destination_dock.words is not cls.words and not cls.load_program():
+            return
+        cls.invoke("step")
+
+    @classmethod
+    def reset(cls):
+        LogSystem.information("Starting Action Reset!")
+        cls.worker.pause()
+        cls.invoke("reset")
+
+    @classmethod
+    def show_snapshot(cls, snapshot):
+        """
+        Show emulator state in GUI, called at most 30 times per second while program runs.
+        Screen is attached to emulator RAM while program runs, so snapshot only repaints it after step or reset.
+        """
+        try:
+            cls.main_form.screen_dock.refresh(snapshot.ram)
+            cls.main_form.status_bar.update_emulator(snapshot)
+        except Exception as e:
+            LogSystem.error(e)
+
+    @classmethod
+    def show_stopped(cls, snapshot):
+        """
+        Show state where emulator stopped and select instruction that is executed next.
+        """
+        cls.running = False
+        cls.main_form.tool_bar.update_emulator_buttons(False)
+        cls.main_form.screen_dock.detach()
+        cls.show_snapshot(snapshot)
+        try:
+            cls.main_form.destination_dock.select_row(snapshot.pc)
+        except Exception as e:
+            LogSystem.error(e)
+
+    @classmethod
+    def show_profile(cls, address_hits):
+        """
+        Show heat of source lines in editor and hottest lines in profile dock.
+        """
+        try:
+            destination = cls.main_form.destination_dock
+            if not destination.pc:
+                return
+            profile = HackProfile(address_hits, destination.pc)
+            current = cls.main_form.tab_bar.current
+            if current is not None and current.file_path == destination.file_path:
+                current.textarea.setLineHeat(profile.heat())
+                source_lines = current.textarea.toPlainText().split("\n")
+            else:
+                source_lines = []
+            cls.main_form.profile_dock.show_profile(profile, destination.file_path, source_lines)
+            cls.main_form.compilation_dock.textarea.appendPlainText("Profile: " + profile.summary().split("\n")[-1])
+        except Exception as e:
+            LogSystem.error(e)
@@ -31,11 +31,23 @@ class QLineNumberArea(QWidget):
     def paintEvent(self, event):
         self.codeEditor.lineNumberAreaPaintEvent(event)
 
+    def event(self, event):
+        if event.type() == QtCore.QEvent.ToolTip:
+            message = self.codeEditor.lineErrorAt(event.pos().y())
+            if message:
+                QtWidgets.QToolTip.showText(event.globalPos(), message, self)
+            else:
+                QtWidgets.QToolTip.hideText()
+            return True
+        return super().event(event)
+
 class CodeEditorWidget(QPlainTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.setFont(AssetSystem.font)
+        self.lineHeat = {}
+        self.lineErrors = {}
         self.lineNumberArea = QLineNumberArea(self)
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
         self.updateRequest.connect(self.updateLineNumberArea)
@@ -126,39 +138,33 @@ class CodeEditorWidget(QPlainTextEdit):
         self.setExtraSelections(extraSelections)
 
     def highlightErrorLine(self, line):
-        block = self.document().findBlockByLineNumber(line)
-        blockPos = block.position()
-        cursor = QtGui.QTextCursor(self.document())
-        cursor.setPosition(blockPos)
-        cursor.select(QtGui.QTextCursor.LineUnderCursor)
+        self.highlightErrorLines([line])
 
+    def highlightLines(self, lines, lineColor):
         extraSelections = []
-        selection = QTextEdit.ExtraSelection()
-        lineColor = QColor(Qt.red).lighter(170)
-        selection.format.setBackground(lineColor)
-        selection.format.setProperty(QTextFormat.FullWidthSelection, True)
-        selection.cursor = cursor
-        selection.cursor.clearSelection()
-        extraSelections.append(selection)
-        self.setExtraSelections(extraSelections)
 
-    def highlightComparisonLine(self, line):
-        block = self.document().findBlockByLineNumber(line)
-        blockPos = block.position()
-        cursor = QtGui.QTextCursor(self.document())
-        cursor.setPosition(blockPos)
-        cursor.select(QtGui.QTextCursor.LineUnderCursor)
+        for line in lines:
+            block = self.document().findBlockByLineNumber(line)
+            cursor = QtGui.QTextCursor(self.document())
+            cursor.setPosition(block.position())
+
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(lineColor)
+            selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+            selection.cursor = cursor
+            extraSelections.append(selection)
 
-        extraSelections = []
-        selection = QTextEdit.ExtraSelection()
-        lineColor = QColor(Qt.yellow).lighter(130)
-        selection.format.setBackground(lineColor)
-        selection.format.setProperty(QTextFormat.FullWidthSelection, True)
-        selection.cursor = cursor
-        selection.cursor.clearSelection()
-        extraSelections.append(selection)
         self.setExtraSelections(extraSelections)
 
+    def highlightErrorLines(self, lines):
+        self.highlightLines(lines, QColor(Qt.red).lighter(170))
+
+    def highlightComparisonLines(self, lines):
+        self.highlightLines(lines, QColor(Qt.yellow).lighter(130))
+
+    def highlightComparisonLine(self, line):
+        self.highlightComparisonLines([line])
+
     def highlightCurrentLine(self):
         extraSelections = []
         if not self.isReadOnly():
@@ -171,6 +177,30 @@ class CodeEditorWidget(QPlainTextEdit):
             extraSelections.append(selection)
         self.setExtraSelections(extraSelections)
 
+    def setLineHeat(self, heat):
+        """
+        Show profile heat (line -> 0..1, lines numbered from 1) in line number gutter.
+        """
+        self.lineHeat = { line - 1: value for line, value in heat.items() }
+        self.lineNumberArea.update()
+
+    def clearLineHeat(self):
+        self.setLineHeat({})
+
+    def setLineErrors(self, errors):
+        """
+        Show error markers (line -> message, lines numbered from 1) in line number gutter.
+        """
+        self.lineErrors = { line - 1: message for line, message in errors.items() }
+        self.lineNumberArea.update()
+
+    def clearLineErrors(self):
+        self.setLineErrors({})
+
+    def lineErrorAt(self, y):
+        """ Returns error message of line at gutter position or None. """
+        return self.lineErrors.get(self.cursorForPosition(QtCore.QPoint(0, y)).blockNumber())
+
     def lineNumberAreaPaintEvent(self, event):
         painter = QPainter(self.lineNumberArea)
         # painter.fillRect(event.rect(), QColor(35,38,41))
@@ -183,6 +213,10 @@ class CodeEditorWidget(QPlainTextEdit):
         height = self.fontMetrics().height()
         while block.isValid() and (top <= event.rect().bottom()):
             if block.isVisible() and (bottom >= event.rect().top()):
+                if blockNumber in self.lineHeat:
+                    painter.fillRect(0, int(top), self.lineNumberArea.width(), height, QColor(255, 60, 0, int(40 + 180 * self.lineHeat[blockNumber])))
+                if blockNumber in self.lineErrors:
+                    painter.fillRect(0, int(top), 4, height, QColor(Qt.red))
                 number = str(blockNumber + 1)
                 painter.setPen(QColor(150, 150, 150))
                 painter.drawText(0, top, self.lineNumberArea.width(), height, Qt.AlignRight, number)
@@ -11,7 +11,8 @@
     file COPYING or http://www.opensource.org/licenses/mit-license.php.
 ------------------------------------------------------------------------------
 """
-from PyQt5 import QtWidgets, QtCore, QtGui
+from PyQt5                       import QtWidgets, QtCore, QtGui
+from src.widgets.word_list_model import WordListModel
 
 class ComparisonDockWidget(object):
 
@@ -26,19 +27,38 @@ class ComparisonDockWidget(object):
         """
         Initialize all widgets that exist in comparison dock widget.
         """
-        self.file   = None
-        self.hidden = True
-        self.dock   = QtWidgets.QDockWidget("Comparison", self.main_form)
+        self.file        = None
+        self.words       = None      # Words of comparison file
+        self.hidden      = True
+        self.dock        = QtWidgets.QDockWidget("Comparison", self.main_form)
         self.main_form.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.dock)
         self.dock.visibilityChanged.connect(self.dock_visibilty_changed_callback)
 
-        self.list = QtWidgets.QListWidget()
+        self.model = WordListModel()
+        self.list  = QtWidgets.QListView()
+        self.list.setModel(self.model)
+        # All rows have same height, so view never measures rows that are not visible
+        self.list.setUniformItemSizes(True)
         self.list.setFont(QtGui.QFont("Consolas", 10))
 
-        self.list.setStyleSheet("QListWidget { border: 1px solid lightgrey; }")
+        self.list.setStyleSheet("QListView { border: 1px solid lightgrey; }")
         self.dock.setWidget(self.list)
         self.hide()
 
+    def set_words(self, words):
+        """ Show words, rows are created only when they scroll into view. """
+        self.model.set_words(words)
+
+    def mark_comparison(self, rows):
+        """
+        Paint compared rows, rows that differ from other file are yellow and all others green.
+        """
+        self.model.set_mismatches(rows)
+
+    def clear_comparison(self):
+        """ Remove comparison colors. """
+        self.model.clear_mismatches()
+
     def show(self):
         """ Show comparison dock widget. """
         self.dock.show()
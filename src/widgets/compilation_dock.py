@@ -11,7 +11,8 @@
     file COPYING or http://www.opensource.org/licenses/mit-license.php.
 ------------------------------------------------------------------------------
 """
-from PyQt5 import QtWidgets, QtCore, QtGui
+from PyQt5                    import QtWidgets, QtCore, QtGui
+from src.utils.compile_system import CompileSystem
 
 class CompilationDockWidget(object):
 
@@ -37,9 +38,46 @@ class CompilationDockWidget(object):
         self.textarea.setMaximumHeight(120)
 
         self.textarea.setStyleSheet("QPlainTextEdit { border: 1px solid lightgrey; }")
-        self.dock.setWidget(self.textarea)
+
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedHeight(18)
+
+        self.cancel_button = QtWidgets.QPushButton("Cancel")
+        self.cancel_button.setFixedHeight(20)
+        self.cancel_button.clicked.connect(CompileSystem.cancel)
+
+        self.progress_layout = QtWidgets.QHBoxLayout()
+        self.progress_layout.addWidget(self.progress_bar)
+        self.progress_layout.addWidget(self.cancel_button)
+
+        self.widget        = QtWidgets.QWidget()
+        self.widget.layout = QtWidgets.QVBoxLayout(self.widget)
+        self.widget.layout.setContentsMargins(0, 0, 0, 0)
+        self.widget.layout.addWidget(self.textarea)
+        self.widget.layout.addLayout(self.progress_layout)
+        self.dock.setWidget(self.widget)
+        self.stop_progress()
         self.hide()
 
+    def start_progress(self):
+        """ Show progress of compilation that just started. """
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Compiling...")
+        self.progress_bar.show()
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.show()
+
+    def update_progress(self, phase, percent):
+        """ Show phase of running compilation and percent of it that is done. """
+        self.progress_bar.setValue(percent)
+        self.progress_bar.setFormat("{0} %p%".format(phase.capitalize()))
+
+    def stop_progress(self):
+        """ Hide progress when compilation finished or was cancelled. """
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+
     def show(self):
         """ Show compilation dock widget. """
         self.dock.show()
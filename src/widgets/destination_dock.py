@@ -11,7 +11,8 @@
     file COPYING or http://www.opensource.org/licenses/mit-license.php.
 ------------------------------------------------------------------------------
 """
-from PyQt5 import QtWidgets, QtCore, QtGui
+from PyQt5                       import QtWidgets, QtCore, QtGui
+from src.widgets.word_list_model import WordListModel
 
 class DestinationDockWidget(object):
 
@@ -26,30 +27,55 @@ class DestinationDockWidget(object):
         """
         Initialize all widgets that exist in destination dock widget.
         """
-        self.pc        = None
-        self.file_path = None
-        self.hidden    = True
+        self.pc          = None
+        self.file_path   = None
+        self.words       = None
+        self.hidden      = True
         self.dock = QtWidgets.QDockWidget("Destination", self.main_form)
         self.main_form.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.dock)
         self.dock.visibilityChanged.connect(self.dock_visibilty_changed_callback)
 
-        self.list = QtWidgets.QListWidget()
+        self.model = WordListModel()
+        self.list  = QtWidgets.QListView()
+        self.list.setModel(self.model)
+        # All rows have same height, so view never measures rows that are not visible
+        self.list.setUniformItemSizes(True)
         self.list.setFont(QtGui.QFont("Consolas", 10))
 
-        self.list.setStyleSheet("QListWidget { border: 1px solid lightgrey; }")
-        self.list.itemClicked.connect(self.item_clicked_callback)
+        self.list.setStyleSheet("QListView { border: 1px solid lightgrey; }")
+        self.list.clicked.connect(self.item_clicked_callback)
         self.dock.setWidget(self.list)
         self.hide()
 
-    def item_clicked_callback(self, item):
+    def set_words(self, words):
+        """ Show words, rows are created only when they scroll into view. """
+        self.model.set_words(words)
+
+    def mark_comparison(self, rows):
+        """
+        Paint compared rows, rows that differ from other file are yellow and all others green.
+        """
+        self.model.set_mismatches(rows)
+
+    def clear_comparison(self):
+        """ Remove comparison colors. """
+        self.model.clear_mismatches()
+
+    def select_row(self, row):
+        """ Select and show row of instruction on ROM address. """
+        if row < self.model.rowCount():
+            index = self.model.index(row)
+            self.list.setCurrentIndex(index)
+            self.list.scrollTo(index)
+
+    def item_clicked_callback(self, index):
         """
         Destination dock item click callback function.
         """
         try:
             if self.main_form.tab_bar.current.file_path != self.file_path:
                 return
-            index = self.list.indexFromItem(item).row()
-            line  = self.pc[index]
+            line  = self.pc[index.row()]
             self.main_form.tab_bar.current.textarea.highlightSuccLine(line - 1)
         except Exception as e:
             print(e)
@@ -114,6 +114,8 @@ class DirectoryViewWidget(object):
             action_1.triggered.connect(lambda: self.create_new_file(self.current_working_directory))
             action_2 = menu.addAction("Create new directory")
             action_2.triggered.connect(lambda: self.create_new_folder(self.current_working_directory))
+            action_3 = menu.addAction("Compile all files")
+            action_3.triggered.connect(lambda: ActionSystem.compile_directory(self.current_working_directory))
         elif os.path.isfile(file_path):
             LogSystem.success("Requested context menu for file: {0}!".format(file_path))
             action_1 = menu.addAction("Open")
@@ -132,6 +134,8 @@ class DirectoryViewWidget(object):
             action_3.triggered.connect(lambda: self.create_new_folder(file_path))
             action_3 = menu.addAction("Create new file")
             action_3.triggered.connect(lambda: self.create_new_file(file_path))
+            action_4 = menu.addAction("Compile all files")
+            action_4.triggered.connect(lambda: ActionSystem.compile_directory(file_path))
 
         menu.exec_(self.directory_view_tree.mapToGlobal(point))
 
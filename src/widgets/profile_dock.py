@@ -0,0 +1,88 @@
+"""
+------------------------------------------------------------------------------
+    @file       profile_dock.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Profile dock with hottest source lines.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+from PyQt5            import QtWidgets, QtCore, QtGui
+from src.hack_profiler import DEFAULT_TOP_LINES
+
+class ProfileDockWidget(object):
+
+    def __init__(self, main_form):
+        """
+        Constructs profile dock.
+        """
+        self.main_form = main_form
+        self.initialize_all_widgets()
+
+    def initialize_all_widgets(self):
+        """
+        Initialize all widgets that exist in profile dock widget.
+        """
+        self.file_path = None
+        self.hidden    = True
+        self.dock      = QtWidgets.QDockWidget("Profile", self.main_form)
+        self.main_form.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.dock)
+        self.dock.visibilityChanged.connect(self.dock_visibilty_changed_callback)
+
+        self.table = QtWidgets.QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Line", "Hits", "Share", "Source"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setFont(QtGui.QFont("Consolas", 10))
+        self.table.setMaximumHeight(160)
+        self.table.setStyleSheet("QTableWidget { border: 1px solid lightgrey; }")
+        self.table.cellClicked.connect(self.cell_clicked_callback)
+        self.dock.setWidget(self.table)
+        self.hide()
+
+    def show_profile(self, profile, file_path, source_lines, count=DEFAULT_TOP_LINES):
+        """
+        Fill table with hottest lines of profile.
+        """
+        self.file_path = file_path
+        hot_lines      = profile.hot_lines(count)
+        self.table.setRowCount(len(hot_lines))
+        for row, (line, hits, share) in enumerate(hot_lines):
+            source = source_lines[line - 1].strip() if line <= len(source_lines) else ""
+            for column, text in enumerate([str(line), str(hits), "{0:.1%}".format(share), source]):
+                item = QtWidgets.QTableWidgetItem(text)
+                if column < 3:
+                    item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+        self.show()
+
+    def cell_clicked_callback(self, row, column):
+        """
+        Highlight clicked line in editor.
+        """
+        try:
+            if self.main_form.tab_bar.current.file_path != self.file_path:
+                return
+            line = int(self.table.item(row, 0).text())
+            self.main_form.tab_bar.current.textarea.highlightSuccLine(line - 1)
+        except Exception as e:
+            print(e)
+
+    def show(self):
+        """ Show profile dock widget. """
+        self.dock.show()
+
+    def hide(self):
+        """ Hide profile dock widget. """
+        self.dock.hide()
+
+    def dock_visibilty_changed_callback(self, visible):
+        """ Change visibility status of profile dock widget. """
+        self.hidden = not visible
@@ -0,0 +1,102 @@
+"""
+------------------------------------------------------------------------------
+    @file       screen_dock.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      Screen dock.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+from PyQt5          import QtWidgets, QtCore, QtGui
+from src.hack_screen import HackScreen, dirty_bands, SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Screen memory is checked for changes on every display refresh.
+SCREEN_REFRESH_INTERVAL = 16
+
+class ScreenView(QtWidgets.QWidget):
+
+    def __init__(self, screen, parent=None):
+        """
+        Constructs view that paints screen pixels, image shares memory with screen pixel buffer.
+        """
+        super().__init__(parent)
+        self.screen = screen
+        self.image  = QtGui.QImage(screen.pixels.data, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_WIDTH, QtGui.QImage.Format_Indexed8)
+        self.image.setColorTable([QtGui.qRgb(255, 255, 255), QtGui.qRgb(0, 0, 0)])
+        self.setFixedSize(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.drawImage(event.rect(), self.image, event.rect())
+
+class ScreenDockWidget(object):
+
+    def __init__(self, main_form):
+        """
+        Constructs screen dock.
+        """
+        self.main_form = main_form
+        self.initialize_all_widgets()
+
+    def initialize_all_widgets(self):
+        """
+        Initialize all widgets that exist in screen dock widget.
+        """
+        self.ram    = None
+        self.hidden = True
+        self.screen = HackScreen()
+        self.dock   = QtWidgets.QDockWidget("Screen", self.main_form)
+        self.main_form.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.dock)
+        self.dock.visibilityChanged.connect(self.dock_visibilty_changed_callback)
+
+        self.view = ScreenView(self.screen)
+        self.view.setStyleSheet("QWidget { border: 1px solid lightgrey; }")
+        self.dock.setWidget(self.view)
+
+        self.timer = QtCore.QTimer(self.main_form)
+        self.timer.setInterval(SCREEN_REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def attach(self, ram):
+        """
+        Show RAM (array of 16 bit words) on screen, it is checked for changes on every display refresh.
+        """
+        self.ram = ram
+        self.refresh()
+        self.timer.start()
+
+    def detach(self):
+        """ Stop following RAM, last picture stays on screen. """
+        self.refresh()
+        self.timer.stop()
+        self.ram = None
+
+    def refresh(self, ram=None):
+        """
+        Convert changed screen rows to pixels and repaint only them. Attached RAM is shown
+        instead of given RAM, snapshot is older than picture that is already on screen.
+        """
+        ram = self.ram if self.ram is not None else ram
+        if ram is None or self.hidden:
+            return
+        for first, end in dirty_bands(self.screen.update(ram)):
+            self.view.update(0, first, SCREEN_WIDTH, end - first)
+
+    def show(self):
+        """ Show screen dock widget. """
+        self.dock.show()
+
+    def hide(self):
+        """ Hide screen dock widget. """
+        self.dock.hide()
+
+    def dock_visibilty_changed_callback(self, visible):
+        """ Change visibility status of screen dock widget. """
+        self.hidden = not visible
+        if visible:
+            self.refresh()
@@ -31,6 +31,8 @@ class StatusBarWidget(object):
         self.row_col_label = QtWidgets.QLabel()
         self.row_col_label.setText("   Ln: 0, Col: 0   ")
         self.status_bar.addWidget(self.row_col_label)
+        self.emulator_label = QtWidgets.QLabel()
+        self.status_bar.addPermanentWidget(self.emulator_label)
         self.main_form.setStatusBar(self.status_bar)
         self.hide()
 
@@ -40,6 +42,14 @@ class StatusBarWidget(object):
         """
         self.row_col_label.setText("   Ln: {0}, Col: {1}   ".format(line, col))
 
+    def update_emulator(self, snapshot):
+        """
+        Update emulator registers and speed in status bar.
+        """
+        self.emulator_label.setText("   {0} A: {1}, D: {2}, PC: {3}, {4} instructions, {5:.2f} MIPS   ".format(
+            "Halted" if snapshot.halted else "CPU", snapshot.a, snapshot.d, snapshot.pc,
+            snapshot.instructions, snapshot.instructions_per_second / 1e6))
+
     def hide(self):
         """ Hide status bar. """
         self.row_col_label.hide()
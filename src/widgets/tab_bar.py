@@ -14,9 +14,14 @@
 from PyQt5                          import QtWidgets, QtCore, QtGui
 from src.utils.log_system           import LogSystem
 from src.utils.action_system        import ActionSystem
+from src.utils.compile_system       import CompileSystem
 from src.utils.asset_system         import AssetSystem
 from src.widgets.code_editor        import CodeEditorWidget
 from src.widgets.syntax_highlighter import SyntaxHighlighter
+from src.hack_incremental_compiler  import IncrementalHackAssemblyCompiler
+
+# Time without typing before diagnostics are collected, it grows by one millisecond for every thousand lines.
+LIVE_DIAGNOSTICS_DELAY = 400
 
 class TabStruct(object):
 
@@ -29,6 +34,9 @@ class TabStruct(object):
         self.saved     = False                 # Save status for code editor
         self.title     = "untitled"            # Title of tab
         self.file_path = None                  # File path
+        self.extension = None                  # File extension
+        self.diagnosed = None                  # Hash of text whose diagnostics are shown
+        self.assembler = IncrementalHackAssemblyCompiler(ActionSystem.cache, collect_diagnostics=True) # Compiler that keeps state between compilations
         self.initialize_all_widgets()          # Initialize all widgets
 
     def initialize_all_widgets(self):
@@ -40,6 +48,10 @@ class TabStruct(object):
         self.textarea.cursorPositionChanged.connect(self.textarea_cursor_change_callback)
         self.textarea.textChanged.connect(self.textarea_text_changed_callback)
 
+        self.diagnostics_timer = QtCore.QTimer()
+        self.diagnostics_timer.setSingleShot(True)
+        self.diagnostics_timer.timeout.connect(self.diagnostics_timer_callback)
+
     def textarea_cursor_change_callback(self):
         """
         Text area cursor chage callback function.
@@ -56,6 +68,21 @@ class TabStruct(object):
             self.saved = False
             self.textarea.setExtraSelections([])
 
+        # Diagnostics are collected when typing stops, every change restarts timer
+        if self.extension in (None, "asm"):
+            self.diagnostics_timer.start(LIVE_DIAGNOSTICS_DELAY + self.textarea.blockCount() // 1000)
+
+    def diagnostics_timer_callback(self):
+        """
+        Collect diagnostics of edited text in background, text that was already diagnosed is skipped.
+        """
+        text      = self.textarea.toPlainText()
+        text_hash = hash(text)
+        if text_hash == self.diagnosed:
+            return
+        self.diagnosed = text_hash
+        CompileSystem.diagnose(self, text)
+
     def apply_new_font(self, font):
         """
         Apply new font to code editor in tab.
@@ -106,6 +133,7 @@ class TabBarWidget(object):
         for tab in self.tabs:
             if tab.widget == widget:
                 LogSystem.warning("Removing requested tab! [Index {0}]".format(self.tabs.index(tab)))
+                tab.diagnostics_timer.stop()
                 self.tabs.remove(tab)
                 break
 
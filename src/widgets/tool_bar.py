@@ -12,7 +12,8 @@
 ------------------------------------------------------------------------------
 """
 from PyQt5                   import QtWidgets, QtCore, QtGui
-from src.utils.action_system import ActionSystem
+from src.utils.action_system   import ActionSystem
+from src.utils.emulator_system import EmulatorSystem
 class ToolBarWidget(object):
 
     def __init__(self, main_form):
@@ -115,6 +116,45 @@ class ToolBarWidget(object):
         self.tool_bar.addWidget(self.export_dest_button)
         self.export_dest_button.clicked.connect(ActionSystem.export_destination)
 
+        self.tool_bar.addSeparator()
+
+        self.run_button = QtWidgets.QPushButton()
+        self.run_button.setIcon(QtGui.QIcon("./assets/icons/forward.png"))
+        self.run_button.setToolTip("Run Program")
+        self.tool_bar.addWidget(self.run_button)
+        self.run_button.clicked.connect(EmulatorSystem.run)
+
+        self.fast_forward_button = QtWidgets.QPushButton()
+        self.fast_forward_button.setIcon(QtGui.QIcon("./assets/icons/fastf.png"))
+        self.fast_forward_button.setToolTip("Fast Forward Program")
+        self.tool_bar.addWidget(self.fast_forward_button)
+        self.fast_forward_button.clicked.connect(EmulatorSystem.fast_forward)
+
+        self.step_button = QtWidgets.QPushButton()
+        self.step_button.setIcon(self.main_form.style().standardIcon(QtWidgets.QStyle.SP_MediaSkipForward))
+        self.step_button.setToolTip("Step One Instruction")
+        self.tool_bar.addWidget(self.step_button)
+        self.step_button.clicked.connect(EmulatorSystem.step)
+
+        self.profile_button = QtWidgets.QPushButton()
+        self.profile_button.setIcon(QtGui.QIcon("./assets/icons/quick.png"))
+        self.profile_button.setToolTip("Profile Program")
+        self.tool_bar.addWidget(self.profile_button)
+        self.profile_button.clicked.connect(EmulatorSystem.profile)
+
+        self.pause_button = QtWidgets.QPushButton()
+        self.pause_button.setIcon(QtGui.QIcon("./assets/icons/pause.png"))
+        self.pause_button.setToolTip("Pause Program")
+        self.tool_bar.addWidget(self.pause_button)
+        self.pause_button.clicked.connect(EmulatorSystem.pause)
+
+        self.reset_button = QtWidgets.QPushButton()
+        self.reset_button.setIcon(QtGui.QIcon("./assets/icons/rewind.png"))
+        self.reset_button.setToolTip("Reset Program")
+        self.tool_bar.addWidget(self.reset_button)
+        self.reset_button.clicked.connect(EmulatorSystem.reset)
+
+        self.update_emulator_buttons(False)
         self.disable()
 
     def enable(self):
@@ -137,4 +177,14 @@ class ToolBarWidget(object):
         self.paste_button.setEnabled(False)
         self.undo_button.setEnabled(False)
         self.redo_button.setEnabled(False)
-        self.compile_button.setEnabled(False)
\ No newline at end of file
+        self.compile_button.setEnabled(False)
+
+    def update_emulator_buttons(self, running):
+        """
+        Enable emulator buttons that can be used while program is running or stopped.
+        """
+        self.run_button.setEnabled(not running)
+        self.fast_forward_button.setEnabled(not running)
+        self.step_button.setEnabled(not running)
+        self.profile_button.setEnabled(not running)
+        self.pause_button.setEnabled(running)
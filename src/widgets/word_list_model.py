@@ -0,0 +1,71 @@
+"""
+------------------------------------------------------------------------------
+    @file       word_list_model.py
+    @author     Milos Milicevic (milosh.mkv@gmail.com)
+    @brief      List model of hack words for destination and comparison docks.
+    @version    0.1
+    @date       2020-08-29
+    @copyright 	Copyright (c) 2020
+
+    Distributed under the MIT software license, see the accompanying
+    file COPYING or http://www.opensource.org/licenses/mit-license.php.
+------------------------------------------------------------------------------
+"""
+import numpy as np
+from PyQt5                 import QtCore, QtGui
+from src.hack_disassembler import MNEMONICS, LISTING_SEPARATOR
+
+MATCH_COLOR    = QtGui.QColor(170, 255, 170)
+MISMATCH_COLOR = QtGui.QColor(255, 255, 100)
+
+class WordListModel(QtCore.QAbstractListModel):
+
+    def __init__(self, parent=None):
+        """
+        Constructs model over packed array of words, row text and color are produced only when
+        view asks for them. Comparison result is kept as bitmap of mismatching rows.
+        """
+        super().__init__(parent)
+        self.words      = np.zeros(0, dtype=np.uint16)
+        self.mismatches = None      # None when words were not compared
+
+    def set_words(self, words):
+        """
+        Show words, they are copied so source array can still change.
+        """
+        self.beginResetModel()
+        self.words      = np.array(words if words is not None else [], dtype=np.uint16)
+        self.mismatches = None
+        self.endResetModel()
+
+    def set_mismatches(self, rows):
+        """
+        Mark compared words, rows that differ are painted as mismatches and all others as matches.
+        """
+        self.mismatches       = np.zeros(len(self.words), dtype=bool)
+        self.mismatches[rows] = True
+        self.__colors_changed()
+
+    def clear_mismatches(self):
+        if self.mismatches is None:
+            return
+        self.mismatches = None
+        self.__colors_changed()
+
+    def __colors_changed(self):
+        if len(self.words):
+            self.dataChanged.emit(self.index(0), self.index(len(self.words) - 1), [QtCore.Qt.BackgroundRole])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.words)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            word = int(self.words[row])
+            return format(word, "016b") + LISTING_SEPARATOR + str(MNEMONICS[word])
+        if role == QtCore.Qt.BackgroundRole and self.mismatches is not None:
+            return MISMATCH_COLOR if self.mismatches[row] else MATCH_COLOR
+        return None
@@ -0,0 +1,9 @@
+"""
+------------------------------------------------------------------------------
+    @file       conftest.py
+    @brief      Qt widgets in tests are created without display.
+------------------------------------------------------------------------------
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
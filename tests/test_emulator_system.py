@@ -0,0 +1,138 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_emulator_system.py
+    @brief      Tests of emulator worker, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import time
+import pytest
+from PyQt5                         import QtCore
+from src.utils.emulator_system     import EmulatorWorker, SLICE_INSTRUCTIONS
+from src.hack_incremental_compiler import IncrementalHackAssemblyCompiler
+
+# R2 = R0 * R1, R0 is 6 after reset so program runs same loop on every run.
+MULTIPLY = """
+    @6
+    D=A
+    @R0
+    M=D
+    @7
+    D=A
+    @R1
+    M=D
+    @R2
+    M=0
+(LOOP)
+    @R1
+    D=M
+    @R2
+    M=D+M
+    @R0
+    MD=M-1
+    @LOOP
+    D;JNE
+(END)
+    @END
+    0;JMP
+"""
+
+LOOP = """
+(LOOP)
+    @i
+    M=M+1
+    @LOOP
+    0;JMP
+"""
+
+def assemble(source):
+    compiler = IncrementalHackAssemblyCompiler()
+    compiler.update(source)
+    return list(compiler.words)
+
+@pytest.fixture
+def application():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+@pytest.fixture
+def worker(application):
+    worker = EmulatorWorker()
+    worker.profiles = []
+    worker.profiled.connect(worker.profiles.append)
+    worker.load(assemble(MULTIPLY))
+    return worker
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_profile_after_halted_run_counts_whole_program(worker, fast):
+    worker.profile(False)
+    worker.run(fast)
+    assert worker.emulator.halted and worker.emulator.ram[2] == 42
+
+    worker.profile(True)
+    worker.run(True)
+    first = worker.profiles[-1]
+    assert sum(first) == worker.emulator.instructions > 0
+
+    # Second profile counts same run again, not sum of both
+    worker.profile(True)
+    worker.run(True)
+    assert worker.profiles[-1] == first
+
+def wait_for(application, condition, timeout=5.0):
+    """ Process events until condition holds, returns False on timeout. """
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            return False
+        application.processEvents(QtCore.QEventLoop.AllEvents, 10)
+    return True
+
+@pytest.fixture
+def thread_worker(application):
+    """ Worker in its own thread, stopped snapshots are collected in list. """
+    thread = QtCore.QThread()
+    worker = EmulatorWorker()
+    worker.moveToThread(thread)
+    worker.stops = []
+    worker.stopped.connect(worker.stops.append, QtCore.Qt.DirectConnection)
+    thread.start()
+    QtCore.QMetaObject.invokeMethod(worker, "load", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(object, assemble(LOOP)))
+    yield worker
+    worker.pause()
+    thread.quit()
+    thread.wait()
+
+def start(worker, fast):
+    worker.resume()
+    QtCore.QMetaObject.invokeMethod(worker, "profile", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, False))
+    QtCore.QMetaObject.invokeMethod(worker, "run", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(bool, fast))
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_run_pause_and_resume_in_worker_thread(application, thread_worker, fast):
+    start(thread_worker, fast)
+    assert wait_for(application, lambda: thread_worker.emulator.instructions >= SLICE_INSTRUCTIONS)
+    thread_worker.pause()
+    assert wait_for(application, lambda: len(thread_worker.stops) == 1)
+
+    # Pause is checked between slices, so run stops on slice boundary and program keeps state
+    paused = thread_worker.stops[0]
+    assert not paused.halted
+    assert paused.instructions % SLICE_INSTRUCTIONS == 0
+    assert paused.ram[16] == paused.instructions // 4
+
+    start(thread_worker, fast)
+    assert wait_for(application, lambda: thread_worker.emulator.instructions > paused.instructions)
+    thread_worker.pause()
+    assert wait_for(application, lambda: len(thread_worker.stops) == 2)
+    assert thread_worker.stops[1].instructions > paused.instructions
+
+def test_pause_before_queued_run_starts_is_kept(application):
+    # Worker without thread runs queued calls only when events are processed
+    worker = EmulatorWorker()
+    worker.stops = []
+    worker.stopped.connect(worker.stops.append)
+    worker.load(assemble(LOOP))
+
+    start(worker, True)
+    worker.pause()
+    assert wait_for(application, lambda: worker.stops)
+    assert worker.stops[0].instructions == 0
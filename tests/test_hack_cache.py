@@ -0,0 +1,84 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_cache.py
+    @brief      Tests of compilation cache, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+from src.hack_cache    import HackAssemblyCache, CACHE_HEADER
+from src.hack_compiler import HackAssemblyCompiler
+
+SOURCE = "@i\nM=1\n(LOOP)\n@i\nMD=M+1\n@LOOP\nD;JGT\n@5\n@6\nD=A\n"
+
+def compile_source(directory, cache, source=SOURCE, optimize=False):
+    path = os.path.join(str(directory), "program.asm")
+    with open(path, "w") as file:
+        file.write(source)
+    compiler = HackAssemblyCompiler(path, None, cache=cache, optimize=optimize)
+    compiler.compile()
+    return compiler
+
+def entry_path(cache, source, variant=""):
+    key = cache.key(source, variant)
+    return os.path.join(cache.directory, key[:2], key + ".bin")
+
+def test_cache_hit_returns_identical_result(tmp_path):
+    cache = HackAssemblyCache(str(tmp_path / "cache"))
+    cold  = compile_source(tmp_path, cache)
+    warm  = compile_source(tmp_path, cache)
+
+    assert not cold.statistics.cache_hit and warm.statistics.cache_hit
+    assert warm.words == cold.words
+    assert warm.program_counter_and_lines == cold.program_counter_and_lines
+
+def test_changed_source_or_option_misses(tmp_path):
+    cache = HackAssemblyCache(str(tmp_path / "cache"))
+    compile_source(tmp_path, cache)
+
+    changed = compile_source(tmp_path, cache, SOURCE.replace("@6", "@7"))
+    assert not changed.statistics.cache_hit
+    assert changed.words[-2] == 7
+
+    optimized = compile_source(tmp_path, cache, optimize=True)
+    assert not optimized.statistics.cache_hit
+    assert len(optimized.words) < len(compile_source(tmp_path, cache).words)
+    assert compile_source(tmp_path, cache, optimize=True).statistics.cache_hit
+
+def test_corrupted_entry_is_compiled_again(tmp_path):
+    cache = HackAssemblyCache(str(tmp_path / "cache"))
+    words = compile_source(tmp_path, cache).words
+    path  = entry_path(cache, SOURCE)
+
+    for corrupt in (lambda data: data[:-3], lambda data: b"BROKEN!!" + data[8:], lambda data: data[:CACHE_HEADER.size - 1]):
+        with open(path, "rb") as file:
+            data = file.read()
+        with open(path, "wb") as file:
+            file.write(corrupt(data))
+
+        assert cache.load(SOURCE) is None
+        compiler = compile_source(tmp_path, cache)
+        assert not compiler.statistics.cache_hit and compiler.words == words
+        # Valid entry replaces corrupted one
+        assert cache.load(SOURCE) is not None
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache   = HackAssemblyCache(str(tmp_path / "cache"))
+    sources = ["@{0}\nD=A\n".format(value) for value in range(4)]
+    for age, source in enumerate(sources):
+        cache.store(source, [age, 0xEC10], { 0: 1, 1: 2 })
+        os.utime(entry_path(cache, source), (1000 + age, 1000 + age))
+    size = os.path.getsize(entry_path(cache, sources[0]))
+
+    # Reading entry marks it as recently used
+    assert cache.load(sources[0]) is not None
+
+    cache.max_size = size * 2
+    cache.evict()
+
+    assert [cache.load(source) is not None for source in sources] == [True, False, False, True]
+
+def test_clear_removes_all_entries(tmp_path):
+    cache = HackAssemblyCache(str(tmp_path / "cache"))
+    compile_source(tmp_path, cache)
+    cache.clear()
+    assert cache.load(SOURCE) is None
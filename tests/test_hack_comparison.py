@@ -0,0 +1,63 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_comparison.py
+    @brief      Tests of destination and comparison check, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+from src.hack_comparison           import HackComparison
+from src.hack_incremental_compiler import IncrementalHackAssemblyCompiler
+
+# Address of every word mapped to its source line, two lines have no instruction.
+LINES = { 0: 1, 1: 2, 2: 4, 3: 5, 4: 6, 5: 8 }
+
+def test_equal_words():
+    comparison = HackComparison([1, 2, 3], [1, 2, 3])
+    assert comparison.success
+    assert comparison.mismatches.tolist() == []
+    assert comparison.lines(LINES) == []
+    assert comparison.summary(LINES, 5).startswith("Comparison: Success")
+
+def test_every_mismatch_is_reported():
+    comparison = HackComparison([1, 2, 3, 4, 5, 6], [1, 9, 3, 9, 5, 9])
+    assert not comparison.success
+    assert comparison.mismatches.tolist() == [1, 3, 5]
+    assert comparison.destination_rows().tolist() == comparison.comparison_rows().tolist() == [1, 3, 5]
+    assert comparison.lines(LINES) == [2, 5, 8]
+    assert comparison.summary(LINES, 2) == "Comparison: Failed - 3 of 6 words differ on lines 2, 5, ... ❌"
+
+def test_longer_destination():
+    comparison = HackComparison([1, 2, 3, 4, 5], [1, 2, 7])
+    assert comparison.mismatches.tolist() == [2, 3, 4]
+    assert comparison.destination_rows().tolist() == [2, 3, 4]
+    assert comparison.comparison_rows().tolist() == [2]
+    assert comparison.lines(LINES) == [4, 5, 6]
+    assert "(destination has 5 words, comparison file 3)" in comparison.summary(LINES, 5)
+
+def test_longer_comparison():
+    comparison = HackComparison([1, 2], [1, 2, 3, 4])
+    assert comparison.mismatches.tolist() == [2, 3]
+    assert comparison.destination_rows().tolist() == []
+    assert comparison.comparison_rows().tolist() == [2, 3]
+    # Missing destination words have no source lines
+    assert comparison.lines(LINES) == []
+    assert comparison.summary(LINES, 5) == \
+        "Comparison: Failed - 2 of 4 words differ (destination has 2 words, comparison file 4) ❌"
+
+def test_empty_destination():
+    comparison = HackComparison([], [0xEC10])
+    assert comparison.mismatches.tolist() == [0]
+    assert comparison.destination_rows().tolist() == [] and comparison.comparison_rows().tolist() == [0]
+
+def test_full_word_range():
+    comparison = HackComparison([0xFFFF, 0x8000, 0x7FFF], [0xFFFF, 0x0000, 0x7FFF])
+    assert comparison.mismatches.tolist() == [1]
+
+def test_lines_of_compiled_program():
+    compiler = IncrementalHackAssemblyCompiler()
+    compiler.update("// comment\n@i\nM=1\n\n(LOOP)\n@i\nMD=M+1\n@LOOP\nD;JGT\n")
+    expected = list(compiler.words)
+    expected[3] ^= 1
+
+    comparison = HackComparison(compiler.words, expected + [0])
+    assert comparison.mismatches.tolist() == [3, 6]
+    assert comparison.lines(compiler.program_counter_and_lines) == [7]
@@ -0,0 +1,65 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_compiler.py
+    @brief      Tests of hack assembly compiler, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+import pytest
+from src.hack_compiler import HackAssemblyCompiler, InvalidSyntaxException
+
+def write_source(directory, name, source):
+    path = os.path.join(str(directory), name)
+    with open(path, "w") as file:
+        file.write(source)
+    return path
+
+def test_failing_streaming_compile_leaves_no_output(tmp_path):
+    source   = write_source(tmp_path, "err.asm", "@1\nD=A\nD=Q\n")
+    out_file = os.path.join(str(tmp_path), "err.hack")
+
+    with pytest.raises(InvalidSyntaxException):
+        HackAssemblyCompiler(source, out_file, streaming=True).compile()
+
+    assert os.listdir(str(tmp_path)) == ["err.asm"]
+
+def test_failing_streaming_compile_keeps_previous_output(tmp_path):
+    source   = write_source(tmp_path, "err.asm", "@1\nD=A\nD=Q\n")
+    out_file = write_source(tmp_path, "err.hack", "0000000000000001\n")
+
+    with pytest.raises(InvalidSyntaxException):
+        HackAssemblyCompiler(source, out_file, streaming=True).compile()
+
+    with open(out_file) as file:
+        assert file.read() == "0000000000000001\n"
+    assert sorted(os.listdir(str(tmp_path))) == ["err.asm", "err.hack"]
+
+def test_streaming_compile_with_diagnostics_leaves_no_output(tmp_path):
+    source   = write_source(tmp_path, "err.asm", "@1\nD=Q\n@2\nM=Z\n")
+    out_file = os.path.join(str(tmp_path), "err.hack")
+
+    compiler = HackAssemblyCompiler(source, out_file, streaming=True, collect_diagnostics=True)
+    compiler.compile()
+
+    assert [diagnostic.line for diagnostic in compiler.diagnostics] == [2, 4]
+    assert os.listdir(str(tmp_path)) == ["err.asm"]
+
+def test_streaming_compile_matches_compile(tmp_path):
+    source = write_source(tmp_path, "ok.asm", "@i\nM=1\n(LOOP)\n@i\nMD=M+1\n@LOOP\nD;JGT\n")
+    HackAssemblyCompiler(source, os.path.join(str(tmp_path), "stream.hack"), streaming=True).compile()
+    HackAssemblyCompiler(source, os.path.join(str(tmp_path), "memory.hack")).compile()
+
+    with open(os.path.join(str(tmp_path), "stream.hack")) as stream, open(os.path.join(str(tmp_path), "memory.hack")) as memory:
+        assert stream.read() == memory.read()
+
+def test_summary_of_compile_in_memory_has_no_bytes_written(tmp_path):
+    source   = write_source(tmp_path, "ok.asm", "@1\nD=A\n")
+    compiler = HackAssemblyCompiler(source, None)
+    compiler.compile()
+    assert "bytes written" not in compiler.statistics.summary()
+
+def test_summary_of_compile_to_file_has_bytes_written(tmp_path):
+    source   = write_source(tmp_path, "ok.asm", "@1\nD=A\n")
+    compiler = HackAssemblyCompiler(source, os.path.join(str(tmp_path), "ok.hack"))
+    compiler.compile()
+    assert "34 bytes written" in compiler.statistics.summary()
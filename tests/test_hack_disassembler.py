@@ -0,0 +1,54 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_disassembler.py
+    @brief      Tests of vectorized decoder and disassembler, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+import pytest
+import numpy as np
+from src.hack_compiler     import HackAssemblyCompiler, C_INSTRUCTIONS, words_to_text
+from src.hack_rom          import InvalidRomException
+from src.hack_disassembler import decode_hack, read_hack, disassemble, words_to_binary, listing, LISTING_SEPARATOR
+
+SOURCE = "@i\nM=1\n(LOOP)\n@i\nMD=M+1\n@LOOP\nD;JGT\n@SCREEN\nAM=D|M;JMP\n@32767\nM=!D\n"
+
+def test_every_c_instruction_disassembles_to_its_encoding():
+    words     = np.array(sorted(set(C_INSTRUCTIONS.values())), dtype=np.uint16)
+    mnemonics = disassemble(words).tolist()
+    assert [C_INSTRUCTIONS[mnemonic] for mnemonic in mnemonics] == words.tolist()
+
+def test_a_instructions_disassemble_to_value():
+    words = np.array([0, 1, 16384, 32767], dtype=np.uint16)
+    assert disassemble(words).tolist() == ["@0", "@1", "@16384", "@32767"]
+
+def test_decoded_hack_file_equals_compiled_words(tmp_path):
+    source   = os.path.join(str(tmp_path), "program.asm")
+    out_file = os.path.join(str(tmp_path), "program.hack")
+    with open(source, "w") as file:
+        file.write(SOURCE)
+    compiler = HackAssemblyCompiler(source, out_file)
+    compiler.compile()
+
+    words = read_hack(out_file)
+    assert words.tolist() == list(compiler.words)
+    assert listing(words) == ["{0}{1}{2}".format(format(word, "016b"), LISTING_SEPARATOR, mnemonic)
+                              for word, mnemonic in zip(compiler.words, disassemble(words).tolist())]
+
+def test_irregular_whitespace_is_decoded():
+    words = [5, 0xEC10, 0x8000, 0xFFFF]
+    data  = words_to_text(words)
+    for variant in (data.rstrip("\n"), data.replace("\n", "\r\n"), "\n" + data.replace("\n", "\n\n")):
+        assert decode_hack(variant.encode()).tolist() == words
+
+def test_empty_file():
+    assert decode_hack(b"").tolist() == []
+
+@pytest.mark.parametrize("data", [b"0000000000000002\n", b"000000000000000\n", b"0000000000000000\n00000000000000001\n"])
+def test_invalid_words(data):
+    with pytest.raises(InvalidRomException):
+        decode_hack(data)
+
+def test_words_to_binary():
+    words = [0, 1, 0x8000, 0xEC10]
+    assert words_to_binary(words).tolist() == [format(word, "016b") for word in words]
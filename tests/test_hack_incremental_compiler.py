@@ -0,0 +1,55 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_incremental_compiler.py
+    @brief      Tests of incremental compiler against full compiler, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+import random
+import pytest
+from src.hack_compiler             import HackAssemblyCompiler
+from src.hack_incremental_compiler import IncrementalHackAssemblyCompiler
+
+LINES = ["@L0", "@L1", "@L2", "(L0)", "(L1)", "(L2)", "@i", "@j", "@5", "@R1",
+         "D=A", "M=D", "D=D+M", "0;JMP", "D;JGT", "// comment", ""]
+
+def compile_full(directory, text):
+    path = os.path.join(str(directory), "program.asm")
+    with open(path, "w") as file:
+        file.write(text)
+    compiler = HackAssemblyCompiler(path, None)
+    compiler.compile()
+    return list(compiler.words)
+
+def edit(generator, lines):
+    """ Returns copy of lines with one random swap, insertion, deletion or replacement. """
+    lines = list(lines)
+    index = generator.randrange(len(lines))
+    kind  = generator.choice(["swap", "swap", "insert", "delete", "replace"])
+    if kind == "swap" and index + 1 < len(lines):
+        lines[index], lines[index + 1] = lines[index + 1], lines[index]
+    elif kind == "insert":
+        lines.insert(index, generator.choice(LINES))
+    elif kind == "delete" and len(lines) > 1:
+        del lines[index]
+    else:
+        lines[index] = generator.choice(LINES)
+    return lines
+
+def test_swapped_label_and_instruction_moves_label(tmp_path):
+    compiler = IncrementalHackAssemblyCompiler()
+    compiler.update("@L\n0;JMP\n(L)\n@1\nD=A\n")
+    compiler.update("@L\n0;JMP\n@1\n(L)\nD=A\n")
+    assert list(compiler.words) == compile_full(tmp_path, "@L\n0;JMP\n@1\n(L)\nD=A\n") == [3, 0b1110101010000111, 1, 0b1110110000010000]
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_edits_match_full_compile(tmp_path, seed):
+    generator = random.Random(seed)
+    lines     = [generator.choice(LINES) for _ in range(30)]
+    compiler  = IncrementalHackAssemblyCompiler()
+
+    for _ in range(50):
+        text = "\n".join(lines)
+        compiler.update(text)
+        assert list(compiler.words) == compile_full(tmp_path, text), text
+        lines = edit(generator, lines)
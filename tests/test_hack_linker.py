@@ -0,0 +1,58 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_linker.py
+    @brief      Tests of module linker, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+from src.hack_compiler import HackAssemblyCompiler
+from src.hack_linker   import HackLinker
+
+MODULES = {
+    "main.asm": "@count\nM=0\n@LOOP\n0;JMP\n(END)\n@END\n0;JMP\n",
+    "loop.asm": "(LOOP)\n@count\nMD=M+1\n@limit\nD=D-M\n@END\nD;JGE\n@LOOP\n0;JMP\n",
+    "data.asm": "(END)\n@SCREEN\nM=-1\n@limit\nD=M\n@other\nM=D\n",
+}
+
+def write_modules(directory, modules):
+    paths = []
+    for name, source in modules.items():
+        path = os.path.join(str(directory), name)
+        with open(path, "w") as file:
+            file.write(source)
+        paths.append(path)
+    return paths
+
+def test_linked_program_equals_concatenated_modules(tmp_path):
+    paths  = write_modules(tmp_path, MODULES)
+    linker = HackLinker(paths, cache_directory=None)
+    linker.build()
+
+    concatenated = os.path.join(str(tmp_path), "all.asm")
+    with open(concatenated, "w") as file:
+        file.write("".join(MODULES.values()))
+    compiler = HackAssemblyCompiler(concatenated, None)
+    compiler.compile()
+
+    assert list(linker.words) == list(compiler.words)
+    # Lines are kept per module
+    assert linker.module_at(6) == paths[1] and linker.program_counter_and_lines[6] == 2
+
+def test_unchanged_modules_reuse_object_files(tmp_path):
+    paths = write_modules(tmp_path, MODULES)
+    cache = str(tmp_path / "cache")
+
+    first = HackLinker(paths, cache_directory=cache)
+    words = list(first.build())
+    assert first.assembled == paths and first.reused == []
+
+    # New linker finds object files in cache
+    second = HackLinker(paths, cache_directory=cache)
+    assert list(second.build()) == words
+    assert second.assembled == [] and second.reused == paths
+
+    # Only changed module is assembled again
+    with open(paths[2], "a") as file:
+        file.write("@7\n")
+    assert len(second.build()) == len(words) + 1
+    assert second.assembled == [paths[2]] and second.reused == paths[:2]
@@ -0,0 +1,31 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_optimizer.py
+    @brief      Tests of peephole optimizer, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+import pytest
+from src.hack_compiler import HackAssemblyCompiler, InvalidSyntaxException, RANGE_ERROR
+
+def compile_source(directory, source, optimize, collect_diagnostics=False):
+    path = os.path.join(str(directory), "program.asm")
+    with open(path, "w") as file:
+        file.write(source)
+    compiler = HackAssemblyCompiler(path, None, optimize=optimize, collect_diagnostics=collect_diagnostics)
+    compiler.compile()
+    return compiler
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_out_of_range_dead_load_is_rejected(tmp_path, optimize):
+    with pytest.raises(InvalidSyntaxException):
+        compile_source(tmp_path, "@40000\n@5\nD=A\n", optimize)
+
+def test_out_of_range_dead_load_is_reported_as_diagnostic(tmp_path):
+    compiler = compile_source(tmp_path, "@40000\n@5\nD=A\n", True, collect_diagnostics=True)
+    assert [(diagnostic.line, diagnostic.kind) for diagnostic in compiler.diagnostics] == [(1, RANGE_ERROR)]
+
+def test_in_range_dead_load_is_removed(tmp_path):
+    compiler = compile_source(tmp_path, "@7\n@5\nD=A\n", True)
+    assert list(compiler.words) == [5, 0b1110110000010000]
+    assert compiler.statistics.saved == 1
@@ -0,0 +1,50 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_rom.py
+    @brief      Tests of ROM file formats, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+import pytest
+from array       import array
+from src.hack_rom import HackRom, InvalidRomException, ROM_FORMATS, ROM_HEADER, read_words, write_rom
+
+WORDS = array("H", [0, 1, 0x7FFF, 0x8000, 0xEC10, 0xFFFF, 0x1234, 0xABCD, 0x0F0F, 42])
+
+@pytest.mark.parametrize("extension", sorted(ROM_FORMATS))
+@pytest.mark.parametrize("words", [WORDS, array("H"), array("H", range(0, 65536, 7))])
+def test_round_trip(tmp_path, extension, words):
+    path = str(tmp_path / ("program" + extension))
+    write_rom(words, path)
+    assert read_words(path) == words
+
+def test_format_can_be_given_explicitly(tmp_path):
+    path = str(tmp_path / "program.rom")
+    write_rom(WORDS, path, "verilog")
+    with open(path) as file:
+        assert file.read().startswith("// Hack ROM, 10 words")
+
+def test_logisim_run_length_values(tmp_path):
+    path = str(tmp_path / "program.img")
+    with open(path, "w") as file:
+        file.write("v2.0 raw\n3*ec10 1 2*0\n")
+    assert list(read_words(path)) == [0xEC10] * 3 + [1, 0, 0]
+
+def test_binary_rom_is_mapped_without_copy(tmp_path):
+    path = str(tmp_path / "program.bin")
+    write_rom(WORDS, path)
+    assert os.path.getsize(path) == ROM_HEADER.size + len(WORDS) * 2
+    with HackRom(path) as rom:
+        assert len(rom) == len(WORDS) and list(rom.words) == list(WORDS)
+
+@pytest.mark.parametrize("data", [b"", b"HACKROM\0", b"NOTAROM\0" + bytes(8), ROM_HEADER.pack(b"HACKROM\0", 1, 0, 10) + bytes(4)])
+def test_invalid_binary_rom(tmp_path, data):
+    path = str(tmp_path / "program.bin")
+    with open(path, "wb") as file:
+        file.write(data)
+    with pytest.raises(InvalidRomException):
+        read_words(path)
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(InvalidRomException):
+        write_rom(WORDS, str(tmp_path / "program.hack"), "punched-tape")
@@ -0,0 +1,147 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_translator.py
+    @brief      Tests of block translation against interpreter, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import pytest
+from src.hack_compiler             import C_INSTRUCTIONS
+from src.hack_emulator             import HackEmulator
+from src.hack_translator           import TranslatingHackEmulator
+from src.hack_incremental_compiler import IncrementalHackAssemblyCompiler
+
+SUM = """
+    @100
+    D=A
+    @i
+    M=D
+    @sum
+    M=0
+(LOOP)
+    @i
+    D=M
+    @sum
+    M=D+M
+    @i
+    MD=M-1
+    @LOOP
+    D;JGT
+(END)
+    @END
+    0;JMP
+"""
+
+MULTIPLY = """
+    @R2
+    M=0
+    @R0
+    D=M
+    @END
+    D;JEQ
+(LOOP)
+    @R1
+    D=M
+    @R2
+    M=D+M
+    @R0
+    MD=M-1
+    @LOOP
+    D;JNE
+(END)
+    @END
+    0;JMP
+"""
+
+def assemble(source):
+    compiler = IncrementalHackAssemblyCompiler()
+    compiler.update(source)
+    return list(compiler.words)
+
+def interpreted_hits(emulator):
+    """ Run interpreter to halt one instruction at a time, returns executions of every address. """
+    hits = [0] * len(emulator.rom)
+    while not emulator.halted:
+        hits[emulator.pc] += 1
+        emulator.step()
+    return hits
+
+def assert_same_state(translated, interpreted):
+    assert (translated.a, translated.d, translated.pc) == (interpreted.a, interpreted.d, interpreted.pc)
+    assert translated.ram == interpreted.ram
+    assert translated.instructions == interpreted.instructions
+    assert translated.halted == interpreted.halted
+
+@pytest.mark.parametrize("source", [SUM, MULTIPLY])
+@pytest.mark.parametrize("budget", [None, 1, 7, 64])
+def test_translator_matches_interpreter(source, budget):
+    words       = assemble(source)
+    translated  = TranslatingHackEmulator(words)
+    interpreted = HackEmulator(words)
+    for emulator in (translated, interpreted):
+        emulator.ram[0], emulator.ram[1] = 6, 7
+        while not emulator.halted:
+            emulator.run(budget)
+
+    assert_same_state(translated, interpreted)
+
+@pytest.mark.parametrize("source", [SUM, MULTIPLY])
+def test_profile_matches_interpreter(source):
+    words      = assemble(source)
+    translated = TranslatingHackEmulator(words, profiling=True)
+    translated.ram[0], translated.ram[1] = 6, 7
+    translated.run()
+
+    interpreted = HackEmulator(words)
+    interpreted.ram[0], interpreted.ram[1] = 6, 7
+
+    assert translated.address_hits() == interpreted_hits(interpreted)
+
+def test_write_rom_retranslates_changed_constant():
+    words       = assemble(SUM)
+    translated  = TranslatingHackEmulator(words)
+    interpreted = HackEmulator(words)
+    translated.run()
+
+    for emulator in (translated, interpreted):
+        emulator.reset()
+        emulator.write_rom(0, 10)
+        emulator.run()
+
+    assert_same_state(translated, interpreted)
+    assert translated.ram[17] == 55
+
+def test_write_rom_that_moves_halt_retranslates_other_regions():
+    # Block at 0 ends before halt at 5, write at 5 moves halt to 4 inside that block
+    words = [5, C_INSTRUCTIONS["D=A"], 16, C_INSTRUCTIONS["M=D"], 4, 5, C_INSTRUCTIONS["0;JMP"]]
+    translated  = TranslatingHackEmulator(words)
+    interpreted = HackEmulator(words)
+    translated.run()
+    assert translated.pc == 5
+
+    for emulator in (translated, interpreted):
+        emulator.reset()
+        emulator.write_rom(5, C_INSTRUCTIONS["0;JMP"])
+        emulator.run()
+
+    assert_same_state(translated, interpreted)
+    assert translated.pc == 4
+
+@pytest.mark.parametrize("words, address, word", [
+    (assemble(SUM), 0, 10),
+    # Block at 0 is translated again one instruction shorter
+    ([5, C_INSTRUCTIONS["D=A"], 16, C_INSTRUCTIONS["M=D"], 4, 5, C_INSTRUCTIONS["0;JMP"]], 5, C_INSTRUCTIONS["0;JMP"]),
+])
+def test_write_rom_keeps_profile_of_dropped_blocks(words, address, word):
+    translated = TranslatingHackEmulator(words, profiling=True)
+    translated.run()
+
+    interpreted = HackEmulator(words)
+    hits        = interpreted_hits(interpreted)
+
+    for emulator in (translated, interpreted):
+        emulator.reset()
+        emulator.write_rom(address, word)
+    translated.run()
+    hits = [before + after for before, after in zip(hits, interpreted_hits(interpreted))]
+
+    assert translated.address_hits() == hits
@@ -0,0 +1,126 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_hack_vm_translator.py
+    @brief      Tests of VM translator, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import os
+import pytest
+from src.hack_compiler      import HackAssemblyCompiler
+from src.hack_emulator      import HackEmulator
+from src.hack_vm_translator import VMTranslator, DEFAULT_SHARED_ROUTINES, InvalidVMCommandException
+
+MAIN = """
+function Main.fibonacci 0
+push argument 0
+push constant 2
+lt
+if-goto IF_TRUE
+goto IF_FALSE
+label IF_TRUE
+push argument 0
+return
+label IF_FALSE
+push argument 0
+push constant 2
+sub
+call Main.fibonacci 1
+push argument 0
+push constant 1
+sub
+call Main.fibonacci 1
+add
+return
+"""
+
+# Result is stored in temp 0 (RAM[5]), program halts in END loop.
+SYS = """
+function Sys.init 0
+push constant 12
+call Main.fibonacci 1
+pop temp 0
+label END
+goto END
+"""
+
+# Results of comparisons are stored in temp segment (RAM[5] to RAM[10]).
+COMPARISONS = """
+function Sys.init 0
+push constant 7
+push constant 7
+eq
+push constant 7
+push constant 8
+eq
+push constant 9
+push constant 8
+gt
+push constant 8
+push constant 9
+gt
+push constant 1
+neg
+push constant 0
+lt
+push constant 0
+push constant 1
+neg
+lt
+pop temp 5
+pop temp 4
+pop temp 3
+pop temp 2
+pop temp 1
+pop temp 0
+label END
+goto END
+"""
+
+MODES = [True, False, DEFAULT_SHARED_ROUTINES, ("eq", "gt", "lt")]
+
+def run_vm(directory, files, shared):
+    """ Translate, assemble and run VM files, returns (translator, ROM words, halted emulator). """
+    directory = str(directory)
+    for name, source in files.items():
+        with open(os.path.join(directory, name), "w") as file:
+            file.write(source)
+    out_file   = os.path.join(directory, "Program.asm")
+    translator = VMTranslator(directory, out_file, shared)
+    translator.translate()
+    compiler = HackAssemblyCompiler(out_file, None)
+    compiler.compile()
+    emulator = HackEmulator(compiler.words)
+    emulator.run(10 ** 6)
+    assert emulator.halted
+    return translator, list(compiler.words), emulator
+
+@pytest.mark.parametrize("shared", MODES)
+def test_fibonacci(tmp_path, shared):
+    translator, words, emulator = run_vm(tmp_path, { "Main.vm": MAIN, "Sys.vm": SYS }, shared)
+    assert emulator.ram[5] == 144
+    assert translator.instructions == len(words)
+
+@pytest.mark.parametrize("shared", MODES)
+def test_comparisons(tmp_path, shared):
+    _, _, emulator = run_vm(tmp_path, { "Sys.vm": COMPARISONS }, shared)
+    assert list(emulator.ram[5:11]) == [0xFFFF, 0, 0xFFFF, 0, 0xFFFF, 0]
+
+def test_rom_size_and_cycles_trade_off(tmp_path):
+    results = {}
+    for name, shared in (("shared", True), ("inline", False), ("default", DEFAULT_SHARED_ROUTINES)):
+        directory = tmp_path / name
+        directory.mkdir()
+        translator, words, emulator = run_vm(directory, { "Main.vm": MAIN, "Sys.vm": SYS }, shared)
+        results[name] = (len(words), emulator.instructions)
+        assert translator.inline_instructions == results.get("inline", (translator.inline_instructions,))[0]
+
+    # Shared routines make ROM smaller and inline code runs fastest
+    assert results["shared"][0] < results["inline"][0]
+    assert results["inline"][1] < results["shared"][1]
+    # Comparisons are inline by default, so it is smallest and faster than sharing everything
+    assert results["default"][0] <= results["shared"][0]
+    assert results["inline"][1] < results["default"][1] < results["shared"][1]
+
+def test_unknown_shared_routine(tmp_path):
+    with pytest.raises(InvalidVMCommandException):
+        VMTranslator(str(tmp_path), str(tmp_path / "Program.asm"), ("push",))
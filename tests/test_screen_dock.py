@@ -0,0 +1,51 @@
+"""
+------------------------------------------------------------------------------
+    @file       test_screen_dock.py
+    @brief      Tests of screen dock, run with: python -m pytest tests
+------------------------------------------------------------------------------
+"""
+import pytest
+from array                  import array
+from PyQt5                  import QtWidgets, QtTest
+from src.hack_emulator      import RAM_SIZE, SCREEN
+from src.widgets.screen_dock import ScreenDockWidget, SCREEN_REFRESH_INTERVAL
+
+@pytest.fixture
+def screen_dock():
+    application = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    main_form   = QtWidgets.QMainWindow()
+    screen_dock = ScreenDockWidget(main_form)
+    main_form.show()
+    screen_dock.show()
+    application.processEvents()
+    yield screen_dock
+    screen_dock.detach()
+    main_form.close()
+
+def test_attached_ram_is_shown_on_refresh_timer(screen_dock):
+    ram = array("H", bytes(RAM_SIZE * 2))
+    screen_dock.attach(ram)
+    assert screen_dock.timer.isActive()
+
+    # Leftmost 16 pixels of second row
+    ram[SCREEN + 32] = 0xFFFF
+    QtTest.QTest.qWait(SCREEN_REFRESH_INTERVAL * 4)
+    assert screen_dock.screen.pixels[1, :16].all() and not screen_dock.screen.pixels[0].any()
+
+def test_detach_keeps_last_picture(screen_dock):
+    ram = array("H", bytes(RAM_SIZE * 2))
+    screen_dock.attach(ram)
+    ram[SCREEN] = 1
+    screen_dock.detach()
+    assert not screen_dock.timer.isActive()
+    assert screen_dock.screen.pixels[0, 0] == 1
+
+    ram[SCREEN] = 0
+    QtTest.QTest.qWait(SCREEN_REFRESH_INTERVAL * 4)
+    assert screen_dock.screen.pixels[0, 0] == 1
+
+def test_snapshot_is_shown_when_not_attached(screen_dock):
+    ram = array("H", bytes(RAM_SIZE * 2))
+    ram[SCREEN + 1] = 0x8000
+    screen_dock.refresh(ram)
+    assert screen_dock.screen.pixels[0, 31] == 1